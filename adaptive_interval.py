@@ -0,0 +1,28 @@
+class AdaptiveInterval:
+    """Intervalo de amostragem que cresce enquanto nada muda.
+
+    Depois de uma mudança (foco, título, ativo/inativo) o tracker volta a
+    amostrar no piso; a cada amostra sem mudança o intervalo é multiplicado
+    por `growth` até o teto. A contagem de tempo não depende do intervalo:
+    o TimeAccountant usa os instantes das mudanças, não o número de amostras.
+    """
+
+    def __init__(self, floor=1.0, ceiling=10.0, growth=1.5):
+        self.growth = growth
+        self.configure(floor, ceiling)
+
+    def configure(self, floor, ceiling):
+        self.floor = floor
+        self.ceiling = max(floor, ceiling)
+        self.current = self.floor
+
+    def reset(self):
+        self.current = self.floor
+
+    def next(self, changed):
+        """Intervalo até a próxima amostra, dado se o estado mudou nesta."""
+        if changed:
+            self.current = self.floor
+        else:
+            self.current = min(self.ceiling, self.current * self.growth)
+        return self.current
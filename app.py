@@ -1,20 +1,20 @@
-import customtkinter as ctk
-from tkinter import messagebox
 import time
+_STARTED_AT = time.perf_counter()  # Medição de inicialização (--startup-time)
+import customtkinter as ctk
+from tkinter import messagebox, filedialog
 import threading
 import csv
 import os
 import json
 from datetime import datetime
-import pygetwindow as gw
-import pyautogui
-import keyboard
-import pystray
-from PIL import Image, ImageDraw, ImageFont
-import pandas as pd
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import matplotlib.pyplot as plt
 import sys
+from history_store import ARCHIVE_FILE, HistoryStore
+from history_view import VirtualHistoryList
+from session_journal import SessionJournal
+from background import BackgroundWorker
+from tracker_metrics import format_summary
+from usage_reports import usage_totals, usage_window_start
+from tracking_service import TrackingService, TrackingClient, SERVICE_FILE
 
 def resource_path(relative_path):
     """Retorna o caminho absoluto para recursos, compatível com PyInstaller."""
@@ -52,7 +52,7 @@ ctk.set_default_color_theme(resource_path("timetracker_theme.json"))
 
 class TimeTrackerApp:
     current_language = 'en'  # Classe-level, para acesso global
-    def __init__(self, root):
+    def __init__(self, root, engine=None):
         self.root = root
         self.language = 'en'  # Inicializa antes de load_settings
         self.root.title("Work Time Tracker")
@@ -73,13 +73,17 @@ class TimeTrackerApp:
         self.running = False
         self.tracking_active = False
         self.last_active_window = None
-        self.last_activity_time = time.time()
         self.idle_threshold = 10  # Agora configurável
         self.check_interval = 1.0  # Intervalo de verificação configurável (em segundos)
-        self.mouse_position = pyautogui.position()
+        self.max_check_interval = 10.0  # Teto do intervalo quando nada muda (foco estável ou inatividade)
+        self.compact_after_days = 0  # Consolida sessões mais antigas que isso em uma linha por dia e app (0 = nunca)
+        self.archive_compacted = True  # Guarda as linhas originais em time_history_archive.db
         self.timer_var = ctk.StringVar(value="00:00:00")
         self.show_full_history = False  # Controla exibição do histórico completo
         self.app_times = {}  # Novo: tempo individual de cada app
+        # O estado do tracker é lido do motor uma vez por segundo (via engine_worker)
+        self.status_interval_ms = 1000
+        self._status_after_id = None
         
         # Arquivo de configurações e atalhos
         self.settings_file = "settings.json"
@@ -95,24 +99,60 @@ class TimeTrackerApp:
         self.compact_shortcut_var = ctk.StringVar()
         self.idle_threshold_var = ctk.StringVar(value=str(self.idle_threshold))
         self.check_interval_var = ctk.StringVar(value=str(self.check_interval))
+        self.max_check_interval_var = ctk.StringVar(value=str(self.max_check_interval))
+        self.compact_after_days_var = ctk.StringVar(value=str(self.compact_after_days))
+        self.archive_compacted_var = ctk.BooleanVar(value=self.archive_compacted)
         self.close_to_tray_var = ctk.BooleanVar(value=self.close_to_tray)
+        self.diagnostics_var = ctk.BooleanVar(value=False)
         self.auto_compact_mode_var = ctk.BooleanVar(value=True) # Novo: Padrão para ativar automaticamente
 
         # Arquivo CSV
         self.filename = "time_history.csv"
         self.initialize_csv()
+        # Armazenamento indexado do histórico (importa o CSV na primeira execução)
+        self.history_db_filename = "time_history.db"
+        # Consultas ao histórico e estatísticas rodam fora da thread do Tk
+        self.worker = BackgroundWorker(self.root)
+        # Comandos ao motor (que pode ser um socket lento) fora da thread do Tk, em ordem
+        self.engine_worker = BackgroundWorker(self.root, max_workers=1)
+        self._status_pending = False
+        self._engine_error_shown = False
+        self.stats_cache = None  # Criado ao abrir as estatísticas (evita importar NumPy na partida)
+        self.history_store = HistoryStore(
+            resource_path(self.history_db_filename), resource_path(self.filename),
+            columnar_dir=resource_path("time_history.cols"), defer_import=True)
+        # Primeira execução: o CSV é importado no worker depois que a janela aparece
+        self.history_importing = self.history_store.needs_import()
+        if not self.history_importing:
+            self.history_store.finish_opening()
+        # Motor de rastreamento: no próprio processo ou um serviço separado (TrackingClient)
+        self.owns_engine = engine is None
+        if engine is None:
+            # Journal dos segmentos da sessão em andamento (recupera sessões perdidas em quedas)
+            journal = SessionJournal(resource_path("session_journal.jsonl"))
+            engine = TrackingService(self.history_store, journal, resource_path(self.filename))
+        self.engine = engine
         
         self.load_settings()
         self.create_interface()
-        self.load_history()
-        self.register_shortcuts()
-
-        # Configurar monitoramento de teclado
-        keyboard.hook(self.keyboard_activity)
+        if self.history_importing:
+            self.start_btn.configure(state="disabled")
+            self.history_content.show_placeholder(t("importing_history"))
+            self.worker.submit("import", self.history_store.finish_opening, on_done=self.on_history_imported,
+                               on_error=lambda e: messagebox.showerror(t("error"), str(e)))
+        else:
+            self.on_history_ready()
+        self.adopt_engine_state()
+        # O módulo keyboard só é importado depois que a janela aparece
+        self.root.after_idle(self.register_shortcuts)
 
         # Configurar bandeja do sistema
         self.root.protocol("WM_DELETE_WINDOW", self.minimize_to_tray)
         self.tray_icon_update_running = False
+        # Estado do timer para o ícone; a thread da bandeja espera na Condition até ele mudar
+        self._tray_state = ("00:00:00", False)
+        self._tray_changed = threading.Condition()
+        self._tray_renderer = None
 
         # Barra customizada
         self.root.overrideredirect(True)  # Remove a barra do sistema
@@ -160,22 +200,6 @@ class TimeTrackerApp:
         icon_label.bind("<Button-1>", start_move)
         icon_label.bind("<B1-Motion>", do_move)
 
-    def keyboard_activity(self, event):
-        """Registra atividade do teclado"""
-        self.last_activity_time = time.time()
-
-    def check_mouse_activity(self):
-        """Verifica se o mouse se moveu"""
-        current_position = pyautogui.position()
-        if current_position != self.mouse_position:
-            self.mouse_position = current_position
-            self.last_activity_time = time.time()
-        return self.last_activity_time
-
-    def is_user_active(self):
-        """Verifica se o usuário está ativo"""
-        return (time.time() - self.last_activity_time) < self.idle_threshold
-
     def initialize_csv(self):
         if not os.path.exists(resource_path(self.filename)):
             with open(resource_path(self.filename), mode="w", newline="", encoding="utf-8") as file:
@@ -193,9 +217,13 @@ class TimeTrackerApp:
                     self.resizable = settings.get("resizable", True) # Padrão para True
                     self.idle_threshold = settings.get("idle_threshold", 10)
                     self.check_interval = settings.get("check_interval", 1.0)
+                    self.max_check_interval = settings.get("max_check_interval", 10.0)
+                    self.compact_after_days = settings.get("compact_after_days", 0)
+                    self.archive_compacted = settings.get("archive_compacted", True)
                     self.close_to_tray = settings.get("close_to_tray", True)
                     self.auto_compact_mode_var.set(settings.get("auto_compact_mode", True))
                     self.language = settings.get("language", "en")  # Novo: idioma
+                    self.diagnostics_var.set(settings.get("diagnostics_enabled", False))
         except (json.JSONDecodeError, FileNotFoundError):
             pass
         
@@ -205,7 +233,11 @@ class TimeTrackerApp:
         self.compact_shortcut_var.set(self.shortcuts.get("compact"))
         self.idle_threshold_var.set(str(self.idle_threshold))
         self.check_interval_var.set(str(self.check_interval))
+        self.max_check_interval_var.set(str(self.max_check_interval))
+        self.compact_after_days_var.set(str(self.compact_after_days))
+        self.archive_compacted_var.set(self.archive_compacted)
         self.close_to_tray_var.set(self.close_to_tray)
+        self.configure_engine()
         self.root.attributes('-topmost', self.always_on_top)
         self.root.resizable(self.resizable, self.resizable)
         TimeTrackerApp.current_language = self.language  # Atualiza idioma global
@@ -350,6 +382,20 @@ class TimeTrackerApp:
         ctk.CTkLabel(interval_frame, text=t("check_interval"), text_color="#A1A7B3").pack(side="left", padx=5)
         ctk.CTkEntry(interval_frame, textvariable=self.check_interval_var, width=100, fg_color="#323B4C", text_color="#FFFFFF").pack(side="left", padx=5)
 
+        # Max Check Interval
+        max_interval_frame = ctk.CTkFrame(settings_scroll_frame, fg_color="#232B3B")
+        max_interval_frame.pack(pady=10, padx=20, fill="x")
+        ctk.CTkLabel(max_interval_frame, text=t("max_check_interval"), text_color="#A1A7B3").pack(side="left", padx=5)
+        ctk.CTkEntry(max_interval_frame, textvariable=self.max_check_interval_var, width=100, fg_color="#323B4C", text_color="#FFFFFF").pack(side="left", padx=5)
+
+        # Compactação do histórico antigo
+        compact_frame = ctk.CTkFrame(settings_scroll_frame, fg_color="#232B3B")
+        compact_frame.pack(pady=10, padx=20, fill="x")
+        ctk.CTkLabel(compact_frame, text=t("compact_after_days"), text_color="#A1A7B3").pack(side="left", padx=5)
+        ctk.CTkEntry(compact_frame, textvariable=self.compact_after_days_var, width=100, fg_color="#323B4C", text_color="#FFFFFF").pack(side="left", padx=5)
+        ctk.CTkCheckBox(settings_scroll_frame, text=t("archive_compacted"), variable=self.archive_compacted_var,
+                        fg_color="#323B4C", text_color="#A1A7B3").pack(pady=10, padx=20, anchor="w")
+
         # Atalhos
         shortcuts_frame = ctk.CTkFrame(settings_scroll_frame, fg_color="#232B3B")
         shortcuts_frame.pack(pady=10, padx=20, fill="x")
@@ -362,6 +408,25 @@ class TimeTrackerApp:
             entry.grid(row=i+1, column=1, padx=10, pady=5, sticky="ew")
         shortcuts_frame.grid_columnconfigure(1, weight=1)
 
+        # Diagnóstico do loop de rastreamento
+        diagnostics_frame = ctk.CTkFrame(settings_scroll_frame, fg_color="#232B3B")
+        diagnostics_frame.pack(pady=10, padx=20, fill="x")
+        ctk.CTkLabel(diagnostics_frame, text=t("diagnostics"), font=("Arial", 14, "bold"), text_color="#22D3EE").pack(anchor="w", pady=(5, 5))
+        ctk.CTkCheckBox(
+            diagnostics_frame,
+            text=t("enable_diagnostics"),
+            variable=self.diagnostics_var,
+            command=self.toggle_diagnostics,
+            fg_color="#323B4C", text_color="#A1A7B3"
+        ).pack(anchor="w", pady=5)
+        self.diagnostics_label = ctk.CTkLabel(diagnostics_frame, text="", font=("Courier New", 10), text_color="#A1A7B3", justify="left", wraplength=380)
+        self.diagnostics_label.pack(anchor="w", pady=(0, 5))
+        diagnostics_btn_frame = ctk.CTkFrame(diagnostics_frame, fg_color="#232B3B")
+        diagnostics_btn_frame.pack(fill="x")
+        ctk.CTkButton(diagnostics_btn_frame, text=t("refresh"), width=80, fg_color="#323B4C", hover_color="#374151", command=self.refresh_diagnostics).pack(side="left", padx=(0, 5))
+        ctk.CTkButton(diagnostics_btn_frame, text=t("clear"), width=80, fg_color="#323B4C", hover_color="#374151", command=self.reset_diagnostics).pack(side="left", padx=5)
+        ctk.CTkButton(diagnostics_btn_frame, text=t("save_to_file"), width=100, fg_color="#323B4C", hover_color="#374151", command=self.dump_diagnostics).pack(side="left", padx=5)
+
         # Botões de ação da página de configurações
         settings_btn_frame = ctk.CTkFrame(settings_scroll_frame, fg_color="#232B3B")
         settings_btn_frame.pack(pady=20, padx=20, fill="x")
@@ -436,6 +501,16 @@ class TimeTrackerApp:
         self.app_filter_entry = ctk.CTkEntry(app_row, width=100, textvariable=self.app_filter_var)
         self.app_filter_entry.pack(side="left", padx=(0,2))
         ctk.CTkButton(app_row, text=t("search"), command=self.apply_app_filter, width=60).pack(side="left", padx=(0,0))
+        # Linha: De: | [campo] | Até: | [campo] | [Exportar] (vazio = sem limite; usa o filtro de app acima)
+        export_row = ctk.CTkFrame(filter_frame, fg_color="#232b3b")
+        export_row.pack(anchor="w", pady=2)
+        self.export_start_var = ctk.StringVar()
+        self.export_end_var = ctk.StringVar()
+        for label, var in ((t("export_from"), self.export_start_var), (t("export_to"), self.export_end_var)):
+            ctk.CTkLabel(export_row, text=label).pack(side="left", padx=(0,2))
+            ctk.CTkEntry(export_row, width=90, textvariable=var).pack(side="left", padx=(0,4))
+        ctk.CTkButton(export_row, text=t("export"), command=self.export_history_file, width=60,
+                      fg_color="#323B4C", hover_color="#374151").pack(side="left", padx=(0,0))
         # --- Frame do Título e Botão Voltar ---
         # Frame do botão voltar, sem espaço extra
         title_bar_frame = ctk.CTkFrame(history_frame, fg_color="transparent")
@@ -465,48 +540,21 @@ class TimeTrackerApp:
             ctk.CTkLabel(headers_frame, text=header, font=("Arial", 11, "bold"),
                         text_color="white").pack(side="left", expand=True, padx=2)
         
-        # Área rolável
-        self.history_canvas = ctk.CTkCanvas(container, highlightthickness=0, bg="#232B3B")
-        scrollbar = ctk.CTkScrollbar(container, orientation="vertical", command=self.history_canvas.yview)
-        self.history_content = ctk.CTkFrame(self.history_canvas, fg_color="#232B3B")
-        
-        self.history_content.bind(
-            "<Configure>",
-            lambda e: self.history_canvas.configure(scrollregion=self.history_canvas.bbox("all")))
-        
-        self.history_canvas.create_window((0, 0), window=self.history_content, anchor="nw", width=380)
-        self.history_canvas.configure(yscrollcommand=scrollbar.set)
-        self.history_canvas.pack(side="left", fill="both", expand=True)
-        scrollbar.pack(side="right", fill="y")
+        # Área rolável (virtualizada: só as linhas visíveis têm widgets)
+        self.history_content = VirtualHistoryList(container, fg_color="#232B3B")
+        self.history_content.pack(fill="both", expand=True)
 
     def add_history_entry(self, date, time, apps, duration):
         """Adiciona entrada no histórico com texto ajustável"""
-        entry_frame = ctk.CTkFrame(self.history_content, corner_radius=5, height=30, fg_color="#232b3b")
-        entry_frame.pack(fill="x", pady=1, padx=1, expand=True)
-        
-        date_label = ctk.CTkLabel(entry_frame, text=date, font=("Arial", 9), anchor="w", text_color="white")
-        date_label.pack(side="left", expand=True, padx=2)
-        
-        time_label = ctk.CTkLabel(entry_frame, text=time, font=("Arial", 9), anchor="w", text_color="white")
-        time_label.pack(side="left", expand=True, padx=2)
-        
-        apps_label = ctk.CTkLabel(entry_frame, text=apps, font=("Arial", 9), anchor="w", text_color="white")
-        apps_label.pack(side="left", expand=True, padx=2)
-        
-        def show_full_text(e):
-            apps_label.configure(text=apps)
-        def show_short_text(e):
-            apps_label.configure(text=(apps[:15] + "...") if len(apps) > 15 else apps)
-        
-        apps_label.bind("<Enter>", show_full_text)
-        apps_label.bind("<Leave>", show_short_text)
-        show_short_text(None)
-        
-        duration_label = ctk.CTkLabel(entry_frame, text=duration, font=("Arial", 9), anchor="e", text_color="white")
-        duration_label.pack(side="left", expand=True, padx=2)
+        self.history_content.append_row((date, time, apps, duration))
+
+    def show_history_rows(self, rows):
+        """Substitui as linhas exibidas no histórico"""
+        self.history_content.set_rows(rows)
 
     def get_window_titles(self):
         """Obtém todos os títulos de janela disponíveis"""
+        import pygetwindow as gw
         return [t("choose_app")] + [title for title in gw.getAllTitles() if title.strip()]
 
     def add_app_slot(self):
@@ -542,8 +590,82 @@ class TimeTrackerApp:
         else:
             messagebox.showwarning(t("warning"), t("at_least_one_app"))
 
+    def configure_engine(self):
+        """Envia ao motor de rastreamento as configurações atuais (no engine_worker)"""
+        self.engine_worker.submit("configure", self.send_engine_config, self.idle_threshold, self.check_interval,
+                                  self.max_check_interval, self.diagnostics_var.get(),
+                                  on_done=lambda _: None, on_error=self.show_engine_error)
+
+    def send_engine_config(self, idle_threshold, check_interval, max_check_interval, diagnostics):
+        """Roda no engine_worker: os valores são lidos das variáveis do Tk antes de submeter"""
+        self.engine.configure(idle_threshold=idle_threshold, check_interval=check_interval,
+                              max_check_interval=max_check_interval)
+        self.engine.set_diagnostics(diagnostics)
+
+    def adopt_engine_state(self):
+        """Com um serviço externo, o tracking pode já estar rodando quando a janela abre"""
+        self.engine_worker.submit("adopt", self.engine.status, on_done=self.on_engine_status,
+                                  on_error=self.show_engine_error)
+
+    def on_engine_status(self, status):
+        """Aplica um status do motor: o tracking pode ter sido iniciado ou parado por outro cliente"""
+        self._engine_error_shown = False
+        if status.get("history_version", self.history_store.version) != self.history_store.version:
+            # Histórico gravado ou compactado pelo serviço: relê versão e lista
+            self.history_store.refresh()
+            self.load_history()
+        if status["running"] and not self.running:
+            self.running = True
+            self.start_btn.configure(fg_color="#27AE60", text="▶ Tracking")
+            self.start_status_polling()
+        elif not status["running"] and self.running:
+            self.set_stopped_state()
+            return
+        if self.running:
+            self.show_tracker_status(status)
+
+    def show_engine_error(self, error):
+        """Mostra uma única vez a falha de comunicação com o motor (até ele responder de novo)"""
+        if self._engine_error_shown:
+            return
+        self._engine_error_shown = True
+        messagebox.showerror(t("error"), t("service_unreachable", error=error))
+
+    def recover_unsaved_session(self):
+        """Salva a sessão que ficou no journal após uma queda (motor local)"""
+        self.engine_worker.submit("recover", self.engine.recover_unsaved_session,
+                                  on_done=self.on_session_recovered, on_error=self.show_engine_error)
+
+    def on_session_recovered(self, result):
+        if result:
+            # A carga inicial do histórico pode ter terminado antes ou depois: relê a lista
+            self.history_store.refresh()
+            self.load_history()
+
+    def on_session_saved(self, result):
+        """Atualiza lista e caches com as linhas que o motor acabou de gravar"""
+        self.history_store.refresh()  # A gravação pode ter vindo de outro processo
+        # Só os snapshots em cache recebem as linhas novas; nada é recalculado do zero
+        if self.stats_cache is not None:
+            self.stats_cache.apply_rows(result["old_version"], result["new_version"], result["dated_rows"])
+        for row in result["rows"]:
+            self.add_history_entry(*row)
+
+    def on_history_imported(self, _):
+        self.history_importing = False
+        self.start_btn.configure(state="normal")
+        self.on_history_ready()
+
+    def on_history_ready(self):
+        """Histórico aberto (e importado, na primeira execução): recupera a sessão perdida e mostra a lista"""
+        self.recover_unsaved_session()
+        self.load_history()
+        self.root.after_idle(self.schedule_history_compaction)
+
     def start_tracking(self):
         """Inicia o tracking dos aplicativos selecionados"""
+        if self.history_importing:
+            return  # Botão desabilitado; o atalho de teclado também espera a importação
         # Filtra os placeholders e valores vazios
         self.target_windows = [
             combo.get() for combo in self.app_combos
@@ -553,124 +675,126 @@ class TimeTrackerApp:
             messagebox.showwarning(t("warning"), t("please_select_app"))
             return
         if not self.running:
-            self.running = True
-            self.tracking_active = False
-            self.last_activity_time = time.time()
-            self.start_btn.configure(fg_color="#27AE60", text="▶ Tracking")
-            self.update_timer_color()
-            # Novo: zera o tempo individual de cada app
-            self.app_times = {app: 0.0 for app in self.target_windows}
-            threading.Thread(target=self.track_time, daemon=True).start()
+            # Regras: "=exato", "^prefixo", "re:regex" ou substring (padrão)
+            self.engine_worker.submit("start", self.engine.start, list(self.target_windows),
+                                      on_done=self.on_tracking_started, on_error=self.on_start_failed)
+
+    def on_tracking_started(self, status):
+        self.running = True
+        self.tracking_active = False
+        self.start_btn.configure(fg_color="#27AE60", text="▶ Tracking")
+        self.update_timer_color()
+        # Novo: zera o tempo individual de cada app
+        self.app_times = {app: 0.0 for app in self.target_windows}
+        self.start_status_polling()
+
+    def on_start_failed(self, error):
+        if isinstance(error, ValueError):
+            messagebox.showerror(t("error"), t("invalid_app_rule", error=error))
+        else:
+            messagebox.showerror(t("error"), str(error))
 
     def stop_tracking(self):
         """Para o tracking e salva a sessão"""
         if self.running:
-            self.running = False
-            self.start_btn.configure(fg_color="#22D3EE", text=t("start"))
-            self.update_timer_color()
-            
-            if self.elapsed_time > 0:
-                self.save_session()
-            self.tracking_active = False
-            self.elapsed_time = 0
-            self.update_timer_display()
+            self.set_stopped_state()
+            # O motor fecha o intervalo aberto no instante da parada e grava a sessão
+            self.engine_worker.submit("stop", self.engine.stop,
+                                      on_done=lambda result: self.on_session_saved(result) if result else None,
+                                      on_error=lambda e: messagebox.showerror(t("error"), str(e)))
+
+    def set_stopped_state(self):
+        """Volta a interface ao estado parado"""
+        self.running = False
+        self.stop_status_polling()
+        # Um status pedido antes da parada ainda diria "rodando": é descartado
+        self.engine_worker.cancel("status")
+        self._status_pending = False
+        self.start_btn.configure(fg_color="#22D3EE", text=t("start"))
+        self.app_times = {}
+        self.tracking_active = False
+        self.elapsed_time = 0
+        self.update_timer_display()
 
     def reset_timer(self):
         """Reseta o timer completamente"""
         if messagebox.askyesno(t("confirm"), t("reset_confirm")):
-            self.elapsed_time = 0
-            self.update_timer_display()
-            self.tracking_active = False
-            self.update_timer_color()
+            self.engine_worker.submit("reset", self.engine.reset, on_done=self.on_timer_reset,
+                                      on_error=lambda e: messagebox.showerror(t("error"), str(e)))
 
-    def track_time(self):
-        """Thread principal que monitora o tempo"""
-        while self.running:
-            self.check_mouse_activity()
-            current_window = self.get_active_window()
-            user_active = self.is_user_active()
-            # Novo: identifica qual app está ativo
-            app_found = None
-            if current_window:
-                for app in self.target_windows:
-                    if app in current_window:
-                        app_found = app
-                        break
-            if user_active and app_found:
-                if not self.tracking_active:
-                    self.tracking_active = True
-                    self.timer_label.configure(text_color="#1ABC9C")
-                    if hasattr(self, 'compact_timer_label'):
-                        self.compact_timer_label.configure(text_color="#1ABC9C")
-                    if not hasattr(self, '_compact_mode') or not self._compact_mode:
-                        self.root.after(0, self.toggle_compact_mode)
-                # Novo: incrementa só o app ativo
-                self.app_times[app_found] += (self.check_interval / 60.0)
-                self.elapsed_time = sum(self.app_times.values())
-                self.update_timer_display()
-            else:
-                if self.tracking_active:
-                    self.tracking_active = False
-                    self.timer_label.configure(text_color="#EA697B")
-                    if hasattr(self, 'compact_timer_label'):
-                        self.compact_timer_label.configure(text_color="#EA697B")
-            time.sleep(self.check_interval)  # Dorme conforme intervalo configurado
-
-    def get_active_window(self):
-        """Obtém a janela ativa atual"""
-        try:
-            window = gw.getActiveWindow()
-            return window and window.title
-        except Exception as e:
-            print(f"Window tracking error: {e}")
-            return None
+    def on_timer_reset(self, _):
+        self.app_times = {app: 0.0 for app in self.app_times}
+        self.elapsed_time = 0
+        self.update_timer_display()
+        self.tracking_active = False
+        self.update_timer_color()
+
+    def start_status_polling(self):
+        if self._status_after_id is None:
+            self._status_after_id = self.root.after(self.status_interval_ms, self.poll_tracker_status)
+
+    def stop_status_polling(self):
+        if self._status_after_id is not None:
+            self.root.after_cancel(self._status_after_id)
+            self._status_after_id = None
+
+    def poll_tracker_status(self):
+        """Pede o status do motor no engine_worker (uma vez por segundo, um pedido por vez)"""
+        self._status_after_id = self.root.after(self.status_interval_ms, self.poll_tracker_status)
+        if not self.running or self._status_pending:
+            return
+        self._status_pending = True
+        self.engine_worker.submit("status", self.engine.status, on_done=self.on_status_received,
+                                  on_error=self.on_status_failed)
+
+    def on_status_received(self, status):
+        self._status_pending = False
+        self.on_engine_status(status)
+
+    def on_status_failed(self, error):
+        self._status_pending = False
+        self.show_engine_error(error)
+
+    def show_tracker_status(self, status):
+        """Aplica na interface o status do motor enquanto o tracking roda"""
+        if status["tracking_active"] != self.tracking_active:
+            self.tracking_active = status["tracking_active"]
+            color = "#1ABC9C" if self.tracking_active else "#EA697B"
+            self.timer_label.configure(text_color=color)
+            if hasattr(self, 'compact_timer_label'):
+                self.compact_timer_label.configure(text_color=color)
+            if self.tracking_active and (not hasattr(self, '_compact_mode') or not self._compact_mode):
+                self.toggle_compact_mode()
+        self.app_times = {app: seconds / 60.0 for app, seconds in status["app_seconds"].items()}
+        if self.tracking_active:
+            # O tempo exibido vem do status do motor, sem depender do tracker acordar
+            self.elapsed_time = status["total_seconds"] / 60.0
+            self.update_timer_display()
 
     def update_timer_display(self):
         """Atualiza o display do timer"""
         hours, remainder = divmod(int(self.elapsed_time * 60), 3600)
         minutes, seconds = divmod(remainder, 60)
         timer_str = f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-        self.timer_var.set(timer_str)
+        if timer_str != self.timer_var.get():
+            self.timer_var.set(timer_str)
         self.update_timer_color()
 
-    def save_session(self):
-        """Salva a sessão atual no histórico"""
-        now = datetime.now()
-        date_str = now.strftime("%d/%m/%Y")
-        time_str = now.strftime("%H:%M:%S")
-        # Novo: salva uma linha por app
-        with open(resource_path(self.filename), mode="a", newline="", encoding="utf-8") as file:
-            writer = csv.writer(file)
-            for app, minutes in self.app_times.items():
-                duration = self.format_duration(minutes)
-                writer.writerow([date_str, time_str, app, duration])
-                self.add_history_entry(date_str, time_str, app, duration)
-        self.elapsed_time = 0
-        self.update_timer_display()
-        self.app_times = {}
-
-    def format_duration(self, elapsed_minutes):
-        """Formata a duração para HH:MM:SS"""
-        total_seconds = int(elapsed_minutes * 60)
-        hours, remainder = divmod(total_seconds, 3600)
-        minutes, seconds = divmod(remainder, 60)
-        return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
-
     def load_history(self):
-        self.clear_history_content()
         self.update_usage_reports(self.app_filter_var.get() if hasattr(self, 'app_filter_var') else None)
-        if os.path.exists(resource_path(self.filename)):
-            with open(resource_path(self.filename), mode="r", encoding="utf-8") as file:
-                reader = csv.reader(file)
-                next(reader) # Skip header
-                rows = list(reader)
-                if self.show_full_history:
-                    rows_to_display = rows
-                else:
-                    rows_to_display = rows[-5:]
-                for row in rows_to_display:
-                    if len(row) >= 4:
-                        self.add_history_entry(row[0], row[1], row[2], row[3])
+        if self.show_full_history:
+            self.load_history_rows(self.history_store.all_rows)
+        else:
+            self.load_history_rows(self.history_store.last_rows, 5)
+
+    def load_history_rows(self, query, *args):
+        """Executa a consulta ao histórico em segundo plano e exibe o resultado"""
+        if self.history_importing:
+            self.history_content.show_placeholder(t("importing_history"))  # on_history_ready recarrega
+            return
+        self.history_content.show_placeholder(t("loading"))
+        self.worker.submit("history", query, *args, on_done=self.show_history_rows,
+                           on_error=lambda e: self.history_content.show_placeholder(f"{t('error')} {e}"))
 
     def toggle_history_display(self):
         """Alterna entre exibir todo o histórico ou as últimas 5 entradas"""
@@ -680,65 +804,33 @@ class TimeTrackerApp:
     def apply_date_filter(self):
         """Aplica filtro de data no histórico"""
         date_str = self.date_filter_var.get()
-        self.clear_history_content()
         if not date_str:
             self.load_history()
             return
         try:
             filter_date = datetime.strptime(date_str, "%d/%m/%Y")
-            with open(resource_path(self.filename), mode="r", encoding="utf-8") as file:
-                reader = csv.reader(file)
-                next(reader)
-                for row in reader:
-                    if len(row) >= 4:
-                        row_date = datetime.strptime(row[0], "%d/%m/%Y")
-                        if row_date.date() == filter_date.date():
-                            self.add_history_entry(row[0], row[1], row[2], row[3])
         except ValueError:
             messagebox.showerror(t("invalid_date"), t("invalid_date_format"))
+            return
+        self.load_history_rows(self.history_store.rows_for_date, filter_date.date())
 
     def update_usage_reports(self, app_query=None):
         """Atualiza os relatórios de tempo de uso diário, semanal e mensal para o app filtrado (ou todos)."""
-        import calendar
-        from datetime import timedelta
-        if not os.path.exists(resource_path(self.filename)):
-            for text_lbl, time_lbl in self.usage_report_labels:
-                text_lbl.configure(text="")
-                time_lbl.configure(text="")
+        if self.history_importing:
             return
-        now = datetime.now()
-        today = now.date()
-        week_start = today - timedelta(days=today.weekday())
-        month_start = today.replace(day=1)
-        total_day = 0
-        total_week = 0
-        total_month = 0
+        self.worker.submit("usage_reports", self.compute_usage_totals, app_query, on_done=self.show_usage_reports)
+
+    def compute_usage_totals(self, app_query=None):
+        """Minutos de uso hoje, na semana e no mês (roda no worker)"""
+        today = datetime.now().date()
         app_query = (app_query or '').strip().lower()
-        with open(resource_path(self.filename), mode="r", encoding="utf-8") as file:
-            reader = csv.reader(file)
-            next(reader)
-            for row in reader:
-                if len(row) < 4:
-                    continue
-                row_date = None
-                try:
-                    row_date = datetime.strptime(row[0], "%d/%m/%Y").date()
-                except Exception:
-                    continue
-                app_name = row[2].lower()
-                if app_query and app_query not in app_name:
-                    continue
-                try:
-                    h, m, s = map(int, str(row[3]).split(':'))
-                    minutes = h*60 + m + s/60
-                except Exception:
-                    minutes = 0
-                if row_date == today:
-                    total_day += minutes
-                if week_start <= row_date <= today:
-                    total_week += minutes
-                if month_start <= row_date <= today:
-                    total_month += minutes
+        # Consulta apenas os buckets diários do período (mês ou semana, o que começar antes)
+        daily = self.history_store.daily_seconds(usage_window_start(today), today, app_query)
+        return tuple(sec / 60 for sec in usage_totals(daily, today))
+
+    def show_usage_reports(self, totals):
+        """Exibe os totais calculados por compute_usage_totals"""
+        total_day, total_week, total_month = totals
         def fmt(mins):
             h = int(mins // 60)
             m = int(mins % 60)
@@ -758,25 +850,64 @@ class TimeTrackerApp:
     def apply_app_filter(self):
         """Filtra o histórico pelo nome do app (parcial ou completo) e atualiza relatórios."""
         app_query = self.app_filter_var.get().strip().lower()
-        self.clear_history_content()
-        self.update_usage_reports(app_query)
         if not app_query:
             self.load_history()
             return
-        if os.path.exists(resource_path(self.filename)):
-            with open(resource_path(self.filename), mode="r", encoding="utf-8") as file:
-                reader = csv.reader(file)
-                next(reader)
-                for row in reader:
-                    if len(row) >= 4 and app_query in row[2].lower():
-                        self.add_history_entry(row[0], row[1], row[2], row[3])
+        self.update_usage_reports(app_query)
+        self.load_history_rows(self.history_store.rows_matching_app, app_query)
+
+    def export_history_file(self):
+        """Exporta o histórico entre as datas De/Até (inclusive) e do app filtrado em CSV, NDJSON ou Parquet"""
+        if self.history_importing:
+            messagebox.showinfo(t("export"), t("importing_history"))
+            return
+        bounds = []
+        for var in (self.export_start_var, self.export_end_var):
+            date_str = var.get().strip()
+            try:
+                bounds.append(datetime.strptime(date_str, "%d/%m/%Y").date() if date_str else None)
+            except ValueError:
+                messagebox.showerror(t("invalid_date"), t("invalid_date_format"))
+                return
+        start, end = bounds
+        if start and end and start > end:
+            messagebox.showerror(t("invalid_date"), t("invalid_date_range"))
+            return
+        path = filedialog.asksaveasfilename(
+            defaultextension=".csv", initialfile="time_history_export.csv",
+            filetypes=[("CSV", "*.csv"), ("NDJSON", "*.ndjson"), ("Parquet", "*.parquet")])
+        if not path:
+            return
+        from history_export import export_history
+        app_query = self.app_filter_var.get().strip() or None
+        # Grava direto do cursor do banco, no worker: a memória não cresce com o histórico
+        self.worker.submit(
+            "export", export_history, self.history_store.db_path, path, None, start, end, app_query,
+            on_done=lambda count: messagebox.showinfo(t("export"), t("export_done", count=count, path=path)),
+            on_error=lambda e: messagebox.showerror(t("error"), str(e)))
+
+    def schedule_history_compaction(self):
+        """Consolida o histórico antigo no worker; com --connect quem faz isso é o serviço"""
+        if not self.owns_engine or self.compact_after_days <= 0:
+            return
+        archive_path = resource_path(ARCHIVE_FILE) if self.archive_compacted else None
+        self.worker.submit("compact", self.engine.compact_history, self.compact_after_days, archive_path,
+                           on_done=lambda removed: self.load_history() if removed else None)
 
     def clear_history_content(self):
         """Limpa o conteúdo do histórico"""
-        for widget in self.history_content.winfo_children():
-            widget.destroy()
+        self.history_content.clear()
+
+    def sync_history_version(self):
+        """Com --connect, o serviço pode ter gravado ou compactado o histórico: relê a versão"""
+        if self.owns_engine:
+            return False
+        old_version = self.history_store.version
+        return self.history_store.refresh() != old_version
 
     def show_history(self):
+        if self.sync_history_version():
+            self.load_history()
         self.page_main.pack_forget()
         self.page_settings.pack_forget()
         self.page_stats.pack_forget()
@@ -794,6 +925,40 @@ class TimeTrackerApp:
         self.page_stats.pack_forget()
         self.page_history.pack_forget()
         self.page_settings.pack(fill="both", expand=True)
+        self.refresh_diagnostics()
+
+    def toggle_diagnostics(self):
+        """Liga/desliga a coleta de latências do track_time (vale na hora, sem salvar)"""
+        self.configure_engine()
+        self.refresh_diagnostics()
+
+    def refresh_diagnostics(self):
+        if hasattr(self, 'diagnostics_label'):
+            self.engine_worker.submit(
+                "diagnostics", self.engine.diagnostics,
+                on_done=lambda snapshot: self.diagnostics_label.configure(text=format_summary(snapshot)),
+                on_error=self.show_diagnostics_error)
+
+    def show_diagnostics_error(self, error):
+        self.diagnostics_label.configure(text=str(error))
+
+    def reset_diagnostics(self):
+        self.engine_worker.submit("reset_diagnostics", self.engine.reset_diagnostics,
+                                  on_done=lambda _: self.refresh_diagnostics(), on_error=self.show_diagnostics_error)
+
+    def dump_diagnostics(self):
+        """Salva histogramas e contadores em um arquivo JSON escolhido pelo usuário"""
+        path = filedialog.asksaveasfilename(defaultextension=".json", initialfile="tracker_diagnostics.json",
+                                            filetypes=[("JSON", "*.json")])
+        if not path:
+            return
+        self.engine_worker.submit("dump_diagnostics", self.write_diagnostics, path,
+                                  on_done=lambda _: None, on_error=lambda e: messagebox.showerror(t("error"), str(e)))
+
+    def write_diagnostics(self, path):
+        """Roda no engine_worker: pede o diagnóstico ao motor e grava o JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.engine.diagnostics(), f, indent=4)
 
     def show_main_page(self):
         self.page_settings.pack_forget()
@@ -875,7 +1040,30 @@ class TimeTrackerApp:
             messagebox.showerror(t("invalid_check_interval"), t("invalid_check_interval_msg"))
             return
 
+        # Validar max_check_interval (não pode ser menor que o intervalo mínimo)
+        try:
+            max_check_interval = float(self.max_check_interval_var.get())
+            if max_check_interval < self.check_interval:
+                raise ValueError(t("invalid_max_check_interval_msg"))
+            self.max_check_interval = max_check_interval
+        except (ValueError, TypeError):
+            messagebox.showerror(t("invalid_check_interval"), t("invalid_max_check_interval_msg"))
+            return
+
+        # Validar compact_after_days (inteiro, 0 desliga)
+        try:
+            compact_after_days = int(self.compact_after_days_var.get())
+            if compact_after_days < 0:
+                raise ValueError(t("invalid_compact_after_days_msg"))
+        except ValueError:
+            messagebox.showerror(t("error"), t("invalid_compact_after_days_msg"))
+            return
+        self.compact_after_days = compact_after_days
+        self.archive_compacted = self.archive_compacted_var.get()
+        self.configure_engine()
+
         # Desregistra atalhos antigos
+        import keyboard
         for shortcut in self.shortcuts.values():
             try:
                 keyboard.remove_hotkey(shortcut)
@@ -891,8 +1079,12 @@ class TimeTrackerApp:
             "resizable": self.resizable,
             "idle_threshold": self.idle_threshold,
             "check_interval": self.check_interval,
+            "max_check_interval": self.max_check_interval,
+            "compact_after_days": self.compact_after_days,
+            "archive_compacted": self.archive_compacted,
             "close_to_tray": self.close_to_tray_var.get(),
             "auto_compact_mode": self.auto_compact_mode_var.get(),
+            "diagnostics_enabled": self.diagnostics_var.get(),
             "language": self.language  # Salva idioma
         }
         try:
@@ -904,6 +1096,7 @@ class TimeTrackerApp:
 
     def register_shortcuts(self):
         """Registra os atalhos de teclado com base nas configurações atuais."""
+        import keyboard
         try:
             for key, shortcut in self.shortcuts.items():
                 if shortcut:
@@ -991,6 +1184,7 @@ class TimeTrackerApp:
         self.compact_btn_compact.bind("<B1-Motion>", do_move)
 
     def update_timer_color(self):
+        self.publish_tray_state()
         if self.running:
             self.timer_label.configure(text_color="#1ABC9C")
         else:
@@ -1003,174 +1197,68 @@ class TimeTrackerApp:
                 self.compact_timer_label.configure(text_color="#EA697B")
 
     def update_stats_dashboard(self):
-        """Cria e exibe o dashboard de estatísticas com barra de rolagem, gráfico de pizza e filtro por app."""
-        for widget in self.page_stats.winfo_children():
-            widget.destroy()
-
-        # Frame rolável
-        scroll_frame = ctk.CTkScrollableFrame(self.page_stats, fg_color="transparent", label_text="")
-        scroll_frame.pack(fill="both", expand=True, padx=0, pady=0)
-
-        # Novo: Frame para título e botão voltar
-        title_stats_frame = ctk.CTkFrame(scroll_frame, fg_color="transparent")
-        title_stats_frame.pack(fill="x", pady=(35, 10), padx=0)
-        back_btn = ctk.CTkButton(
-            title_stats_frame,
-            text=f"‹ {t('back')}",
-            width=80,
-            fg_color="#6b7280",
-            hover_color="#374151",
-            text_color="#FFFFFF",
-            font=("Arial", 12, "bold"),
-            command=self.show_main_page
-        )
-        back_btn.pack(side="left", padx=(0, 0), pady=0)
-        # Label "Statistics" alinhado à esquerda, após o botão, com padding
-        ctk.CTkLabel(title_stats_frame, text=t("statistics"), font=("Arial", 18, "bold"), text_color="#22d3ee").pack(side="left", padx=(90,0))
-
-
+        """Atualiza o dashboard de estatísticas (gráfico de pizza, linhas e filtro por app)."""
         # Variável para filtro múltiplo
-        import tkinter as tk
-        self.stats_app_filter_var = getattr(self, 'stats_app_filter_var', None)
         self.stats_app_filter_selected = getattr(self, 'stats_app_filter_selected', [])
+        self.sync_history_version()  # O cache de estatísticas é indexado pela versão
+        # matplotlib e NumPy só são carregados na primeira abertura das estatísticas
+        from stats_engine import StatsCache
+        from stats_view import StatsDashboard
+        if self.stats_cache is None:
+            self.stats_cache = StatsCache()  # Snapshots por versão do histórico + apps filtrados
+        # A página é montada uma vez; depois só os dados e artistas são atualizados
+        if getattr(self, 'stats_dashboard', None) is None or self.stats_dashboard.page is not self.page_stats:
+            self.stats_dashboard = StatsDashboard(self.page_stats, t, self.show_main_page, self.apply_stats_app_filter)
+        dashboard = self.stats_dashboard
+        selected_apps = list(self.stats_app_filter_selected)
+        if self.history_importing:
+            dashboard.show_status(t("importing_history"))
+            return
+        dashboard.show_status(t("loading"))
+        # Leitura e agregação no worker; o Tk só atualiza os widgets quando o resultado chega
+        self.worker.submit(
+            "stats", self.compute_dashboard_stats, selected_apps,
+            on_done=lambda stats: dashboard.update(stats, selected_apps),
+            on_error=lambda e: dashboard.show_status(f"{t('error')} {e}"))
+
+    def apply_stats_app_filter(self, selected_apps):
+        """Aplica o filtro múltiplo de apps do dashboard"""
+        self.stats_app_filter_selected = selected_apps
+        self.update_stats_dashboard()
 
-        try:
-            if not os.path.exists(resource_path(self.filename)) or os.path.getsize(resource_path(self.filename)) < 20:
-                ctk.CTkLabel(scroll_frame, text=t("no_history")).pack(pady=20)
-                ctk.CTkButton(scroll_frame, text=t("back"), command=self.show_main_page).pack(pady=10)
-                return
-
-            df = pd.read_csv(resource_path(self.filename), header=0, engine='python')
-            if df.empty:
-                ctk.CTkLabel(scroll_frame, text=t("no_history")).pack(pady=20)
-                ctk.CTkButton(scroll_frame, text=t("back"), command=self.show_main_page).pack(pady=10)
-                return
-
-            def duration_to_minutes(duration_str):
-                try:
-                    h, m, s = map(int, str(duration_str).split(':'))
-                    return (h * 60) + m + (s / 60)
-                except (ValueError, AttributeError):
-                    return 0
-
-            df['MINUTES'] = df['DURATION'].apply(duration_to_minutes)
-            df['DATE'] = pd.to_datetime(df['DATE'], format='%d/%m/%Y')
-
-
-            # Listbox de filtro múltiplo de apps
-            app_list = sorted(df['APP'].unique())
-
-            # Frame com borda arredondada para filtro e Listbox
-            filter_frame = ctk.CTkFrame(scroll_frame, corner_radius=5, fg_color="#323b4c")
-            filter_frame.pack(fill="x", padx=20, pady=(0, 10), anchor="w")
-
-            # Label acima do Listbox
-            ctk.CTkLabel(filter_frame, text=t("total_time_by_app"), font=("Arial", 12, "bold"), text_color="white", fg_color="transparent").pack(side="top", anchor="w", padx=(5, 0), pady=(5, 0))
-
-            # Listbox nativo do tkinter para múltipla seleção, com customização de cores
-            listbox_frame = tk.Frame(filter_frame, bg="#323b4c")
-            listbox_frame.pack(side="top", anchor="w", pady=(5, 5), padx=(5, 0))
-            # Calcula largura dinâmica para Listbox (aproximação)
-            listbox_width = max(28, min(60, int(self.page_stats.winfo_width() / 8)))
-            app_listbox = tk.Listbox(
-                listbox_frame,
-                selectmode="multiple",
-                exportselection=False,
-                height=min(8, len(app_list)),
-                width=listbox_width,
-                bg="#323b4c",
-                fg="white",
-                selectbackground="#444b5a",
-                selectforeground="white",
-                highlightthickness=0,
-                relief="flat",
-                borderwidth=0,
-                font=("Arial", 11)
-            )
-            for idx, app in enumerate(app_list):
-                app_listbox.insert(tk.END, app)
-                # Seleciona apps previamente filtrados
-                if app in self.stats_app_filter_selected:
-                    app_listbox.selection_set(idx)
-            app_listbox.pack(side="left", fill="x", expand=True)
-
-            def apply_multi_app_filter():
-                self.stats_app_filter_selected = [app_list[int(i)] for i in app_listbox.curselection()]
-                self.update_stats_dashboard()
-
-            apply_btn = ctk.CTkButton(filter_frame, text=t("apply"), width=60, command=apply_multi_app_filter)
-            apply_btn.pack(side="left", padx=(10,0))
-
-            # Filtrar DataFrame se apps selecionados
-            selected_apps = self.stats_app_filter_selected
-            if selected_apps:
-                df = df[df['APP'].isin(selected_apps)]
-
-            app_usage = df.groupby('APP')['MINUTES'].sum().sort_values(ascending=True)
-            daily_avg = df.groupby(df['DATE'].dt.date)['MINUTES'].sum().mean()
-            total_time = app_usage.to_dict()
-
-            # Exibir estatísticas textuais
-            stats_frame = ctk.CTkFrame(scroll_frame)
-            stats_frame.pack(fill="x", padx=20, pady=10)
-            # Formatar média diária para HH:MM:SS
-            if pd.notnull(daily_avg):
-                total_seconds = int(daily_avg * 60)
-                h = total_seconds // 3600
-                m = (total_seconds % 3600) // 60
-                s = total_seconds % 60
-                daily_avg_str = f"{h:02d}:{m:02d}:{s:02d}"
-            else:
-                daily_avg_str = "00:00:00"
-            ctk.CTkLabel(stats_frame, text=t("daily_average", minutes=daily_avg_str), font=("Arial", 12)).pack(anchor="w", pady=5)
-            # Lista de apps e tempos
-            for app, minutes in total_time.items():
-                ctk.CTkLabel(stats_frame, text=f"{app}: {minutes:.1f} minutes", font=("Arial", 12)).pack(anchor="w", padx=20)
-
-
-            plt.style.use('dark_background')
-            plt.rcParams.update({'font.size': 11})
-            # Pie chart em primeiro, depois Line chart
-            fig, axs = plt.subplots(2, 1, figsize=(10, 8), dpi=100, facecolor='#232b3b', gridspec_kw={'height_ratios': [1, 1]})
-            ax1, ax2 = axs
-
-            # Pie Chart (primeiro)
-            if len(app_usage) > 0 and app_usage.sum() > 0:
-                colors = plt.cm.Set3.colors if len(app_usage) <= 12 else None
-                ax1.pie(app_usage, labels=app_usage.index, autopct='%1.1f%%', startangle=140, colors=colors, textprops={'color': 'white', 'fontsize': 11})
-                ax1.set_title(t("pie_chart_title") if 'pie_chart_title' in TRANSLATIONS.get(TimeTrackerApp.current_language, {}) else "Usage Distribution (Pie)", color='white', fontsize=11)
-                ax1.set_facecolor('#232b3b')
-            else:
-                ax1.axis('off')
-
-            # Line Chart (segundo)
-            for app in df['APP'].unique():
-                app_data = df[df['APP'] == app]['MINUTES']
-                ax2.plot(app_data.index, app_data.values, label=app)
-            ax2.set_title(t("app_usage_over_time"), color='white', fontsize=11)
-            ax2.set_xlabel('Date', color='white', fontsize=11)
-            ax2.set_ylabel('Minutes', color='white', fontsize=11)
-            ax2.tick_params(colors='white', labelsize=11, rotation=45)
-            ax2.legend(loc='upper left', facecolor='#232b3b', edgecolor='white', labelcolor='white', fontsize=11)
-            ax2.set_facecolor('#232b3b')
-
-            fig.tight_layout(pad=2.0)
-            canvas = FigureCanvasTkAgg(fig, master=scroll_frame)
-            canvas.draw()
-            canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
-
-        except Exception as e:
-            ctk.CTkLabel(scroll_frame, text=f"{t('error')} {e}").pack(pady=20)
-
-        # Botão back removido do final da página (agora está no topo ao lado do título)
+    def compute_dashboard_stats(self, selected_apps):
+        """Carrega as colunas do histórico e calcula as estatísticas (roda no worker)"""
+        from stats_engine import compute_stats
+        cached = self.stats_cache.get(self.history_store.version, selected_apps)
+        if cached is not None:
+            return cached
+        # Colunas binárias mapeadas em memória: nenhuma data ou duração em texto é analisada
+        version, (days, seconds, app_ids, app_names) = self.history_store.columns_snapshot()
+        if len(days) == 0:
+            return None
+        stats = compute_stats(days, seconds, app_ids, app_names, selected_apps)
+        self.stats_cache.put(version, selected_apps, stats)
+        return stats
 
     def setup_tray_thread(self):
         if not hasattr(self, 'tray_thread') or not self.tray_thread.is_alive():
             self.tray_thread = threading.Thread(target=self.setup_tray, daemon=True)
             self.tray_thread.start()
 
+    def publish_tray_state(self):
+        """Entrega à thread da bandeja o texto do timer (chamado na thread do Tk)"""
+        state = (self.timer_var.get(), self.running)
+        with self._tray_changed:
+            if state != self._tray_state:
+                self._tray_state = state
+                self._tray_changed.notify_all()
+
     def setup_tray(self):
-        initial_image = self._generate_timer_icon_image()
+        import pystray
+        from tray_icon import TrayIconRenderer
+        if self._tray_renderer is None:
+            self._tray_renderer = TrayIconRenderer()
+        initial_image = self._generate_timer_icon_image(*self._tray_state)
         menu = (
             pystray.MenuItem("Show", self.restore_from_tray, default=True),
             pystray.MenuItem("Exit", self.on_close)
@@ -1181,20 +1269,37 @@ class TimeTrackerApp:
         self.tray_icon.run()
 
     def _update_tray_icon_periodically(self):
-        while self.tray_icon_update_running:
-            if hasattr(self, 'tray_icon') and self.tray_icon.visible:
-                new_image = self._generate_timer_icon_image()
-                full_timer_str = self.timer_var.get()
-                tooltip_text = f"TimeTracker\n{full_timer_str}"
-                try:
-                    self.tray_icon.icon = new_image
-                    self.tray_icon.title = tooltip_text
-                except Exception as e:
-                    print(f"Error updating timer icon: {e}")
-            time.sleep(1)
+        from tray_icon import icon_text
+        shown_state = None
+        shown_icon = None
+        while True:
+            with self._tray_changed:
+                # Acorda só quando o timer muda ou a bandeja é fechada
+                self._tray_changed.wait_for(
+                    lambda: not self.tray_icon_update_running or self._tray_state != shown_state)
+                if not self.tray_icon_update_running:
+                    return
+                shown_state = self._tray_state
+            if not (hasattr(self, 'tray_icon') and self.tray_icon.visible):
+                continue  # Ícone ainda não visível: tenta de novo na próxima mudança
+            timer_str, is_running = shown_state
+            icon_key = (icon_text(timer_str), is_running)
+            try:
+                # Com horas, o ícone mostra HH:MM e só muda uma vez por minuto
+                if icon_key != shown_icon:
+                    self.tray_icon.icon = self._generate_timer_icon_image(timer_str, is_running)
+                    shown_icon = icon_key
+                self.tray_icon.title = f"TimeTracker\n{timer_str}"
+            except Exception as e:
+                print(f"Error updating timer icon: {e}")
+
+    def stop_tray_icon_updates(self):
+        with self._tray_changed:
+            self.tray_icon_update_running = False
+            self._tray_changed.notify_all()
 
     def restore_from_tray(self, icon=None, item=None):
-        self.tray_icon_update_running = False
+        self.stop_tray_icon_updates()
         self.tray_icon.stop()
         self.root.after(0, self.root.deiconify)
         self.root.after(100, lambda: self.root.attributes('-topmost', self.always_on_top))
@@ -1204,9 +1309,15 @@ class TimeTrackerApp:
         self.setup_tray_thread()
 
     def on_close(self, icon=None, item=None):
-        self.tray_icon_update_running = False
-        self.tray_icon.stop()
+        self.stop_tray_icon_updates()
+        if hasattr(self, 'tray_icon'):
+            self.tray_icon.stop()
         self.running = False
+        # Motor local: a sessão aberta fica no journal; serviço externo: só a conexão é fechada
+        self.engine_worker.shutdown()
+        self.engine.close()
+        self.worker.shutdown()
+        self.history_store.close()
         self.root.quit()
 
     def handle_close(self):
@@ -1215,31 +1326,10 @@ class TimeTrackerApp:
         else:
             self.on_close()
 
-    def _generate_timer_icon_image(self):
-        timer_str = self.timer_var.get()
-        is_running = self.running
-        parts = timer_str.split(':')
-        hours = int(parts[0])
-        minutes = int(parts[1])
-        seconds = int(parts[2])
-        if hours > 0:
-            display_text = f"{hours:02d}:{minutes:02d}"
-        else:
-            display_text = f"{minutes:02d}:{seconds:02d}"
-        img_size = (64, 64)
-        text_color = '#1ABC9C' if is_running else '#EA697B'
-        image = Image.new('RGBA', img_size, (0, 0, 0, 0))
-        d = ImageDraw.Draw(image)
-        try:
-            font_size = 24
-            font = ImageFont.truetype("arial.ttf", font_size)
-        except IOError:
-            font = ImageFont.load_default()
-        left, top, right, bottom = d.textbbox((0, 0), display_text, font=font)
-        x_draw = (img_size[0] - (right - left)) / 2
-        y_draw = (img_size[1] - (bottom - top)) / 2
-        d.text((x_draw, y_draw), display_text, fill=text_color, font=font)
-        return image
+    def _generate_timer_icon_image(self, timer_str, is_running):
+        from tray_icon import icon_text
+        # Fonte carregada uma vez e imagens em cache por (texto, rodando)
+        return self._tray_renderer.render(icon_text(timer_str), is_running)
 
     def on_language_change(self, event=None):
         # Descobre a chave do idioma pelo valor
@@ -1278,6 +1368,9 @@ class TimeTrackerApp:
         elif hasattr(self, 'page_history') and self.page_history.winfo_ismapped():
             visible_page = 'history'
         # Destroi todos os frames principais
+        if getattr(self, 'stats_dashboard', None) is not None:
+            self.stats_dashboard.destroy()
+            self.stats_dashboard = None
         for attr in ['page_main', 'page_settings', 'page_stats', 'page_history', 'nav_frame']:
             if hasattr(self, attr):
                 try:
@@ -1295,7 +1388,23 @@ class TimeTrackerApp:
         elif visible_page == 'history':
             self.show_history()
 
+def report_startup_time(root):
+    """Mostra quanto tempo levou até a janela principal ser desenhada"""
+    root.update_idletasks()
+    print(f"Startup time: {(time.perf_counter() - _STARTED_AT) * 1000:.0f} ms", file=sys.stderr)
+
+
 if __name__ == "__main__":
+    engine = None
+    if "--connect" in sys.argv:
+        # Interface como cliente do serviço headless (python tracking_service.py)
+        try:
+            engine = TrackingClient.from_service_file(resource_path(SERVICE_FILE))
+            engine.status()
+        except (OSError, ValueError, KeyError) as e:
+            sys.exit(f"Tracking service not available: {e}")
     root = ctk.CTk()
-    app = TimeTrackerApp(root)
+    app = TimeTrackerApp(root, engine)
+    if "--startup-time" in sys.argv:
+        root.after_idle(report_startup_time, root)
     root.mainloop()
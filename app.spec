@@ -1,4 +1,20 @@
 # -*- mode: python ; coding: utf-8 -*-
+import sys
+
+# ONEFILE=False gera uma pasta (dist/app) em vez de um único .exe: nada precisa
+# ser descompactado a cada execução, então a janela abre bem mais rápido.
+ONEFILE = True
+# Remove módulos que o app não usa, mas que entram no build por dependências
+# opcionais de matplotlib/NumPy/Pillow (outros backends gráficos, pandas, testes).
+TRIM_MODULES = True
+TRIMMED_MODULES = [
+    'pandas', 'scipy', 'IPython', 'jupyter_client', 'tornado', 'pytest',
+    'PyQt5', 'PyQt6', 'PySide2', 'PySide6', 'wx',
+    'tkinter.test', 'lib2to3', 'pydoc_data',
+]
+if sys.platform == 'win32':
+    # No Linux o ícone da bandeja (pystray, backends appindicator/gtk) usa o gi
+    TRIMMED_MODULES.append('gi')
 
 
 a = Analysis(
@@ -10,7 +26,7 @@ a = Analysis(
     hookspath=[],
     hooksconfig={},
     runtime_hooks=[],
-    excludes=[],
+    excludes=TRIMMED_MODULES if TRIM_MODULES else [],
     noarchive=False,
     optimize=0,
 )
@@ -19,9 +35,9 @@ pyz = PYZ(a.pure)
 exe = EXE(
     pyz,
     a.scripts,
-    a.binaries,
-    a.datas,
+    *([a.binaries, a.datas] if ONEFILE else []),
     [],
+    exclude_binaries=not ONEFILE,
     name='app',
     debug=False,
     bootloader_ignore_signals=False,
@@ -36,3 +52,14 @@ exe = EXE(
     codesign_identity=None,
     entitlements_file=None,
 )
+
+if not ONEFILE:
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=False,
+        upx=True,
+        upx_exclude=[],
+        name='app',
+    )
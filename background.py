@@ -0,0 +1,54 @@
+from concurrent.futures import ThreadPoolExecutor
+
+
+class BackgroundWorker:
+    """Executa trabalho pesado fora da thread do Tk e devolve o resultado via root.after.
+
+    Cada tarefa tem uma chave ("history", "stats"...). Submeter de novo com a
+    mesma chave torna a tarefa anterior obsoleta: ela é cancelada se ainda não
+    começou e, se já terminou, seu resultado é descartado.
+    """
+
+    def __init__(self, root, max_workers=2):
+        self.root = root
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="worker")
+        self._generations = {}
+        self._futures = {}
+
+    def submit(self, key, func, *args, on_done, on_error=None):
+        self.cancel(key)
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        future = self._executor.submit(func, *args)
+        self._futures[key] = future
+        future.add_done_callback(
+            lambda f: self._post(self._deliver, key, generation, f, on_done, on_error))
+        return future
+
+    def cancel(self, key):
+        """Descarta a tarefa pendente com essa chave."""
+        self._generations[key] = self._generations.get(key, 0) + 1
+        future = self._futures.pop(key, None)
+        if future is not None:
+            future.cancel()
+
+    def _post(self, *args):
+        try:
+            self.root.after(0, *args)
+        except RuntimeError:
+            pass  # Mainloop já encerrado
+
+    def _deliver(self, key, generation, future, on_done, on_error):
+        if self._generations.get(key) != generation or future.cancelled():
+            return  # Resultado obsoleto: o usuário já pediu outra coisa
+        self._futures.pop(key, None)
+        error = future.exception()
+        if error is None:
+            on_done(future.result())
+        elif on_error is not None:
+            on_error(error)
+        else:
+            print(f"Background task '{key}' failed: {error}")
+
+    def shutdown(self):
+        self._executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,246 @@
+"""Benchmark dos caminhos de histórico e estatísticas, sem interface.
+
+Gera históricos sintéticos (linhas x apps distintos x tamanho do título),
+abre o HistoryStore e executa os métodos reais do TimeTrackerApp com a
+camada de widgets trocada por stubs e o worker rodando de forma síncrona:
+load_history, apply_date_filter, apply_app_filter, update_usage_reports e
+a agregação de update_stats_dashboard (compute_dashboard_stats, com e sem
+cache). Para cada operação reporta tempo, linhas/s e pico de memória
+(tracemalloc, em uma execução separada da cronometrada).
+
+    python benchmarks/history_benchmark.py --rows 1000 100000 1000000 --apps 20 2000 --output history.json
+"""
+import argparse
+import gc
+import itertools
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+
+from startup_benchmark import DATA_FILES, REPO_DIR
+from synthetic_history import write_history
+
+
+class SyncWorker:
+    """Substitui o BackgroundWorker: executa a tarefa na hora e chama on_done."""
+
+    def submit(self, key, func, *args, on_done, on_error=None):
+        on_done(func(*args))
+
+    def cancel(self, key):
+        pass
+
+    def shutdown(self):
+        pass
+
+
+class StubWidget:
+    """Aceita qualquer chamada de widget e não faz nada."""
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: None
+
+
+class StubVar:
+    def __init__(self, value=""):
+        self.value = value
+
+    def get(self):
+        return self.value
+
+    def set(self, value):
+        self.value = value
+
+
+class RecordingHistoryList:
+    """No lugar do VirtualHistoryList: só guarda as linhas recebidas."""
+
+    def __init__(self):
+        self.rows = []
+
+    def set_rows(self, rows):
+        self.rows = rows
+
+    def append_row(self, row):
+        self.rows.append(row)
+
+    def show_placeholder(self, text):
+        self.rows = []
+
+    def clear(self):
+        self.rows = []
+
+
+def make_tracker(app, history_store):
+    """TimeTrackerApp sem __init__: só o estado usado pelos caminhos medidos."""
+    from stats_engine import StatsCache
+    tracker = app.TimeTrackerApp.__new__(app.TimeTrackerApp)
+    tracker.worker = SyncWorker()
+    tracker.history_store = history_store
+    tracker.history_importing = False
+    tracker.stats_cache = StatsCache()
+    tracker.history_content = RecordingHistoryList()
+    tracker.usage_report_labels = [(StubWidget(), StubWidget()) for _ in range(3)]
+    tracker.app_filter_var = StubVar()
+    tracker.date_filter_var = StubVar()
+    tracker.show_full_history = True
+    return tracker
+
+
+def measure(func, repeat):
+    """Tempo (mediana e mínimo, ms) de `repeat` execuções e pico do tracemalloc em mais uma."""
+    times = []
+    for _ in range(repeat):
+        gc.collect()
+        start = time.perf_counter()
+        result = func()
+        times.append((time.perf_counter() - start) * 1000)
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, {
+        "median_ms": statistics.median(times),
+        "min_ms": min(times),
+        "peak_mib": peak / 2 ** 20,
+    }
+
+
+def run_case(rows, apps, title_length, repeat):
+    import app
+    from history_store import HistoryStore
+
+    workdir = tempfile.mkdtemp(prefix="history-bench-")
+    try:
+        csv_path = os.path.join(workdir, "time_history.csv")
+        names = write_history(csv_path, rows, apps=apps, title_length=title_length)
+        results = {}
+
+        # Primeira abertura: importa o CSV para o SQLite e monta a cópia colunar
+        start = time.perf_counter()
+        store = HistoryStore(os.path.join(workdir, "time_history.db"), csv_path,
+                             columnar_dir=os.path.join(workdir, "time_history.cols"))
+        import_ms = (time.perf_counter() - start) * 1000
+        results["import_csv"] = {"median_ms": import_ms, "min_ms": import_ms,
+                                 "rows_per_s": rows / (import_ms / 1000) if import_ms else None}
+
+        tracker = make_tracker(app, store)
+        middle_day = store.all_rows()[rows // 2][0] if rows else ""
+        app_query = names[len(names) // 2].lower()
+        selected_apps = names[:3]
+
+        def load_history():
+            tracker.load_history()
+            return len(tracker.history_content.rows)
+
+        def apply_date_filter():
+            tracker.date_filter_var.set(middle_day)
+            tracker.apply_date_filter()
+            return len(tracker.history_content.rows)
+
+        def apply_app_filter():
+            tracker.app_filter_var.set(app_query)
+            tracker.apply_app_filter()
+            tracker.app_filter_var.set("")
+            return len(tracker.history_content.rows)
+
+        def update_usage_reports():
+            tracker.update_usage_reports(None)
+            return rows
+
+        def stats_cold():
+            tracker.stats_cache.clear()
+            return tracker.compute_dashboard_stats([])
+
+        def stats_filtered_cold():
+            tracker.stats_cache.clear()
+            return tracker.compute_dashboard_stats(selected_apps)
+
+        def stats_cached():
+            return tracker.compute_dashboard_stats([])
+
+        operations = [
+            ("load_history", load_history),
+            ("apply_date_filter", apply_date_filter),
+            ("apply_app_filter", apply_app_filter),
+            ("update_usage_reports", update_usage_reports),
+            ("stats_aggregation", stats_cold),
+            ("stats_aggregation_filtered", stats_filtered_cold),
+            ("stats_aggregation_cached", stats_cached),
+        ]
+        for name, func in operations:
+            if func is stats_cached:
+                # A operação anterior limpou o cache: aquece antes, para nenhuma execução medida ser fria
+                tracker.compute_dashboard_stats([])
+            returned, timing = measure(func, repeat)
+            if isinstance(returned, int):
+                timing["rows_returned"] = returned
+            # Vazão sobre o histórico inteiro, que é o que cada caminho precisa percorrer no pior caso
+            timing["rows_per_s"] = rows / (timing["median_ms"] / 1000) if timing["median_ms"] else None
+            results[name] = timing
+        store.close()
+        return results
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def peak_rss_mib():
+    try:
+        import resource
+    except ImportError:
+        return None  # Windows
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / 2 ** 20 if sys.platform == "darwin" else peak / 2 ** 10
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--apps", type=int, nargs="+", default=[20], help="distinct apps (app cardinality)")
+    parser.add_argument("--title-length", type=int, nargs="+", default=[24], help="app title lengths")
+    parser.add_argument("--repeat", type=int, default=3, help="timed runs per operation")
+    parser.add_argument("--output", default="history_results.json")
+    args = parser.parse_args()
+    output = os.path.abspath(args.output)
+    cwd = os.getcwd()
+
+    # app.py carrega o tema e as traduções do diretório atual
+    sys.path.insert(0, REPO_DIR)
+    workdir = tempfile.mkdtemp(prefix="history-bench-data-")
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(REPO_DIR, name), workdir)
+    os.chdir(workdir)
+
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "cases": [],
+    }
+    try:
+        for rows, apps, title_length in itertools.product(args.rows, args.apps, args.title_length):
+            case = run_case(rows, apps, title_length, args.repeat)
+            results["cases"].append({"rows": rows, "apps": apps, "title_length": title_length,
+                                     "operations": case})
+            print(f"{rows} rows, {apps} apps, titles of {title_length} chars:")
+            for name, timing in case.items():
+                peak = f"{timing['peak_mib']:8.1f} MiB" if "peak_mib" in timing else ""
+                print(f"  {name:28s} {timing['median_ms']:10.1f} ms {peak}")
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(workdir, ignore_errors=True)
+    results["peak_rss_mib"] = peak_rss_mib()
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results written to {output}")
+
+
+if __name__ == "__main__":
+    main()
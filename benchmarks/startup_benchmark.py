@@ -0,0 +1,239 @@
+"""Benchmark de inicialização do TimeTrackerApp.
+
+Para cada tamanho de histórico sintético, abre o app em um processo novo
+(com -X importtime) dentro de uma pasta temporária e mede:
+- custo de import de cada módulo importado diretamente por app.py;
+- tempo de cada fase de TimeTrackerApp.__init__;
+- tempo até a primeira pintura da janela e até o histórico aparecer.
+
+A primeira execução de cada tamanho inclui a importação do CSV para o
+SQLite; as seguintes medem a partida normal. Em Linux sem DISPLAY, sobe um
+Xvfb próprio. Fora do Windows, o que só existe lá (ou exige root) é trocado
+por stubs no processo filho: títulos de janela (pygetwindow), o atributo
+-toolwindow, o hook de teclado e os backends de janela/inatividade do motor.
+
+    python benchmarks/startup_benchmark.py --rows 1000 100000 1000000 --output startup.json
+"""
+import argparse
+import json
+import os
+import platform
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+import types
+
+REPO_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+DATA_FILES = ["translations.json", "timetracker_theme.json", "icone.ico"]
+PHASES = ["initialize_csv", "load_settings", "create_interface", "load_history", "register_shortcuts"]
+HISTORY_TIMEOUT = 300.0
+
+
+def timed(timings, name, func):
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            timings[name] = timings.get(name, 0.0) + (time.perf_counter() - start) * 1000
+    return wrapper
+
+
+def timed_class(timings, name, cls):
+    def factory(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return cls(*args, **kwargs)
+        finally:
+            timings[name] = (time.perf_counter() - start) * 1000
+    return factory
+
+
+def stub_platform_backends(app):
+    """Troca as dependências só de Windows (ou que exigem root no Linux) por versões inertes.
+
+    Chamado depois de `import app`, para não tirar esses módulos do custo de import medido.
+    """
+    import tracking_service
+    from idle_detector import IdleDetector
+    from window_watcher import WindowWatcher
+
+    class StubIdleDetector(IdleDetector):
+        def idle_seconds(self):
+            return 0.0
+
+    # Motor sem pygetwindow nem pyautogui/keyboard: janela ativa nenhuma, usuário sempre ativo
+    tracking_service.create_window_watcher = WindowWatcher
+    tracking_service.create_idle_detector = StubIdleDetector
+    keyboard = types.ModuleType("keyboard")
+    keyboard.add_hotkey = keyboard.remove_hotkey = lambda *args, **kwargs: None
+    sys.modules["keyboard"] = keyboard
+    app.TimeTrackerApp.get_window_titles = lambda self: [app.t("choose_app")]
+
+
+def ignore_toolwindow(root):
+    """-toolwindow só existe no Windows; no X11 o Tk o recusa com TclError."""
+    attributes = root.attributes
+
+    def patched(*args, **kwargs):
+        if args[:1] == ("-toolwindow",):
+            return None
+        return attributes(*args, **kwargs)
+    root.attributes = patched
+
+
+def run_app():
+    """Executado no processo filho (cwd = pasta com o histórico sintético)."""
+    started = time.perf_counter()
+    import app
+    timings = {"import_app": (time.perf_counter() - started) * 1000}
+    if sys.platform != "win32":
+        stub_platform_backends(app)
+
+    # load_translations roda no import do módulo; medimos uma chamada extra isolada
+    timed(timings, "load_translations", app.load_translations)()
+    for name in PHASES:
+        setattr(app.TimeTrackerApp, name, timed(timings, name, getattr(app.TimeTrackerApp, name)))
+    # Na primeira execução a importação do CSV roda no worker, depois da janela aparecer
+    app.HistoryStore.finish_opening = timed(timings, "history_finish_opening", app.HistoryStore.finish_opening)
+    app.HistoryStore = timed_class(timings, "open_history_store", app.HistoryStore)
+    history_ready = []
+    show_history_rows = app.TimeTrackerApp.show_history_rows
+
+    def mark_history_ready(self, rows):
+        history_ready.append(time.perf_counter())
+        show_history_rows(self, rows)
+    app.TimeTrackerApp.show_history_rows = mark_history_ready
+
+    root = app.ctk.CTk()
+    if sys.platform != "win32":
+        ignore_toolwindow(root)
+    init_start = time.perf_counter()
+    instance = app.TimeTrackerApp(root)
+    timings["init_total"] = (time.perf_counter() - init_start) * 1000
+
+    # Primeira pintura: janela mapeada e eventos de desenho processados
+    root.wait_visibility(root)
+    root.update()
+    painted = time.perf_counter()
+    painted_wall = time.time()
+    timings["first_paint"] = (painted - started) * 1000
+
+    deadline = painted + HISTORY_TIMEOUT
+    while not history_ready and time.perf_counter() < deadline:
+        root.update()
+        time.sleep(0.005)
+    if history_ready:
+        timings["history_ready"] = (history_ready[0] - started) * 1000
+
+    instance.on_close()
+    root.destroy()
+    print(json.dumps({"timings_ms": timings, "first_paint_wall": painted_wall}))
+
+
+def parse_importtime(stderr, parent="app"):
+    """Custo cumulativo (ms) dos imports diretos de `parent` na saída do -X importtime."""
+    children = []
+    result = {}
+    for line in stderr.splitlines():
+        if not line.startswith("import time:") or "|" not in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|", 2)
+        if not cumulative.strip().isdigit():
+            continue  # Cabeçalho
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        name = name.strip()
+        if depth == 1:
+            children.append((name, int(cumulative) / 1000))
+        elif depth == 0:
+            if name == parent:
+                result = dict(children)
+                result[parent] = int(cumulative) / 1000
+            children = []
+    return result
+
+
+def ensure_display():
+    """Garante um DISPLAY; em Linux headless inicia um Xvfb e devolve o processo."""
+    if not sys.platform.startswith("linux") or os.environ.get("DISPLAY"):
+        return None
+    xvfb = shutil.which("Xvfb")
+    if xvfb is None:
+        sys.exit("No DISPLAY and Xvfb not found: install xvfb or run under xvfb-run.")
+    for number in range(99, 199):
+        if not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+            break
+    process = subprocess.Popen([xvfb, f":{number}", "-screen", "0", "1280x1024x24", "-nolisten", "tcp"],
+                               stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    deadline = time.monotonic() + 10
+    while not os.path.exists(f"/tmp/.X11-unix/X{number}"):
+        if process.poll() is not None or time.monotonic() > deadline:
+            sys.exit("Xvfb failed to start.")
+        time.sleep(0.05)
+    os.environ["DISPLAY"] = f":{number}"
+    return process
+
+
+def prepare_workdir(workdir, rows, apps):
+    from synthetic_history import write_history
+    for name in DATA_FILES:
+        shutil.copy(os.path.join(REPO_DIR, name), workdir)
+    write_history(os.path.join(workdir, "time_history.csv"), rows, apps=apps)
+
+
+def run_child(workdir):
+    env = dict(os.environ, PYTHONPATH=REPO_DIR + os.pathsep + os.environ.get("PYTHONPATH", ""))
+    launched = time.time()
+    proc = subprocess.run([sys.executable, "-X", "importtime", os.path.abspath(__file__), "--child"],
+                          cwd=workdir, env=env, capture_output=True, text=True)
+    if proc.returncode != 0:
+        lines = proc.stderr.strip().splitlines()
+        return {"error": lines[-1] if lines else f"exit code {proc.returncode}"}
+    output = json.loads(proc.stdout.strip().splitlines()[-1])
+    return {
+        "timings_ms": output["timings_ms"],
+        "first_paint_since_launch_ms": (output["first_paint_wall"] - launched) * 1000,
+        "imports_ms": parse_importtime(proc.stderr),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--rows", type=int, nargs="+", default=[1000, 100000, 1000000])
+    parser.add_argument("--apps", type=int, default=20, help="distinct apps in the synthetic history")
+    parser.add_argument("--runs", type=int, default=3, help="launches per size (the first one imports the CSV)")
+    parser.add_argument("--output", default="startup_results.json")
+    parser.add_argument("--child", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.child:
+        run_app()
+        return
+
+    xvfb = ensure_display()
+    results = {
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "python": sys.version.split()[0],
+        "platform": platform.platform(),
+        "sizes": [],
+    }
+    try:
+        for rows in args.rows:
+            with tempfile.TemporaryDirectory() as workdir:
+                prepare_workdir(workdir, rows, args.apps)
+                runs = []
+                for i in range(args.runs):
+                    runs.append(run_child(workdir))
+                    print(f"{rows} rows, run {i + 1}: {json.dumps(runs[-1].get('timings_ms', runs[-1]))}")
+                results["sizes"].append({"rows": rows, "apps": args.apps, "runs": runs})
+    finally:
+        if xvfb is not None:
+            xvfb.terminate()
+    with open(args.output, "w", encoding="utf-8") as f:
+        json.dump(results, f, indent=4)
+    print(f"Results written to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,53 @@
+"""Gera arquivos time_history.csv sintéticos no formato do app (DATE,TIME,APP,DURATION).
+
+    python benchmarks/synthetic_history.py time_history.csv --rows 100000 --apps 500 --title-length 60
+"""
+import argparse
+import csv
+import random
+from datetime import date, timedelta
+
+
+def app_names(count, title_length=None):
+    """Nomes distintos; com title_length, completados até esse tamanho como títulos de janela."""
+    names = [f"App {i:04d}" for i in range(count)]
+    if title_length:
+        names = [(name + " - " + "Document title " * (title_length // 15 + 1))[:max(title_length, len(name))]
+                 for name in names]
+    return names
+
+
+def write_history(path, rows, apps=20, days=365, title_length=None, seed=0):
+    """Escreve `rows` sessões espalhadas pelos últimos `days` dias, em ordem cronológica."""
+    rng = random.Random(seed)
+    names = app_names(apps, title_length)
+    first_day = date.today() - timedelta(days=days - 1)
+    with open(path, "w", newline="", encoding="utf-8") as file:
+        writer = csv.writer(file)
+        writer.writerow(["DATE", "TIME", "APP", "DURATION"])
+        for i in range(rows):
+            day = first_day + timedelta(days=i * days // max(rows, 1))
+            seconds = rng.randint(1, 4 * 3600)
+            writer.writerow([
+                day.strftime("%d/%m/%Y"),
+                f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}:{rng.randint(0, 59):02d}",
+                rng.choice(names),
+                f"{seconds // 3600:02d}:{seconds % 3600 // 60:02d}:{seconds % 60:02d}",
+            ])
+    return names
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic time_history.csv")
+    parser.add_argument("path")
+    parser.add_argument("--rows", type=int, default=100000)
+    parser.add_argument("--apps", type=int, default=20, help="distinct app names")
+    parser.add_argument("--days", type=int, default=365, help="days covered, ending today")
+    parser.add_argument("--title-length", type=int, default=None, help="pad app names to this many characters")
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    write_history(args.path, args.rows, args.apps, args.days, args.title_length, args.seed)
+
+
+if __name__ == "__main__":
+    main()
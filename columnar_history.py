@@ -0,0 +1,154 @@
+import json
+import os
+import shutil
+import time
+from array import array
+from datetime import date
+
+EPOCH_ORDINAL = date(1970, 1, 1).toordinal()
+COLUMNS = ("day", "seconds", "app")  # int32: dias desde 1970-01-01, segundos, id do app
+CURRENT_FILE = "CURRENT"  # Nome da geração em uso; sem ele os arquivos ficam na própria pasta
+
+
+class ColumnarHistory:
+    """Cópia colunar e binária do histórico, pensada para leitura via mmap.
+
+    Cada coluna é um arquivo de int32 de largura fixa, só acrescentado no
+    final; os nomes dos apps ficam em um dicionário (apps.json) e as linhas
+    guardam apenas o índice. O dashboard lê as colunas direto como arrays
+    NumPy, sem nenhum parsing de texto.
+
+    Uma reconstrução escreve uma geração nova (subpasta) e a ativa trocando o
+    arquivo CURRENT com os.replace, então quem lê em outro processo vê a
+    geração antiga ou a nova inteira, nunca uma mistura das duas.
+    """
+
+    def __init__(self, directory, generation=None):
+        self.base_dir = directory
+        os.makedirs(directory, exist_ok=True)
+        self.directory = os.path.join(directory, generation) if generation else self._current_dir()
+        self.app_names = self._load_apps()
+        self._app_ids = {name: i for i, name in enumerate(self.app_names)}
+
+    @property
+    def _apps_path(self):
+        return os.path.join(self.directory, "apps.json")
+
+    def _current_dir(self):
+        try:
+            with open(os.path.join(self.base_dir, CURRENT_FILE), "r", encoding="utf-8") as f:
+                return os.path.join(self.base_dir, f.read().strip())
+        except FileNotFoundError:
+            return self.base_dir
+
+    def _column_path(self, column):
+        return os.path.join(self.directory, f"{column}.i32")
+
+    def _load_apps(self):
+        try:
+            with open(self._apps_path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (FileNotFoundError, json.JSONDecodeError):
+            return []
+
+    def _save_apps(self):
+        tmp_path = self._apps_path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.app_names, f, ensure_ascii=False)
+        os.replace(tmp_path, self._apps_path)
+
+    def row_count(self):
+        """Linhas completas (a menor coluna manda, caso uma escrita tenha sido interrompida)."""
+        sizes = []
+        for column in COLUMNS:
+            try:
+                sizes.append(os.path.getsize(self._column_path(column)) // 4)
+            except OSError:
+                sizes.append(0)
+        return min(sizes)
+
+    def append(self, rows):
+        """Acrescenta linhas (dia ordinal, segundos, nome do app)."""
+        columns = {column: array("i") for column in COLUMNS}
+        new_app = False
+        for day_ordinal, seconds, app in rows:
+            if app not in self._app_ids:
+                self._app_ids[app] = len(self.app_names)
+                self.app_names.append(app)
+                new_app = True
+            columns["day"].append(day_ordinal - EPOCH_ORDINAL)
+            columns["seconds"].append(int(seconds))
+            columns["app"].append(self._app_ids[app])
+        if not columns["day"]:
+            return
+        # O dicionário é gravado antes das colunas que apontam para ele
+        if new_app:
+            self._save_apps()
+        for column, values in columns.items():
+            with open(self._column_path(column), "ab") as f:
+                values.tofile(f)
+
+    def rebuild(self, rows):
+        """Recria todas as colunas a partir das linhas dadas."""
+        self.switch_to(self.build_generation([rows]))
+
+    def build_generation(self, batches):
+        """Escreve uma geração nova com os lotes de linhas dados, sem tocar na atual."""
+        name = f"gen-{time.time_ns()}"
+        os.makedirs(os.path.join(self.base_dir, name))
+        generation = ColumnarHistory(self.base_dir, generation=name)
+        generation._save_apps()
+        for rows in batches:
+            generation.append(rows)
+        return generation
+
+    def switch_to(self, generation):
+        """Ativa `generation` (troca atômica do CURRENT) e passa a acrescentar nela.
+
+        A geração anterior só é apagada na próxima troca, para não sumir
+        debaixo de um leitor que ainda a esteja abrindo.
+        """
+        previous = self.directory
+        tmp_path = os.path.join(self.base_dir, CURRENT_FILE + ".tmp")
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            f.write(os.path.basename(generation.directory))
+        os.replace(tmp_path, os.path.join(self.base_dir, CURRENT_FILE))
+        self.directory = generation.directory
+        self.app_names = generation.app_names
+        self._app_ids = generation._app_ids
+        self._remove_generations(keep={self.directory, previous})
+
+    def _remove_generations(self, keep):
+        keep = {os.path.normpath(path) for path in keep}
+        for entry in os.listdir(self.base_dir):
+            path = os.path.join(self.base_dir, entry)
+            if entry.startswith("gen-") and os.path.normpath(path) not in keep:
+                shutil.rmtree(path, ignore_errors=True)  # No Windows, um mapa ainda aberto fica para a próxima
+        if os.path.normpath(self.base_dir) not in keep:
+            # Layout antigo: colunas direto na pasta base
+            for name in [f"{column}.i32" for column in COLUMNS] + ["apps.json"]:
+                try:
+                    os.remove(os.path.join(self.base_dir, name))
+                except OSError:
+                    pass
+
+    def load(self):
+        """Colunas mapeadas em memória: (day, seconds, app, app_names).
+
+        day é um array datetime64[D]; seconds e app são int32.
+        """
+        import numpy as np
+        # Outro processo (o serviço de rastreamento) pode ter trocado de geração ou
+        # acrescentado apps; apps.json é gravado antes das colunas, então relê-lo aqui cobre todas as linhas
+        self.directory = self._current_dir()
+        self.app_names = self._load_apps()
+        self._app_ids = {name: i for i, name in enumerate(self.app_names)}
+        count = self.row_count()
+        arrays = []
+        for column in COLUMNS:
+            if count:
+                arrays.append(np.memmap(self._column_path(column), dtype=np.int32, mode="r", shape=(count,)))
+            else:
+                arrays.append(np.empty(0, dtype=np.int32))
+        day, seconds, app = arrays
+        return day.astype("datetime64[D]"), seconds, app, list(self.app_names)
@@ -0,0 +1,134 @@
+"""Exportação do histórico em CSV, NDJSON ou Parquet, com datas ISO e segundos inteiros.
+
+    python history_export.py history.csv --start 2024-01-01 --end 2024-12-31 --app code
+    python history_export.py history.parquet          # formato pela extensão
+
+As sessões são lidas de um cursor do SQLite e escritas em lotes, então a
+memória usada não depende do tamanho do histórico. Parquet precisa do pyarrow.
+"""
+import argparse
+import csv
+import json
+import os
+from datetime import date
+
+from history_store import HistoryReader, prepare_database
+
+EXPORT_FORMATS = ("csv", "ndjson", "parquet")
+EXPORT_FIELDS = ("id", "date", "time", "app", "seconds")
+BATCH_ROWS = 65536
+
+
+def session_records(rows):
+    """Sessões do HistoryReader como dicts exportados, com data ISO.
+
+    Linhas cuja data não pôde ser lida (day NULL) ficam de fora, para a
+    coluna date ser sempre YYYY-MM-DD; os filtros de data já as excluíam.
+    """
+    for session_id, day, _, time_str, app, seconds in rows:
+        if day is None:
+            continue
+        yield {
+            "id": session_id,
+            "date": date.fromordinal(day).isoformat(),
+            "time": time_str,
+            "app": app,
+            "seconds": seconds,
+        }
+
+
+def format_from_path(path):
+    """Formato deduzido da extensão do arquivo (csv se não reconhecida)."""
+    ext = os.path.splitext(path)[1].lower().lstrip(".")
+    if ext in ("jsonl", "ndjson"):
+        return "ndjson"
+    return ext if ext in EXPORT_FORMATS else "csv"
+
+
+def _write_csv(records, file_path):
+    with open(file_path, "w", newline="", encoding="utf-8") as f:
+        writer = csv.DictWriter(f, fieldnames=EXPORT_FIELDS)
+        writer.writeheader()
+        count = 0
+        for count, record in enumerate(records, 1):
+            writer.writerow(record)
+    return count
+
+
+def _write_ndjson(records, file_path):
+    with open(file_path, "w", encoding="utf-8") as f:
+        count = 0
+        for count, record in enumerate(records, 1):
+            f.write(json.dumps(record, ensure_ascii=False) + "\n")
+    return count
+
+
+def _write_parquet(records, file_path):
+    try:
+        import pyarrow as pa
+        import pyarrow.parquet as pq
+    except ImportError:
+        raise RuntimeError("Parquet export requires pyarrow (pip install pyarrow)") from None
+    schema = pa.schema([("id", pa.int64()), ("date", pa.string()), ("time", pa.string()),
+                        ("app", pa.string()), ("seconds", pa.int64())])
+    count = 0
+    with pq.ParquetWriter(file_path, schema) as writer:
+        batch = []
+        for record in records:
+            batch.append(record)
+            if len(batch) == BATCH_ROWS:
+                writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+                count += len(batch)
+                batch = []
+        # Sempre escreve o último lote (mesmo vazio), para o arquivo ter o schema
+        writer.write_batch(pa.RecordBatch.from_pylist(batch, schema=schema))
+        count += len(batch)
+    return count
+
+
+WRITERS = {"csv": _write_csv, "ndjson": _write_ndjson, "parquet": _write_parquet}
+
+
+def export_history(db_path, path, fmt=None, start=None, end=None, app_query=None):
+    """Exporta as sessões entre start e end (inclusive) cujo app contém app_query.
+
+    Escreve em um arquivo temporário ao lado do destino e só o renomeia no
+    fim, para uma exportação interrompida não deixar um arquivo truncado.
+    Retorna o número de sessões exportadas.
+    """
+    fmt = fmt or format_from_path(path)
+    if fmt not in WRITERS:
+        raise ValueError(f"Unknown export format: {fmt}")
+    partial_path = path + ".part"
+    reader = HistoryReader(db_path)
+    try:
+        records = session_records(reader.sessions(start, end, app_query))
+        count = WRITERS[fmt](records, partial_path)
+        os.replace(partial_path, path)
+    finally:
+        reader.close()
+        if os.path.exists(partial_path):
+            os.remove(partial_path)
+    return count
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("output", help="destination file")
+    parser.add_argument("--format", choices=EXPORT_FORMATS, help="default: from the file extension")
+    parser.add_argument("--start", type=date.fromisoformat, help="first day (YYYY-MM-DD)")
+    parser.add_argument("--end", type=date.fromisoformat, help="last day (YYYY-MM-DD)")
+    parser.add_argument("--app", help="only apps whose name contains this text")
+    parser.add_argument("--data-dir", default=os.path.abspath("."), help="folder with time_history.db / time_history.csv")
+    args = parser.parse_args()
+
+    try:
+        count = export_history(prepare_database(args.data_dir), args.output, args.format,
+                               args.start, args.end, args.app)
+    except RuntimeError as e:  # Parquet sem pyarrow
+        parser.error(str(e))
+    print(f"Exported {count} sessions to {args.output}")
+
+
+if __name__ == "__main__":
+    main()
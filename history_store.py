@@ -0,0 +1,497 @@
+import csv
+import itertools
+import os
+import pathlib
+import sqlite3
+import threading
+import time
+from datetime import datetime, date
+
+from columnar_history import ColumnarHistory
+
+DATE_FORMAT = "%d/%m/%Y"
+ARCHIVE_FILE = "time_history_archive.db"  # Sessões originais guardadas pela compactação
+
+
+def parse_duration(duration_str):
+    """Converte "HH:MM:SS" em segundos inteiros (0 se inválido)."""
+    try:
+        h, m, s = map(int, str(duration_str).split(':'))
+        return h * 3600 + m * 60 + s
+    except (ValueError, AttributeError):
+        return 0
+
+
+def format_seconds(total_seconds):
+    """Formata segundos inteiros como HH:MM:SS."""
+    hours, remainder = divmod(int(total_seconds), 3600)
+    minutes, seconds = divmod(remainder, 60)
+    return f"{hours:02d}:{minutes:02d}:{seconds:02d}"
+
+
+def parse_day(date_str):
+    """Converte "DD/MM/YYYY" no número ordinal do dia (None se inválido)."""
+    try:
+        return datetime.strptime(date_str, DATE_FORMAT).toordinal()
+    except (ValueError, TypeError):
+        return None
+
+
+class HistoryStore:
+    """Armazenamento indexado e append-only das sessões (SQLite).
+
+    As linhas são devolvidas no mesmo formato do CSV:
+    (DATE, TIME, APP, DURATION).
+    """
+
+    def __init__(self, db_path, csv_path=None, columnar_dir=None, defer_import=False):
+        self.db_path = db_path
+        self.csv_path = csv_path
+        self.columnar_dir = columnar_dir
+        self.columnar = None
+        self.version = 0  # Incrementado a cada gravação (chave dos caches de estatísticas)
+        self._lock = threading.Lock()
+        # save_session pode ser chamado pela thread dos atalhos do teclado
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        # WAL: leitores externos (API, exportação) não bloqueiam as gravações
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._create_schema()
+        self.version = int(self._get_meta("version") or 0)
+        if not defer_import:
+            self.finish_opening()
+
+    def needs_import(self):
+        """Se o CSV da primeira execução ainda não foi importado (ver finish_opening)."""
+        return self._get_meta("csv_imported") != "1"
+
+    def finish_opening(self):
+        """Importa o CSV na primeira execução e abre a cópia colunar.
+
+        Com defer_import=True quem cria o store chama isto onde quiser; o app
+        usa o worker, para a janela não esperar a importação.
+        """
+        self._import_csv_once()
+        self.version = int(self._get_meta("version") or 0)
+        if self.columnar_dir:
+            self._open_columnar(self.columnar_dir)
+
+    def _create_schema(self):
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS meta (
+                    key TEXT PRIMARY KEY,
+                    value TEXT
+                );
+                CREATE TABLE IF NOT EXISTS apps (
+                    id INTEGER PRIMARY KEY,
+                    name TEXT UNIQUE NOT NULL,
+                    name_lower TEXT NOT NULL
+                );
+                CREATE TABLE IF NOT EXISTS sessions (
+                    id INTEGER PRIMARY KEY,
+                    day INTEGER,
+                    date TEXT NOT NULL,
+                    time TEXT NOT NULL,
+                    app_id INTEGER NOT NULL REFERENCES apps(id),
+                    seconds INTEGER NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_sessions_day ON sessions(day);
+                CREATE INDEX IF NOT EXISTS idx_sessions_app ON sessions(app_id);
+                -- Totais acumulados por dia e app, atualizados a cada gravação
+                CREATE TABLE IF NOT EXISTS daily_totals (
+                    day INTEGER NOT NULL,
+                    app_id INTEGER NOT NULL REFERENCES apps(id),
+                    seconds INTEGER NOT NULL,
+                    PRIMARY KEY (day, app_id)
+                );
+            """)
+            # Bancos criados antes dos totais diários: monta os buckets uma única vez
+            built = self._conn.execute(
+                "SELECT value FROM meta WHERE key = 'daily_totals_built'").fetchone()
+            if not built:
+                self._rebuild_daily_totals()
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta(key, value) VALUES ('daily_totals_built', '1')")
+
+    def _rebuild_daily_totals(self):
+        self._conn.execute("DELETE FROM daily_totals")
+        self._conn.execute(
+            "INSERT INTO daily_totals(day, app_id, seconds) "
+            "SELECT day, app_id, SUM(seconds) FROM sessions "
+            "WHERE day IS NOT NULL GROUP BY day, app_id")
+
+    def _import_csv_once(self, batch_rows=65536):
+        """Importa o time_history.csv existente na primeira execução.
+
+        O CSV é lido em lotes inseridos com executemany; os índices das sessões
+        e os totais diários são montados no fim (um GROUP BY), em vez de
+        atualizados a cada linha.
+        """
+        if self._get_meta("csv_imported") == "1":
+            return
+        with self._lock, self._conn:
+            if self.csv_path and os.path.exists(self.csv_path):
+                with open(self.csv_path, mode="r", encoding="utf-8") as file:
+                    reader = csv.reader(file)
+                    next(reader, None)  # Skip header
+                    app_ids = {}
+                    # Datas e durações se repetem muito: cada texto é analisado uma vez
+                    days = {}
+                    durations = {}
+                    rows = (row for row in reader if len(row) >= 4)
+                    self._conn.execute("DROP INDEX IF EXISTS idx_sessions_day")
+                    self._conn.execute("DROP INDEX IF EXISTS idx_sessions_app")
+                    while True:
+                        batch = []
+                        for row in itertools.islice(rows, batch_rows):
+                            date_str, time_str, app, duration = row[:4]
+                            if app not in app_ids:
+                                app_ids[app] = self._app_id(app)
+                            if date_str not in days:
+                                days[date_str] = parse_day(date_str)
+                            if duration not in durations:
+                                durations[duration] = parse_duration(duration)
+                            batch.append((days[date_str], date_str, time_str, app_ids[app], durations[duration]))
+                        if not batch:
+                            break
+                        self._conn.executemany(
+                            "INSERT INTO sessions(day, date, time, app_id, seconds) VALUES (?, ?, ?, ?, ?)", batch)
+                    self._conn.execute("CREATE INDEX idx_sessions_day ON sessions(day)")
+                    self._conn.execute("CREATE INDEX idx_sessions_app ON sessions(app_id)")
+                self._rebuild_daily_totals()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO meta(key, value) VALUES ('csv_imported', '1')")
+
+    def _open_columnar(self, columnar_dir):
+        """Abre a cópia colunar e a recria se estiver fora de sincronia com o banco."""
+        self.columnar = ColumnarHistory(columnar_dir)
+        with self._lock:
+            count = self._conn.execute("SELECT COUNT(*) FROM sessions WHERE day IS NOT NULL").fetchone()[0]
+            if self.columnar.row_count() == count and (self.columnar.app_names or not count):
+                return
+            rows = self._conn.execute(
+                "SELECT s.day, s.seconds, a.name FROM sessions s JOIN apps a ON a.id = s.app_id "
+                "WHERE s.day IS NOT NULL ORDER BY s.id").fetchall()
+            self.columnar.rebuild(rows)
+
+    def _get_meta(self, key):
+        with self._lock:
+            row = self._conn.execute("SELECT value FROM meta WHERE key = ?", (key,)).fetchone()
+        return row[0] if row else None
+
+    def _app_id(self, name):
+        row = self._conn.execute("SELECT id FROM apps WHERE name = ?", (name,)).fetchone()
+        if row:
+            return row[0]
+        cur = self._conn.execute(
+            "INSERT INTO apps(name, name_lower) VALUES (?, ?)", (name, name.lower()))
+        return cur.lastrowid
+
+    def _insert_rows(self, rows):
+        """Insere as linhas e devolve (dia, segundos, app) das que têm data válida."""
+        app_ids = {}
+        dated_rows = []
+        for date_str, time_str, app, duration in (row[:4] for row in rows):
+            if app not in app_ids:
+                app_ids[app] = self._app_id(app)
+            day = parse_day(date_str)
+            seconds = parse_duration(duration)
+            self._conn.execute(
+                "INSERT INTO sessions(day, date, time, app_id, seconds) VALUES (?, ?, ?, ?, ?)",
+                (day, date_str, time_str, app_ids[app], seconds))
+            if day is not None:
+                dated_rows.append((day, seconds, app))
+                self._conn.execute(
+                    "INSERT INTO daily_totals(day, app_id, seconds) VALUES (?, ?, ?) "
+                    "ON CONFLICT(day, app_id) DO UPDATE SET seconds = seconds + excluded.seconds",
+                    (day, app_ids[app], seconds))
+        return dated_rows
+
+    def add_rows(self, rows, session_id=None):
+        """Acrescenta linhas (DATE, TIME, APP, DURATION) ao histórico.
+
+        session_id (do journal) é gravado na mesma transação, ver saved_session.
+        Retorna (versão anterior, nova versão, [(dia ordinal, segundos, app)]).
+        """
+        with self._lock:
+            with self._conn:
+                dated_rows = self._insert_rows(rows)
+                self._conn.execute(
+                    "INSERT OR REPLACE INTO meta(key, value) VALUES ('version', ?)", (str(self.version + 1),))
+                if session_id:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta(key, value) VALUES ('saved_session', ?)", (session_id,))
+            if self.columnar is not None:
+                self.columnar.append(dated_rows)
+            self.version += 1
+            return self.version - 1, self.version, dated_rows
+
+    def compact(self, before, archive_path=None, chunk_days=7):
+        """Junta as sessões anteriores a `before` em uma linha por dia e app.
+
+        Fica a primeira sessão do dia para o app (id, data e hora dela) com a
+        soma dos segundos. Os totais por dia e app não mudam (daily_totals nem
+        é tocado), então relatórios e estatísticas continuam iguais. Com
+        archive_path, as linhas originais são copiadas para esse banco na mesma
+        transação em que saem do histórico. Trabalha em blocos de chunk_days
+        dias, soltando o lock entre eles para não segurar as gravações; a cópia
+        colunar é refeita fora do lock (ver _rebuild_columnar).
+        Retorna o número de linhas removidas.
+        """
+        if isinstance(before, date):
+            before = before.toordinal()
+        with self._lock:
+            first = self._conn.execute("SELECT MIN(day) FROM sessions WHERE day < ?", (before,)).fetchone()[0]
+            if first is None:
+                return 0
+            if archive_path:
+                self._conn.execute("ATTACH DATABASE ? AS archive", (archive_path,))
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS archive.sessions (
+                        id INTEGER PRIMARY KEY,
+                        day INTEGER,
+                        date TEXT NOT NULL,
+                        time TEXT NOT NULL,
+                        app TEXT NOT NULL,
+                        seconds INTEGER NOT NULL
+                    )""")
+        removed = 0
+        try:
+            for low in range(first, before, chunk_days):
+                high = min(low + chunk_days, before) - 1
+                with self._lock:
+                    removed += self._compact_days(low, high, bool(archive_path))
+                time.sleep(0)  # Deixa uma gravação à espera pegar o lock antes do próximo bloco
+        finally:
+            if archive_path:
+                with self._lock:
+                    self._conn.execute("DETACH DATABASE archive")
+        if removed:
+            if self.columnar is not None:
+                self._rebuild_columnar()
+            with self._lock:
+                with self._conn:
+                    self._conn.execute(
+                        "INSERT OR REPLACE INTO meta(key, value) VALUES ('version', ?)", (str(self.version + 1),))
+                self.version += 1
+        return removed
+
+    def _rebuild_columnar(self, batch_rows=65536):
+        """Refaz a cópia colunar sem segurar o lock durante a leitura do histórico.
+
+        As linhas até o maior id atual são lidas em lotes por uma conexão
+        própria e gravadas numa geração nova; sob o lock só entram as linhas
+        salvas nesse meio tempo, antes de a geração nova ser ativada.
+        """
+        query = ("SELECT s.day, s.seconds, a.name FROM sessions s JOIN apps a ON a.id = s.app_id "
+                 "WHERE s.day IS NOT NULL AND s.id > ? AND s.id <= ? ORDER BY s.id")
+        with self._lock:
+            snapshot_id = self._conn.execute("SELECT COALESCE(MAX(id), 0) FROM sessions").fetchone()[0]
+        reader = sqlite3.connect(self.db_path)
+        try:
+            cursor = reader.execute(query, (0, snapshot_id))
+            generation = self.columnar.build_generation(iter(lambda: cursor.fetchmany(batch_rows), []))
+        finally:
+            reader.close()
+        with self._lock:
+            generation.append(self._conn.execute(query, (snapshot_id, 2 ** 63 - 1)).fetchall())
+            self.columnar.switch_to(generation)
+
+    def _compact_days(self, low, high, archive):
+        """Compacta os dias low..high (ordinais, inclusive) em uma transação."""
+        # Sessões dos grupos (dia, app) com mais de uma linha, ligadas à linha que fica
+        grouped = ("FROM sessions s JOIN temp.rollup r ON r.day = s.day AND r.app_id = s.app_id "
+                   "WHERE s.day BETWEEN ? AND ?")
+        with self._conn:
+            self._conn.execute("BEGIN IMMEDIATE")
+            self._conn.execute("DROP TABLE IF EXISTS temp.rollup")
+            self._conn.execute(
+                "CREATE TEMP TABLE rollup (id INTEGER PRIMARY KEY, day INTEGER, app_id INTEGER, seconds INTEGER, "
+                "UNIQUE (day, app_id))")
+            self._conn.execute(
+                "INSERT INTO temp.rollup SELECT MIN(id), day, app_id, SUM(seconds) "
+                "FROM sessions WHERE day BETWEEN ? AND ? GROUP BY day, app_id HAVING COUNT(*) > 1",
+                (low, high))
+            if archive:
+                # OR IGNORE: uma linha já arquivada mantém os valores originais
+                self._conn.execute(
+                    "INSERT OR IGNORE INTO archive.sessions(id, day, date, time, app, seconds) "
+                    "SELECT s.id, s.day, s.date, s.time, a.name, s.seconds FROM sessions s "
+                    "JOIN temp.rollup r ON r.day = s.day AND r.app_id = s.app_id "
+                    "JOIN apps a ON a.id = s.app_id WHERE s.day BETWEEN ? AND ?",
+                    (low, high))
+            removed = self._conn.execute(
+                f"DELETE FROM sessions WHERE id IN (SELECT s.id {grouped} AND s.id <> r.id)",
+                (low, high)).rowcount
+            self._conn.execute(
+                "UPDATE sessions SET seconds = (SELECT r.seconds FROM temp.rollup r WHERE r.id = sessions.id) "
+                "WHERE id IN (SELECT id FROM temp.rollup)")
+            self._conn.execute("DROP TABLE temp.rollup")
+        return removed
+
+    def saved_session(self):
+        """Id do journal da última sessão salva (None antes da primeira)."""
+        return self._get_meta("saved_session")
+
+    def refresh(self):
+        """Relê a versão do histórico, que pode ter sido gravada por outro processo."""
+        version = int(self._get_meta("version") or 0)
+        with self._lock:
+            self.version = version
+        return version
+
+    def _query(self, where="", params=(), order="s.id", limit=None):
+        sql = ("SELECT s.date, s.time, a.name, s.seconds FROM sessions s "
+               "JOIN apps a ON a.id = s.app_id")
+        if where:
+            sql += f" WHERE {where}"
+        sql += f" ORDER BY {order}"
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return [(d, tm, app, format_seconds(sec)) for d, tm, app, sec in rows]
+
+    def all_rows(self):
+        return self._query()
+
+    def last_rows(self, n):
+        """Últimas n linhas, em ordem cronológica."""
+        return self._query(order="s.id DESC", limit=n)[::-1]
+
+    def rows_for_date(self, day):
+        """Linhas de um dia (date ou ordinal)."""
+        if isinstance(day, date):
+            day = day.toordinal()
+        return self._query("s.day = ?", (day,))
+
+    def rows_matching_app(self, app_query):
+        """Linhas cujo app contém app_query (sem diferenciar maiúsculas)."""
+        # A busca por substring percorre só a tabela de apps distintos;
+        # as sessões são resolvidas pelo índice de app_id.
+        return self._query(
+            "s.app_id IN (SELECT id FROM apps WHERE instr(name_lower, ?) > 0)",
+            (app_query.lower(),))
+
+    def daily_seconds(self, start, end, app_query=None):
+        """Segundos por dia entre duas datas (inclusive), lidos dos totais diários.
+
+        Retorna um dict {date: segundos}; o custo depende só do intervalo,
+        não do tamanho do histórico.
+        """
+        sql = "SELECT day, SUM(seconds) FROM daily_totals WHERE day BETWEEN ? AND ?"
+        params = [start.toordinal(), end.toordinal()]
+        if app_query:
+            sql += " AND app_id IN (SELECT id FROM apps WHERE instr(name_lower, ?) > 0)"
+            params.append(app_query.lower())
+        sql += " GROUP BY day"
+        with self._lock:
+            rows = self._conn.execute(sql, params).fetchall()
+        return {date.fromordinal(day): seconds for day, seconds in rows}
+
+    def columns_snapshot(self):
+        """(versão, colunas) lidos de forma consistente entre si."""
+        if self.columnar is None:
+            raise RuntimeError("HistoryStore was opened without a columnar copy")
+        with self._lock:
+            return self.version, self.columnar.load()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+def prepare_database(data_dir):
+    """Garante o banco do histórico da pasta (cria e importa o CSV se o app ainda não rodou)."""
+    db_path = os.path.join(data_dir, "time_history.db")
+    HistoryStore(db_path, os.path.join(data_dir, "time_history.csv")).close()
+    return db_path
+
+
+def _session_filter(start=None, end=None, app_query=None, column="s.day", app_column="s.app_id"):
+    """Cláusulas WHERE e parâmetros para intervalo de datas (inclusive) e busca por app."""
+    clauses, params = [], []
+    if start is not None:
+        clauses.append(f"{column} >= ?")
+        params.append(start.toordinal())
+    if end is not None:
+        clauses.append(f"{column} <= ?")
+        params.append(end.toordinal())
+    if app_query:
+        clauses.append(f"{app_column} IN (SELECT id FROM apps WHERE instr(name_lower, ?) > 0)")
+        params.append(app_query.lower())
+    return clauses, params
+
+
+class HistoryReader:
+    """Conexão somente leitura ao banco do histórico, para consultas externas.
+
+    Usa uma conexão própria (sem o lock do HistoryStore), então pode ser aberta
+    em qualquer thread ou processo enquanto o app grava. As consultas devolvem
+    cursores, para que o chamador percorra as linhas sem montar listas.
+    Sessões: (id, dia ordinal ou None, DATE original, TIME, app, segundos).
+    """
+
+    def __init__(self, db_path):
+        uri = pathlib.Path(db_path).resolve().as_uri() + "?mode=ro"
+        self._conn = sqlite3.connect(uri, uri=True, timeout=5, check_same_thread=False)
+
+    def sessions(self, start=None, end=None, app_query=None, after=0, limit=None):
+        """Sessões com id > after, em ordem de gravação (paginação por cursor)."""
+        clauses, params = _session_filter(start, end, app_query)
+        clauses.insert(0, "s.id > ?")
+        params.insert(0, after)
+        sql = ("SELECT s.id, s.day, s.date, s.time, a.name, s.seconds FROM sessions s "
+               "JOIN apps a ON a.id = s.app_id WHERE " + " AND ".join(clauses) + " ORDER BY s.id")
+        if limit is not None:
+            sql += f" LIMIT {int(limit)}"
+        return self._conn.execute(sql, params)
+
+    def next_cursor(self, start=None, end=None, app_query=None, after=0, limit=None):
+        """Cursor da página seguinte a sessions(...), ou None se esta for a última.
+
+        Calculado antes de percorrer a página, para ir nos cabeçalhos da resposta.
+        """
+        if limit is None or limit <= 0:
+            return None
+        clauses, params = _session_filter(start, end, app_query)
+        clauses.insert(0, "s.id > ?")
+        where = " AND ".join(clauses)
+        row = self._conn.execute(
+            f"SELECT s.id FROM sessions s WHERE {where} ORDER BY s.id LIMIT 1 OFFSET {int(limit) - 1}",
+            [after] + params).fetchone()
+        if row is None:
+            return None
+        more = self._conn.execute(
+            f"SELECT 1 FROM sessions s WHERE {where} LIMIT 1", [row[0]] + params).fetchone()
+        return row[0] if more else None
+
+    def last_sessions(self, n, start=None, end=None, app_query=None):
+        """Últimas n sessões (do intervalo e do app, se dados), em ordem cronológica."""
+        clauses, params = _session_filter(start, end, app_query)
+        sql = "SELECT s.id, s.day, s.date, s.time, a.name, s.seconds FROM sessions s JOIN apps a ON a.id = s.app_id"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        rows = self._conn.execute(sql + " ORDER BY s.id DESC LIMIT ?", params + [int(n)]).fetchall()
+        return rows[::-1]
+
+    def app_totals(self, start=None, end=None, app_query=None):
+        """(app, segundos) por app no intervalo, do maior para o menor, lidos dos totais diários."""
+        clauses, params = _session_filter(start, end, app_query, column="t.day", app_column="t.app_id")
+        sql = "SELECT a.name, SUM(t.seconds) FROM daily_totals t JOIN apps a ON a.id = t.app_id"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " GROUP BY t.app_id ORDER BY 2 DESC, a.name"
+        return self._conn.execute(sql, params)
+
+    def daily_totals(self, start=None, end=None, app_query=None):
+        """(dia ordinal, segundos) por dia no intervalo, em ordem de data."""
+        clauses, params = _session_filter(start, end, app_query, column="day", app_column="app_id")
+        sql = "SELECT day, SUM(seconds) FROM daily_totals"
+        if clauses:
+            sql += " WHERE " + " AND ".join(clauses)
+        sql += " GROUP BY day ORDER BY day"
+        return self._conn.execute(sql, params)
+
+    def close(self):
+        self._conn.close()
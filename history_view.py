@@ -0,0 +1,133 @@
+import customtkinter as ctk
+
+
+class VirtualHistoryList(ctk.CTkFrame):
+    """Lista de histórico virtualizada.
+
+    Só existem widgets para as linhas visíveis; ao rolar, os mesmos frames e
+    labels são reconfigurados com os dados da nova janela de linhas.
+    """
+
+    def __init__(self, master, row_height=30, short_len=15, **kwargs):
+        kwargs.setdefault("fg_color", "#232B3B")
+        super().__init__(master, **kwargs)
+        self.row_height = row_height
+        self.short_len = short_len
+        self.rows = []
+        self.first = 0
+        self._pool = []  # [(frame, (date_lbl, time_lbl, apps_lbl, duration_lbl))]
+        self._full_apps = {}  # apps_label -> texto completo da linha exibida
+
+        self.body = ctk.CTkFrame(self, fg_color=kwargs["fg_color"])
+        self.body.pack(side="left", fill="both", expand=True)
+        self.scrollbar = ctk.CTkScrollbar(self, orientation="vertical", command=self._on_scrollbar)
+        self.scrollbar.pack(side="right", fill="y")
+
+        self.body.bind("<Configure>", self._on_resize)
+        self._bind_wheel(self.body)
+        self._placeholder = ctk.CTkLabel(self.body, text="", font=("Arial", 11), text_color="#A1A7B3")
+
+    # --- Dados ---
+    def set_rows(self, rows):
+        """Substitui todas as linhas (DATE, TIME, APP, DURATION)."""
+        self.rows = list(rows)
+        self.first = 0
+        self._placeholder.place_forget()
+        self._refresh()
+
+    def append_row(self, row):
+        self.rows.append(tuple(row))
+        self._refresh()
+
+    def clear(self):
+        self.set_rows([])
+
+    def show_placeholder(self, text):
+        """Esvazia a lista e mostra um aviso (ex.: carregando) até o próximo set_rows."""
+        self.clear()
+        self._placeholder.configure(text=text)
+        self._placeholder.place(relx=0.5, y=self.row_height, anchor="n")
+
+    # --- Rolagem ---
+    def visible_count(self):
+        return len(self._pool)
+
+    def _max_first(self):
+        return max(0, len(self.rows) - max(1, self.visible_count() - 1))
+
+    def scroll_to(self, index):
+        self.first = min(max(0, int(index)), self._max_first())
+        self._refresh()
+
+    def _on_scrollbar(self, *args):
+        if not args:
+            return
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.rows))
+        elif args[0] == "scroll":
+            step = int(args[1])
+            if len(args) > 2 and args[2] == "pages":
+                step *= max(1, self.visible_count() - 1)
+            self.scroll_to(self.first + step)
+
+    def _on_wheel(self, event):
+        if getattr(event, "num", None) == 4:
+            step = -1
+        elif getattr(event, "num", None) == 5:
+            step = 1
+        else:
+            step = -1 if event.delta > 0 else 1
+        self.scroll_to(self.first + step * 3)
+        return "break"
+
+    def _bind_wheel(self, widget):
+        widget.bind("<MouseWheel>", self._on_wheel)
+        widget.bind("<Button-4>", self._on_wheel)
+        widget.bind("<Button-5>", self._on_wheel)
+
+    # --- Widgets ---
+    def _on_resize(self, event):
+        needed = max(1, event.height // self.row_height + 1)
+        while len(self._pool) < needed:
+            self._pool.append(self._create_row_widgets())
+        self.first = min(self.first, self._max_first())
+        self._refresh()
+
+    def _create_row_widgets(self):
+        entry_frame = ctk.CTkFrame(self.body, corner_radius=5, height=self.row_height - 2, fg_color="#232b3b")
+        labels = []
+        for anchor in ("w", "w", "w", "e"):
+            label = ctk.CTkLabel(entry_frame, text="", font=("Arial", 9), anchor=anchor, text_color="white")
+            label.pack(side="left", expand=True, padx=2)
+            self._bind_wheel(label)
+            labels.append(label)
+        apps_label = labels[2]
+        apps_label.bind("<Enter>", lambda e, lbl=apps_label: lbl.configure(text=self._full_apps.get(lbl, "")))
+        apps_label.bind("<Leave>", lambda e, lbl=apps_label: lbl.configure(text=self._short(self._full_apps.get(lbl, ""))))
+        self._bind_wheel(entry_frame)
+        return entry_frame, tuple(labels)
+
+    def _short(self, apps):
+        return (apps[:self.short_len] + "...") if len(apps) > self.short_len else apps
+
+    def _refresh(self):
+        if self.rows:
+            self._placeholder.place_forget()
+        for slot, (entry_frame, labels) in enumerate(self._pool):
+            index = self.first + slot
+            if index >= len(self.rows):
+                entry_frame.place_forget()
+                continue
+            date, time, apps, duration = self.rows[index][:4]
+            date_label, time_label, apps_label, duration_label = labels
+            date_label.configure(text=date)
+            time_label.configure(text=time)
+            self._full_apps[apps_label] = apps
+            apps_label.configure(text=self._short(apps))
+            duration_label.configure(text=duration)
+            entry_frame.place(x=0, y=slot * self.row_height + 1, relwidth=1)
+        total = len(self.rows)
+        if total:
+            self.scrollbar.set(self.first / total, min(1.0, (self.first + self.visible_count()) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
@@ -0,0 +1,169 @@
+import abc
+import ctypes
+import ctypes.util
+import sys
+import time
+
+
+class IdleDetector(abc.ABC):
+    """Base dos backends de detecção de inatividade.
+
+    Os backends do sistema respondem "há quanto tempo não há entrada" com uma
+    única chamada, sem hooks de teclado nem polling do mouse neste processo.
+    """
+
+    @abc.abstractmethod
+    def idle_seconds(self):
+        """Segundos desde a última entrada do usuário."""
+
+    def last_input_time(self):
+        """Instante (time.monotonic) da última entrada do usuário."""
+        return time.monotonic() - self.idle_seconds()
+
+    def start(self, on_activity=None):
+        pass
+
+    def stop(self):
+        pass
+
+
+class WindowsIdleDetector(IdleDetector):
+    """GetLastInputInfo: tick da última entrada de teclado/mouse da sessão."""
+
+    def __init__(self):
+        from ctypes import wintypes
+
+        class LASTINPUTINFO(ctypes.Structure):
+            _fields_ = [("cbSize", wintypes.UINT), ("dwTime", wintypes.DWORD)]
+
+        self._user32 = ctypes.windll.user32
+        self._kernel32 = ctypes.windll.kernel32
+        self._info = LASTINPUTINFO()
+        self._info.cbSize = ctypes.sizeof(LASTINPUTINFO)
+        self.idle_seconds()  # Falha já na criação se a API não estiver disponível
+
+    def idle_seconds(self):
+        if not self._user32.GetLastInputInfo(ctypes.byref(self._info)):
+            raise OSError("GetLastInputInfo failed")
+        # Os ticks são de 32 bits e dão a volta a cada ~49 dias
+        return ((self._kernel32.GetTickCount() - self._info.dwTime) & 0xFFFFFFFF) / 1000.0
+
+
+class MacIdleDetector(IdleDetector):
+    """CGEventSourceSecondsSinceLastEventType (qualquer tipo de evento de entrada)."""
+
+    HID_SYSTEM_STATE = 1
+    ANY_INPUT_EVENT = 0xFFFFFFFF
+
+    def __init__(self):
+        library = ctypes.util.find_library("ApplicationServices")
+        if not library:
+            raise OSError("ApplicationServices not found")
+        self._seconds_since = ctypes.cdll.LoadLibrary(library).CGEventSourceSecondsSinceLastEventType
+        self._seconds_since.restype = ctypes.c_double
+        self._seconds_since.argtypes = [ctypes.c_int32, ctypes.c_uint32]
+
+    def idle_seconds(self):
+        return self._seconds_since(self.HID_SYSTEM_STATE, self.ANY_INPUT_EVENT)
+
+
+class XScreenSaverSource:
+    """Milissegundos sem entrada segundo a extensão MIT-SCREEN-SAVER do X11."""
+
+    def __init__(self):
+        class XScreenSaverInfo(ctypes.Structure):
+            _fields_ = [("window", ctypes.c_ulong), ("state", ctypes.c_int),
+                        ("kind", ctypes.c_int), ("til_or_since", ctypes.c_ulong),
+                        ("idle", ctypes.c_ulong), ("eventMask", ctypes.c_ulong)]
+
+        x11_name = ctypes.util.find_library("X11")
+        xss_name = ctypes.util.find_library("Xss")
+        if not x11_name or not xss_name:
+            raise OSError("libX11/libXss not found")
+        self._x11 = ctypes.cdll.LoadLibrary(x11_name)
+        self._xss = ctypes.cdll.LoadLibrary(xss_name)
+        self._x11.XOpenDisplay.restype = ctypes.c_void_p
+        self._x11.XDefaultRootWindow.argtypes = [ctypes.c_void_p]
+        self._x11.XDefaultRootWindow.restype = ctypes.c_ulong
+        self._xss.XScreenSaverAllocInfo.restype = ctypes.POINTER(XScreenSaverInfo)
+        self._xss.XScreenSaverQueryInfo.argtypes = [
+            ctypes.c_void_p, ctypes.c_ulong, ctypes.POINTER(XScreenSaverInfo)]
+        self._display = self._x11.XOpenDisplay(None)
+        if not self._display:
+            raise OSError("Could not open X display")
+        self._root = self._x11.XDefaultRootWindow(self._display)
+        self._info = self._xss.XScreenSaverAllocInfo()
+        self()
+
+    def __call__(self):
+        if not self._xss.XScreenSaverQueryInfo(self._display, self._root, self._info):
+            raise OSError("XScreenSaverQueryInfo failed")
+        return self._info.contents.idle
+
+
+class LinuxIdleDetector(IdleDetector):
+    """Backend Linux; input_source é qualquer callable que devolva ms sem entrada.
+
+    Por padrão usa o XScreenSaver, mas aceita uma fonte falsa para testes.
+    """
+
+    def __init__(self, input_source=None):
+        self.input_source = input_source if input_source is not None else XScreenSaverSource()
+
+    def idle_seconds(self):
+        return self.input_source() / 1000.0
+
+
+class PollingIdleDetector(IdleDetector):
+    """Fallback: posição do mouse consultada pelo tracker + hook de teclado com throttle."""
+
+    def __init__(self, throttle=1.0):
+        import pyautogui
+        self._pyautogui = pyautogui
+        self.throttle = throttle
+        self._mouse_position = pyautogui.position()
+        self._last_input = time.monotonic()
+        self._on_activity = None
+        self._hook = None
+
+    def start(self, on_activity=None):
+        import keyboard
+        self._on_activity = on_activity
+        if self._hook is None:
+            self._hook = keyboard.hook(self._keyboard_activity)
+
+    def stop(self):
+        if self._hook is not None:
+            import keyboard
+            keyboard.unhook(self._hook)
+            self._hook = None
+
+    def _keyboard_activity(self, event):
+        # Chamado a cada tecla: sai logo se a última atividade é recente
+        now = time.monotonic()
+        if now - self._last_input < self.throttle:
+            return
+        self._last_input = now
+        if self._on_activity is not None:
+            self._on_activity()
+
+    def idle_seconds(self):
+        current_position = self._pyautogui.position()
+        if current_position != self._mouse_position:
+            self._mouse_position = current_position
+            self._last_input = time.monotonic()
+        return time.monotonic() - self._last_input
+
+
+def create_idle_detector():
+    """API do sistema quando disponível; polling + hook de teclado como fallback."""
+    try:
+        if sys.platform == "win32":
+            return WindowsIdleDetector()
+        if sys.platform == "darwin":
+            return MacIdleDetector()
+        if sys.platform.startswith("linux"):
+            return LinuxIdleDetector()
+    except Exception as e:
+        print(f"Falling back to input polling for idle detection: {e}")
+    return PollingIdleDetector()
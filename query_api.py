@@ -0,0 +1,212 @@
+"""API local de consulta do histórico: HTTP só leitura em 127.0.0.1.
+
+    python query_api.py --data-dir . --port 8765
+
+    GET /sessions?start=2024-01-01&end=2024-01-31&app=code&limit=1000&after=0&format=json
+    GET /sessions/last?n=20&start=2024-01-01&end=2024-01-31&app=code
+    GET /totals?start=2024-01-01&end=2024-01-31&app=code
+    GET /daily?start=2024-01-01&end=2024-01-31&app=code
+
+Datas em ISO (YYYY-MM-DD, inclusive), durações em segundos inteiros.
+format=json (padrão), ndjson ou csv. As respostas são escritas em blocos
+enquanto o cursor do SQLite é percorrido, sem montar o resultado inteiro.
+/sessions é paginado por cursor: a próxima página vem de after=<X-Next-After>
+(também no cabeçalho Link e, em JSON, no campo "next").
+"""
+import argparse
+import csv
+import io
+import json
+import os
+import signal
+import sys
+from datetime import date
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlsplit
+
+from history_export import EXPORT_FIELDS, session_records
+from history_store import HistoryReader, prepare_database
+
+DEFAULT_PORT = 8765
+DEFAULT_LIMIT = 1000
+MAX_LIMIT = 50000
+FORMATS = {
+    "json": "application/json",
+    "ndjson": "application/x-ndjson",
+    "csv": "text/csv; charset=utf-8",
+}
+CHUNK_ROWS = 500  # Linhas por escrita no socket
+
+
+class QueryError(ValueError):
+    """Parâmetro inválido na consulta (vira resposta 400)."""
+
+
+def parse_iso_date(value, name):
+    try:
+        return date.fromisoformat(value) if value else None
+    except ValueError:
+        raise QueryError(f"{name} must be a date in YYYY-MM-DD format") from None
+
+
+def parse_int(value, name, default, minimum=0, maximum=None):
+    if value in (None, ""):
+        return default
+    try:
+        number = int(value)
+    except ValueError:
+        raise QueryError(f"{name} must be an integer") from None
+    if number < minimum or (maximum is not None and number > maximum):
+        raise QueryError(f"{name} must be between {minimum} and {maximum}" if maximum is not None
+                         else f"{name} must be at least {minimum}")
+    return number
+
+
+class QueryHandler(BaseHTTPRequestHandler):
+    server_version = "WorkTimeTrackerQuery/1.0"
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        params = {key: values[-1] for key, values in parse_qs(url.query).items()}
+        routes = {
+            "/sessions": self.get_sessions,
+            "/sessions/last": self.get_last_sessions,
+            "/totals": self.get_totals,
+            "/daily": self.get_daily,
+        }
+        route = routes.get(url.path.rstrip("/") or "/")
+        if route is None:
+            self.send_error_json(404, f"unknown path {url.path}; use one of {', '.join(routes)}")
+            return
+        try:
+            fmt = params.get("format", "json")
+            if fmt not in FORMATS:
+                raise QueryError(f"format must be one of {', '.join(FORMATS)}")
+            start = parse_iso_date(params.get("start"), "start")
+            end = parse_iso_date(params.get("end"), "end")
+            reader = HistoryReader(self.server.db_path)
+        except QueryError as e:
+            self.send_error_json(400, str(e))
+            return
+        try:
+            route(reader, params, fmt, start, end)
+        except QueryError as e:
+            self.send_error_json(400, str(e))
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # Cliente desistiu no meio da resposta
+        finally:
+            reader.close()
+
+    def get_sessions(self, reader, params, fmt, start, end):
+        after = parse_int(params.get("after"), "after", 0)
+        limit = parse_int(params.get("limit"), "limit", DEFAULT_LIMIT, 1, MAX_LIMIT)
+        app_query = params.get("app")
+        next_after = reader.next_cursor(start, end, app_query, after, limit)
+        headers = {}
+        if next_after is not None:
+            headers["X-Next-After"] = str(next_after)
+            query = dict(params, after=next_after)
+            headers["Link"] = f'</sessions?{urlencode(query)}>; rel="next"'
+        rows = session_records(reader.sessions(start, end, app_query, after, limit))
+        self.stream(fmt, EXPORT_FIELDS, rows, headers, extra={"next": next_after})
+
+    def get_last_sessions(self, reader, params, fmt, start, end):
+        n = parse_int(params.get("n"), "n", 20, 1, MAX_LIMIT)
+        rows = reader.last_sessions(n, start, end, params.get("app"))
+        self.stream(fmt, EXPORT_FIELDS, session_records(rows))
+
+    def get_totals(self, reader, params, fmt, start, end):
+        rows = ({"app": app, "seconds": seconds}
+                for app, seconds in reader.app_totals(start, end, params.get("app")))
+        self.stream(fmt, ("app", "seconds"), rows)
+
+    def get_daily(self, reader, params, fmt, start, end):
+        rows = ({"date": date.fromordinal(day).isoformat(), "seconds": seconds}
+                for day, seconds in reader.daily_totals(start, end, params.get("app")))
+        self.stream(fmt, ("date", "seconds"), rows)
+
+    def stream(self, fmt, fields, records, headers=None, extra=None):
+        """Escreve os registros em blocos de CHUNK_ROWS, sem Content-Length (fim = conexão fechada).
+
+        Em JSON o corpo é {"rows": [...], ...extra}; em NDJSON e CSV, só as linhas.
+        """
+        self.send_response(200)
+        self.send_header("Content-Type", FORMATS[fmt])
+        self.send_header("Connection", "close")
+        for name, value in (headers or {}).items():
+            self.send_header(name, value)
+        self.end_headers()
+
+        buffer = io.StringIO()
+        if fmt == "csv":
+            writer = csv.DictWriter(buffer, fieldnames=fields, lineterminator="\n")
+            writer.writeheader()
+            write = writer.writerow
+        elif fmt == "ndjson":
+            def write(record):
+                buffer.write(json.dumps(record, ensure_ascii=False) + "\n")
+        else:
+            buffer.write('{"rows": [')
+            first = [True]
+
+            def write(record):
+                buffer.write(("" if first[0] else ", ") + json.dumps(record, ensure_ascii=False))
+                first[0] = False
+
+        for i, record in enumerate(records, 1):
+            write(record)
+            if i % CHUNK_ROWS == 0:
+                self.flush_buffer(buffer)
+        if fmt == "json":
+            buffer.write("]")
+            for key, value in (extra or {}).items():
+                buffer.write(f", {json.dumps(key)}: {json.dumps(value)}")
+            buffer.write("}")
+        self.flush_buffer(buffer)
+
+    def flush_buffer(self, buffer):
+        self.wfile.write(buffer.getvalue().encode("utf-8"))
+        buffer.seek(0)
+        buffer.truncate()
+
+    def send_error_json(self, status, message):
+        body = json.dumps({"error": message}).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        pass  # Sem log de acesso no terminal
+
+
+class QueryServer(ThreadingHTTPServer):
+    """Servidor da API em 127.0.0.1; cada requisição abre sua própria conexão somente leitura."""
+
+    daemon_threads = True
+
+    def __init__(self, db_path, port=DEFAULT_PORT):
+        self.db_path = db_path
+        super().__init__(("127.0.0.1", port), QueryHandler)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--data-dir", default=os.path.abspath("."), help="folder with time_history.db / time_history.csv")
+    parser.add_argument("--port", type=int, default=DEFAULT_PORT, help="loopback port (0: any free port)")
+    args = parser.parse_args()
+
+    server = QueryServer(prepare_database(args.data_dir), args.port)
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"History query API listening on http://127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+"""Relatórios de uso pela linha de comando, sem abrir a interface.
+
+    python report_cli.py                          # hoje, semana e mês (como a página de histórico)
+    python report_cli.py daily --days 14 --app code
+    python report_cli.py weekly --weeks 8
+    python report_cli.py monthly --months 12 --format csv
+    python report_cli.py apps --start 2024-01-01 --end 2024-03-31 --top 10
+
+Lê os totais diários do banco do histórico por uma conexão somente leitura;
+não importa Tk, NumPy nem matplotlib, então roda em máquinas sem display.
+"""
+import argparse
+import csv
+import json
+import os
+import sys
+from datetime import date
+
+from history_store import HistoryReader, format_seconds, prepare_database
+from usage_reports import daily_average, group_by_period, period_start, usage_totals, usage_window_start
+
+
+def months_back(day, months):
+    """Primeiro dia do mês `months` meses antes do mês de `day`."""
+    index = day.year * 12 + day.month - 1 - months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def read_daily(reader, start, end, app_query):
+    return {date.fromordinal(day): seconds for day, seconds in reader.daily_totals(start, end, app_query)}
+
+
+def summary_report(reader, args, today):
+    daily = read_daily(reader, usage_window_start(today), today, args.app)
+    labels = ("today", "week", "month")
+    return ("period", "seconds"), [{"period": label, "seconds": seconds}
+                                   for label, seconds in zip(labels, usage_totals(daily, today))], []
+
+
+def period_report(period, default_start):
+    def report(reader, args, today):
+        start = args.start or default_start(args, today)
+        daily = read_daily(reader, start, args.end or today, args.app)
+        return (period, "seconds"), [{period: day.isoformat(), "seconds": seconds}
+                                     for day, seconds in group_by_period(daily, period).items()], []
+    return report
+
+
+def apps_report(reader, args, today):
+    rows = [{"app": app, "seconds": seconds} for app, seconds in reader.app_totals(args.start, args.end, args.app)]
+    if args.top:
+        rows = rows[:args.top]
+    average = daily_average(read_daily(reader, args.start, args.end, args.app))
+    return ("app", "seconds"), rows, [("daily average", round(average) if average is not None else 0)]
+
+
+REPORTS = {
+    "summary": summary_report,
+    "daily": period_report("day", lambda args, today: date.fromordinal(today.toordinal() - args.days + 1)),
+    "weekly": period_report("week", lambda args, today: period_start(
+        date.fromordinal(today.toordinal() - 7 * (args.weeks - 1)), "week")),
+    "monthly": period_report("month", lambda args, today: months_back(today, args.months - 1)),
+    "apps": apps_report,
+}
+
+
+def print_report(fields, rows, fmt, footer=(), out=sys.stdout):
+    """Imprime as linhas; o rodapé (rótulo, segundos) só aparece no texto, fora dos dados."""
+    if fmt == "json":
+        json.dump(rows, out, ensure_ascii=False, indent=2)
+        out.write("\n")
+    elif fmt == "csv":
+        writer = csv.DictWriter(out, fieldnames=fields, lineterminator="\n")
+        writer.writeheader()
+        writer.writerows(rows)
+    else:
+        width = max([len(str(row[fields[0]])) for row in rows] + [len(label) + 2 for label, _ in footer] or [0])
+        for row in rows:
+            out.write(f"{str(row[fields[0]]):<{width}}  {format_seconds(row['seconds'])}\n")
+        for label, seconds in footer:
+            out.write(f"{'(' + label + ')':<{width}}  {format_seconds(seconds)}\n")
+
+
+def common_options(suppress):
+    """Opções aceitas antes ou depois do relatório; nas cópias dos subcomandos
+    o padrão é SUPPRESS, para não apagar o que foi dado antes do subcomando."""
+    def default(value):
+        return argparse.SUPPRESS if suppress else value
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument("--app", default=default(None), help="only apps whose name contains this text")
+    common.add_argument("--start", type=date.fromisoformat, default=default(None), help="first day (YYYY-MM-DD)")
+    common.add_argument("--end", type=date.fromisoformat, default=default(None), help="last day (YYYY-MM-DD)")
+    common.add_argument("--format", choices=("text", "json", "csv"), default=default("text"))
+    common.add_argument("--data-dir", default=default(os.path.abspath(".")),
+                        help="folder with time_history.db / time_history.csv")
+    return common
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter,
+                                     parents=[common_options(False)])
+    common = common_options(True)
+    sub = parser.add_subparsers(dest="report")
+    sub.add_parser("summary", parents=[common], help="usage today, this week and this month")
+    sub.add_parser("daily", parents=[common], help="seconds per day").add_argument("--days", type=int, default=7)
+    sub.add_parser("weekly", parents=[common], help="seconds per week (Monday first)").add_argument(
+        "--weeks", type=int, default=4)
+    sub.add_parser("monthly", parents=[common], help="seconds per month").add_argument(
+        "--months", type=int, default=6)
+    sub.add_parser("apps", parents=[common], help="seconds per app, largest first").add_argument(
+        "--top", type=int, default=None)
+    return parser
+
+
+def main(argv=None):
+    parser = build_parser()
+    args = parser.parse_args(argv)
+    args.report = args.report or "summary"
+    if args.report == "summary" and (args.start or args.end):
+        parser.error("summary always covers today, this week and this month; --start/--end apply to the other reports")
+    db_path = os.path.join(args.data_dir, "time_history.db")
+    if not os.path.exists(db_path):
+        prepare_database(args.data_dir)  # Primeira execução: importa o time_history.csv
+    reader = HistoryReader(db_path)
+    try:
+        fields, rows, footer = REPORTS[args.report](reader, args, date.today())
+    finally:
+        reader.close()
+    print_report(fields, rows, args.format, footer)
+
+
+if __name__ == "__main__":
+    main()
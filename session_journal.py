@@ -0,0 +1,105 @@
+import json
+import os
+import threading
+import uuid
+
+
+class SessionJournal:
+    """Journal append-only dos segmentos da sessão em andamento.
+
+    Cada segmento (início, fim, app, título da janela, inativo) vira uma linha
+    JSON. As linhas são acumuladas em memória e gravadas em lote por uma thread
+    de escrita, com um único fsync por lote, no mesmo arquivo mantido aberto.
+    Quando a sessão é salva no histórico o journal é truncado; o que sobrar
+    nele na próxima inicialização é uma sessão que não chegou a ser salva.
+
+    A primeira linha identifica a sessão ({"session": id}); o histórico guarda
+    esse id na mesma transação das linhas salvas, então uma queda entre salvar
+    e truncar não faz a sessão ser salva de novo na recuperação.
+    """
+
+    def __init__(self, path, flush_interval=5.0, batch_size=64):
+        self.path = path
+        self.flush_interval = flush_interval
+        self.batch_size = batch_size
+        self._pending = []
+        self._cond = threading.Condition()
+        self._closed = False
+        self._file = open(path, mode="a", encoding="utf-8")
+        self.session_id = self._read_session_id() if self._file.tell() else self._start_session()
+        self._writer = threading.Thread(target=self._write_loop, daemon=True)
+        self._writer.start()
+
+    def _read_session_id(self):
+        """Id do cabeçalho de um journal existente (None se for de uma versão sem cabeçalho)."""
+        with open(self.path, mode="r", encoding="utf-8") as file:
+            try:
+                header = json.loads(file.readline())
+            except json.JSONDecodeError:
+                return None
+        return header.get("session") if isinstance(header, dict) else None
+
+    def _start_session(self):
+        """Escreve o cabeçalho de uma sessão nova no journal vazio."""
+        session_id = uuid.uuid4().hex
+        self._file.write(json.dumps({"session": session_id}) + "\n")
+        self._file.flush()
+        os.fsync(self._file.fileno())
+        return session_id
+
+    def append_segment(self, start, end, app, title, idle):
+        """Enfileira um segmento; start/end em segundos desde a época."""
+        if end <= start:
+            return
+        record = {"start": round(start, 3), "end": round(end, 3), "app": app, "title": title, "idle": bool(idle)}
+        with self._cond:
+            self._pending.append(json.dumps(record, ensure_ascii=False))
+            if len(self._pending) >= self.batch_size:
+                self._cond.notify()
+
+    def _write_loop(self):
+        with self._cond:
+            while not self._closed:
+                self._cond.wait(self.flush_interval)
+                self._flush_locked()
+
+    def _flush_locked(self):
+        if not self._pending or self._file.closed:
+            return
+        self._file.write("\n".join(self._pending) + "\n")
+        self._pending = []
+        self._file.flush()
+        os.fsync(self._file.fileno())
+
+    def flush(self):
+        """Grava imediatamente os segmentos pendentes."""
+        with self._cond:
+            self._flush_locked()
+
+    def commit(self):
+        """A sessão foi salva (ou descartada): esvazia o journal."""
+        with self._cond:
+            self._pending = []
+            self._file.truncate(0)
+            self.session_id = self._start_session()
+
+    def recover(self):
+        """Segmentos gravados e ainda não salvos no histórico."""
+        self.flush()
+        segments = []
+        with open(self.path, mode="r", encoding="utf-8") as file:
+            for line in file:
+                try:
+                    record = json.loads(line)
+                except json.JSONDecodeError:
+                    continue  # Última linha cortada por uma queda no meio da escrita
+                if "session" not in record:
+                    segments.append(record)
+        return segments
+
+    def close(self):
+        with self._cond:
+            self._flush_locked()
+            self._closed = True
+            self._cond.notify()
+            self._file.close()
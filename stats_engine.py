@@ -0,0 +1,149 @@
+import threading
+from collections import OrderedDict, namedtuple
+from datetime import date
+
+import numpy as np
+
+# app_totals: {app: minutos} em ordem crescente
+# daily_average: minutos por dia com uso (None se não houver dados)
+# series: {app: (datas datetime64[D], minutos por dia)}
+# apps: todos os apps presentes no histórico (sem filtro), em ordem alfabética
+# daily_totals: (datas datetime64[D], minutos por dia) de todos os apps filtrados
+StatsResult = namedtuple("StatsResult", ["app_totals", "daily_average", "series", "apps", "daily_totals"])
+
+EMPTY_SERIES = (np.empty(0, dtype="datetime64[D]"), np.empty(0))
+
+
+def compute_stats(days, seconds, app_ids, app_names, selected_apps=None):
+    """Calcula as estatísticas do dashboard sobre as colunas do histórico.
+
+    days (datetime64[D]), seconds (int) e app_ids (índices em app_names) são
+    arrays NumPy de mesmo tamanho. Tudo é feito com bincount/unique, sem
+    laço Python por linha nem uma máscara por app, então o custo praticamente
+    não depende da quantidade de apps distintos.
+    """
+    days = np.asarray(days)
+    minutes = np.asarray(seconds, dtype=np.float64) / 60.0
+    app_ids = np.asarray(app_ids)
+    n_apps = len(app_names)
+
+    present = np.bincount(app_ids, minlength=n_apps) > 0 if len(app_ids) else np.zeros(n_apps, dtype=bool)
+    apps = sorted(app_names[i] for i in np.flatnonzero(present))
+
+    if selected_apps:
+        selected_apps = set(selected_apps)
+        wanted = np.array([name in selected_apps for name in app_names], dtype=bool)
+        mask = wanted[app_ids] if len(app_ids) else np.zeros(0, dtype=bool)
+        days, minutes, app_ids = days[mask], minutes[mask], app_ids[mask]
+
+    if len(app_ids) == 0:
+        return StatsResult({}, None, {}, apps, EMPTY_SERIES)
+
+    # Totais por app
+    totals = np.bincount(app_ids, weights=minutes, minlength=n_apps)
+    used = np.flatnonzero(np.bincount(app_ids, minlength=n_apps))
+    order = used[np.argsort(totals[used], kind="stable")]
+    app_totals = {app_names[i]: float(totals[i]) for i in order}
+
+    # Média diária (soma por dia, média entre os dias com uso)
+    unique_days, day_index = np.unique(days, return_inverse=True)
+    per_day = np.bincount(day_index, weights=minutes)
+    daily_average = float(per_day.mean())
+
+    # Séries por app e dia em uma única passada: chave combinada (app, dia)
+    n_days = len(unique_days)
+    keys = app_ids.astype(np.int64) * n_days + day_index
+    unique_keys, key_index = np.unique(keys, return_inverse=True)
+    key_minutes = np.bincount(key_index, weights=minutes)
+    key_apps = unique_keys // n_days
+    key_days = unique_days[unique_keys % n_days]
+    # unique_keys já está ordenado por app e depois por dia
+    bounds = np.flatnonzero(np.diff(key_apps)) + 1
+    series = {}
+    for start, end in zip(np.concatenate(([0], bounds)), np.concatenate((bounds, [len(unique_keys)]))):
+        series[app_names[key_apps[start]]] = (key_days[start:end], key_minutes[start:end])
+
+    return StatsResult(app_totals, daily_average, series, apps, (unique_days, per_day))
+
+
+def _add_to_series(series, day, minutes):
+    """Soma minutos ao dia `day` de uma série (datas ordenadas, valores)."""
+    dates, values = series
+    pos = np.searchsorted(dates, day)
+    if pos < len(dates) and dates[pos] == day:
+        values = values.copy()
+        values[pos] += minutes
+        return dates, values
+    return np.insert(dates, pos, day), np.insert(values, pos, minutes)
+
+
+def merge_rows(result, rows, selected_apps=None):
+    """Novo StatsResult com as linhas (dia ordinal, segundos, app) somadas a result.
+
+    Usado para atualizar snapshots em cache depois de uma gravação sem
+    recalcular o histórico inteiro.
+    """
+    app_totals = dict(result.app_totals)
+    series = dict(result.series)
+    daily_totals = result.daily_totals
+    apps = set(result.apps)
+    for day_ordinal, seconds, app in rows:
+        apps.add(app)
+        if selected_apps and app not in selected_apps:
+            continue
+        day = np.datetime64(date.fromordinal(day_ordinal), "D")
+        minutes = seconds / 60.0
+        app_totals[app] = app_totals.get(app, 0.0) + minutes
+        series[app] = _add_to_series(series.get(app, EMPTY_SERIES), day, minutes)
+        daily_totals = _add_to_series(daily_totals, day, minutes)
+    app_totals = dict(sorted(app_totals.items(), key=lambda item: item[1]))
+    daily_average = float(daily_totals[1].mean()) if len(daily_totals[1]) else None
+    return StatsResult(app_totals, daily_average, series, sorted(apps), daily_totals)
+
+
+class StatsCache:
+    """Cache LRU de StatsResult por (versão do histórico, apps filtrados).
+
+    Quando novas linhas são gravadas, apply_rows soma essas linhas aos
+    snapshots da versão anterior e os promove à nova versão, em vez de
+    descartar o cache inteiro.
+    """
+
+    def __init__(self, max_entries=16):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()  # (versão, frozenset(apps)) -> StatsResult
+        self._version = None
+        self._lock = threading.Lock()
+
+    def get(self, version, selected_apps):
+        key = (version, frozenset(selected_apps or ()))
+        with self._lock:
+            result = self._entries.get(key)
+            if result is not None:
+                self._entries.move_to_end(key)
+            return result
+
+    def put(self, version, selected_apps, result):
+        with self._lock:
+            if self._version is not None and version < self._version:
+                return  # Calculado sobre uma versão que já foi substituída
+            self._version = version
+            self._entries[(version, frozenset(selected_apps or ()))] = result
+            self._entries.move_to_end((version, frozenset(selected_apps or ())))
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def apply_rows(self, old_version, new_version, rows):
+        """Atualiza os snapshots de old_version com as linhas novas."""
+        with self._lock:
+            updated = OrderedDict()
+            for (version, apps), result in self._entries.items():
+                if version == old_version:
+                    updated[(new_version, apps)] = merge_rows(result, rows, apps)
+            self._entries = updated
+            self._version = new_version
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self._version = None
@@ -0,0 +1,198 @@
+import math
+import tkinter as tk
+
+import customtkinter as ctk
+import matplotlib.dates as mdates
+from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
+from matplotlib.figure import Figure
+from matplotlib.patches import Wedge
+from matplotlib import cm, style
+
+
+def format_minutes(minutes):
+    total_seconds = int(minutes * 60)
+    h = total_seconds // 3600
+    m = (total_seconds % 3600) // 60
+    s = total_seconds % 60
+    return f"{h:02d}:{m:02d}:{s:02d}"
+
+
+class StatsDashboard:
+    """Página de estatísticas montada uma única vez.
+
+    A figura, o canvas, o filtro e os labels são criados no primeiro uso e
+    depois só recebem dados novos: as fatias da pizza e as linhas do gráfico
+    são artistas reaproveitados e o canvas é redesenhado com draw_idle.
+    """
+
+    PIE_START_ANGLE = 140
+
+    def __init__(self, page, translate, on_back, on_apply_filter):
+        self.page = page
+        self.t = translate
+        self.on_apply_filter = on_apply_filter
+        self.app_list = []
+
+        # Frame rolável
+        scroll_frame = ctk.CTkScrollableFrame(page, fg_color="transparent", label_text="")
+        scroll_frame.pack(fill="both", expand=True, padx=0, pady=0)
+
+        # Frame para título e botão voltar
+        title_stats_frame = ctk.CTkFrame(scroll_frame, fg_color="transparent")
+        title_stats_frame.pack(fill="x", pady=(35, 10), padx=0)
+        ctk.CTkButton(
+            title_stats_frame,
+            text=f"‹ {translate('back')}",
+            width=80,
+            fg_color="#6b7280",
+            hover_color="#374151",
+            text_color="#FFFFFF",
+            font=("Arial", 12, "bold"),
+            command=on_back
+        ).pack(side="left", padx=(0, 0), pady=0)
+        ctk.CTkLabel(title_stats_frame, text=translate("statistics"), font=("Arial", 18, "bold"), text_color="#22d3ee").pack(side="left", padx=(90,0))
+
+        # Aviso de carregamento / sem dados / erro
+        self.status_label = ctk.CTkLabel(scroll_frame, text="")
+        self.status_label.pack(pady=(0, 5))
+
+        # Frame com borda arredondada para filtro e Listbox
+        filter_frame = ctk.CTkFrame(scroll_frame, corner_radius=5, fg_color="#323b4c")
+        filter_frame.pack(fill="x", padx=20, pady=(0, 10), anchor="w")
+        ctk.CTkLabel(filter_frame, text=translate("total_time_by_app"), font=("Arial", 12, "bold"), text_color="white", fg_color="transparent").pack(side="top", anchor="w", padx=(5, 0), pady=(5, 0))
+        # Listbox nativo do tkinter para múltipla seleção, com customização de cores
+        listbox_frame = tk.Frame(filter_frame, bg="#323b4c")
+        listbox_frame.pack(side="top", anchor="w", pady=(5, 5), padx=(5, 0))
+        self.app_listbox = tk.Listbox(
+            listbox_frame,
+            selectmode="multiple",
+            exportselection=False,
+            height=1,
+            width=max(28, min(60, int(page.winfo_width() / 8))),
+            bg="#323b4c",
+            fg="white",
+            selectbackground="#444b5a",
+            selectforeground="white",
+            highlightthickness=0,
+            relief="flat",
+            borderwidth=0,
+            font=("Arial", 11)
+        )
+        self.app_listbox.pack(side="left", fill="x", expand=True)
+        ctk.CTkButton(filter_frame, text=translate("apply"), width=60, command=self._apply_filter).pack(side="left", padx=(10,0))
+
+        # Estatísticas textuais
+        stats_frame = ctk.CTkFrame(scroll_frame)
+        stats_frame.pack(fill="x", padx=20, pady=10)
+        self.daily_avg_label = ctk.CTkLabel(stats_frame, text="", font=("Arial", 12))
+        self.daily_avg_label.pack(anchor="w", pady=5)
+        self.app_totals_label = ctk.CTkLabel(stats_frame, text="", font=("Arial", 12), justify="left")
+        self.app_totals_label.pack(anchor="w", padx=20)
+
+        # Figura única (fora do pyplot, para não acumular figuras globais)
+        with style.context('dark_background'):
+            self.figure = Figure(figsize=(10, 8), dpi=100, facecolor='#232b3b')
+            self.ax_pie, self.ax_line = self.figure.subplots(2, 1, gridspec_kw={'height_ratios': [1, 1]})
+        self.ax_pie.set_aspect('equal')
+        self.ax_pie.set_xlim(-1.4, 1.4)
+        self.ax_pie.set_ylim(-1.25, 1.25)
+        self.ax_pie.axis('off')
+        self.ax_pie.set_title(translate("pie_chart_title") if translate("pie_chart_title") != "pie_chart_title" else "Usage Distribution (Pie)", color='white', fontsize=11)
+        self._wedges = []  # [(Wedge, label Text, percentual Text)]
+
+        self.ax_line.set_facecolor('#232b3b')
+        self.ax_line.set_title(translate("app_usage_over_time"), color='white', fontsize=11)
+        self.ax_line.set_xlabel('Date', color='white', fontsize=11)
+        self.ax_line.set_ylabel('Minutes', color='white', fontsize=11)
+        self.ax_line.tick_params(colors='white', labelsize=11, rotation=45)
+        self.ax_line.xaxis_date()
+        self._lines = {}  # app -> Line2D
+        self.figure.tight_layout(pad=2.0)
+
+        self.canvas = FigureCanvasTkAgg(self.figure, master=scroll_frame)
+        self.canvas.get_tk_widget().pack(fill="both", expand=True, padx=10, pady=10)
+
+    def _apply_filter(self):
+        self.on_apply_filter([self.app_list[int(i)] for i in self.app_listbox.curselection()])
+
+    def show_status(self, text):
+        self.status_label.configure(text=text)
+
+    def update(self, stats, selected_apps):
+        """Atualiza widgets e artistas com um StatsResult (ou None se não houver histórico)."""
+        if stats is None:
+            self.show_status(self.t("no_history"))
+            stats_apps, app_totals, daily_avg, series = [], {}, None, {}
+        else:
+            self.show_status("")
+            stats_apps, app_totals, daily_avg, series = stats.apps, stats.app_totals, stats.daily_average, stats.series
+
+        # Filtro: conteúdo da Listbox trocado no lugar
+        self.app_list = list(stats_apps)
+        self.app_listbox.delete(0, tk.END)
+        for idx, app in enumerate(self.app_list):
+            self.app_listbox.insert(tk.END, app)
+            # Seleciona apps previamente filtrados
+            if app in selected_apps:
+                self.app_listbox.selection_set(idx)
+        self.app_listbox.configure(height=max(1, min(8, len(self.app_list))))
+
+        self.daily_avg_label.configure(text=self.t("daily_average", minutes=format_minutes(daily_avg) if daily_avg is not None else "00:00:00"))
+        self.app_totals_label.configure(text="\n".join(f"{app}: {minutes:.1f} minutes" for app, minutes in app_totals.items()))
+
+        self._update_pie(app_totals)
+        self._update_lines(series)
+        self.canvas.draw_idle()
+
+    def _update_pie(self, app_totals):
+        total = sum(app_totals.values())
+        items = list(app_totals.items()) if total > 0 else []
+        colors = cm.Set3.colors
+        while len(self._wedges) < len(items):
+            wedge = Wedge((0, 0), 1.0, 0, 0, edgecolor='#232b3b')
+            self.ax_pie.add_patch(wedge)
+            label = self.ax_pie.text(0, 0, "", color='white', fontsize=11)
+            pct = self.ax_pie.text(0, 0, "", color='white', fontsize=11, ha='center', va='center')
+            self._wedges.append((wedge, label, pct))
+        angle = self.PIE_START_ANGLE
+        for i, (wedge, label, pct) in enumerate(self._wedges):
+            if i >= len(items):
+                for artist in (wedge, label, pct):
+                    artist.set_visible(False)
+                continue
+            app, minutes = items[i]
+            span = 360.0 * minutes / total
+            wedge.set_theta1(angle)
+            wedge.set_theta2(angle + span)
+            wedge.set_facecolor(colors[i % len(colors)])
+            middle = math.radians(angle + span / 2)
+            x, y = math.cos(middle), math.sin(middle)
+            label.set_text(app)
+            label.set_position((1.1 * x, 1.1 * y))
+            label.set_horizontalalignment('left' if x >= 0 else 'right')
+            label.set_verticalalignment('center')
+            pct.set_text(f"{100.0 * minutes / total:.1f}%")
+            pct.set_position((0.6 * x, 0.6 * y))
+            for artist in (wedge, label, pct):
+                artist.set_visible(True)
+            angle += span
+
+    def _update_lines(self, series):
+        for app in list(self._lines):
+            if app not in series:
+                self._lines.pop(app).remove()
+        for app, (dates, minutes) in series.items():
+            x = mdates.date2num(dates)
+            if app in self._lines:
+                self._lines[app].set_data(x, minutes)
+            else:
+                self._lines[app], = self.ax_line.plot(x, minutes, label=app)
+        self.ax_line.relim()
+        self.ax_line.autoscale_view()
+        if self._lines:
+            self.ax_line.legend(loc='upper left', facecolor='#232b3b', edgecolor='white', labelcolor='white', fontsize=11)
+        elif self.ax_line.get_legend() is not None:
+            self.ax_line.get_legend().remove()
+
+    def destroy(self):
+        self.figure.clear()
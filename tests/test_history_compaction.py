@@ -0,0 +1,217 @@
+import sqlite3
+import threading
+from collections import Counter
+from datetime import date, timedelta
+
+import pytest
+
+from columnar_history import CURRENT_FILE, EPOCH_ORDINAL
+from history_store import HistoryReader, HistoryStore
+
+TODAY = date(2024, 6, 30)
+CUTOFF = TODAY - timedelta(days=30)
+APPS = ["code.exe", "chrome.exe", "slack.exe"]
+
+
+def history_rows():
+    """Várias sessões por dia e app nos 60 dias antes de TODAY, mais uma linha sem data válida."""
+    rows = []
+    for offset in range(60):
+        day = (TODAY - timedelta(days=offset)).strftime("%d/%m/%Y")
+        for i, app in enumerate(APPS):
+            for n in range(1 + (offset + i) % 3):
+                rows.append([day, f"{9 + n:02d}:00:00", app, f"00:{offset % 50:02d}:{10 + n:02d}"])
+    rows.append(["not a date", "10:00:00", "code.exe", "00:01:00"])
+    return rows
+
+
+@pytest.fixture
+def store(tmp_path):
+    store = HistoryStore(str(tmp_path / "time_history.db"), columnar_dir=str(tmp_path / "cols"))
+    store.add_rows(history_rows())
+    yield store
+    store.close()
+
+
+def db_totals(store):
+    """(por app, por dia, por (dia, app)) somados das sessões e de daily_totals."""
+    reader = HistoryReader(store.db_path)
+    try:
+        per_app = dict(reader.app_totals())
+        per_day = dict(reader.daily_totals())
+        per_group = Counter()
+        for _, day, _, _, app, seconds in reader.sessions():
+            per_group[(day, app)] += seconds
+    finally:
+        reader.close()
+    return per_app, per_day, per_group
+
+
+def columnar_totals(store):
+    days, seconds, app_ids, app_names = store.columns_snapshot()[1]
+    totals = Counter()
+    for day, sec, app in zip(days.astype("int64").tolist(), seconds.tolist(), app_ids.tolist()):
+        totals[(day + EPOCH_ORDINAL, app_names[app])] += sec
+    return totals
+
+
+def dated_totals(per_group):
+    return Counter({key: value for key, value in per_group.items() if key[0] is not None})
+
+
+def session_count(store):
+    with sqlite3.connect(store.db_path) as conn:
+        return conn.execute("SELECT COUNT(*) FROM sessions").fetchone()[0]
+
+
+def test_compaction_keeps_every_total(store):
+    before = db_totals(store)
+    count = session_count(store)
+    removed = store.compact(CUTOFF)
+
+    assert removed > 0
+    assert session_count(store) == count - removed
+    assert db_totals(store) == before
+    # Antes do corte, uma linha por dia e app; a partir dele e sem data, nada muda
+    with sqlite3.connect(store.db_path) as conn:
+        assert conn.execute("SELECT COUNT(*) FROM sessions WHERE day < ? GROUP BY day, app_id HAVING COUNT(*) > 1",
+                            (CUTOFF.toordinal(),)).fetchall() == []
+        assert conn.execute("SELECT COUNT(*) FROM sessions WHERE day IS NULL").fetchone()[0] == 1
+    assert store.compact(CUTOFF) == 0
+
+
+def test_compaction_keeps_first_session_of_each_group(store):
+    old_day = (CUTOFF - timedelta(days=1)).toordinal()
+    with sqlite3.connect(store.db_path) as conn:
+        query = ("SELECT MIN(s.id), MIN(s.time), SUM(s.seconds) FROM sessions s "
+                 "WHERE s.day = ? GROUP BY s.app_id ORDER BY 1")
+        before = conn.execute(query, (old_day,)).fetchall()
+    store.compact(CUTOFF)
+    with sqlite3.connect(store.db_path) as conn:
+        after = conn.execute("SELECT id, time, seconds FROM sessions WHERE day = ? ORDER BY id", (old_day,)).fetchall()
+    assert after == [tuple(row) for row in before]
+
+
+def test_archive_holds_the_original_rows(store, tmp_path):
+    archive_path = str(tmp_path / "archive.db")
+    with sqlite3.connect(store.db_path) as conn:
+        originals = conn.execute(
+            "SELECT s.id, s.day, s.date, s.time, a.name, s.seconds FROM sessions s JOIN apps a ON a.id = s.app_id "
+            "WHERE s.day < ? AND (s.day, s.app_id) IN "
+            "(SELECT day, app_id FROM sessions GROUP BY day, app_id HAVING COUNT(*) > 1) ORDER BY s.id",
+            (CUTOFF.toordinal(),)).fetchall()
+    removed = store.compact(CUTOFF, archive_path)
+
+    with sqlite3.connect(archive_path) as conn:
+        archived = conn.execute("SELECT id, day, date, time, app, seconds FROM sessions ORDER BY id").fetchall()
+    assert archived == originals
+    assert len(archived) > removed  # A linha que fica também é arquivada, com os valores originais
+    # Compactar de novo não duplica nem altera o arquivo
+    store.compact(CUTOFF, archive_path)
+    with sqlite3.connect(archive_path) as conn:
+        assert conn.execute("SELECT id, day, date, time, app, seconds FROM sessions ORDER BY id").fetchall() == archived
+
+
+def test_columnar_copy_switches_to_a_new_generation(store, tmp_path):
+    base = tmp_path / "cols"
+    # Criada vazia, a cópia começa no layout antigo (colunas direto na pasta, sem CURRENT)
+    assert not (base / CURRENT_FILE).exists() and (base / "day.i32").exists()
+    version = store.version
+    store.compact(CUTOFF)
+
+    current = (base / CURRENT_FILE).read_text(encoding="utf-8")
+    # O layout antigo faz o papel de geração anterior até a próxima troca
+    assert (base / current / "day.i32").exists() and (base / "day.i32").exists()
+    assert store.version == version + 1
+    assert columnar_totals(store) == dated_totals(db_totals(store)[2])
+    with sqlite3.connect(store.db_path) as conn:
+        dated = conn.execute("SELECT COUNT(*) FROM sessions WHERE day IS NOT NULL").fetchone()[0]
+    assert store.columnar.row_count() == dated
+
+    # Fica a geração ativa e a anterior; a troca seguinte apaga a mais antiga
+    store.add_rows([["01/01/2000", "10:00:00", "code.exe", "00:00:01"],
+                    ["01/01/2000", "11:00:00", "code.exe", "00:00:01"]])
+    store.compact(CUTOFF)
+    newest = (base / CURRENT_FILE).read_text(encoding="utf-8")
+    assert newest != current
+    assert not (base / "day.i32").exists()
+    assert sorted(p.name for p in base.iterdir() if p.name.startswith("gen-")) == sorted([current, newest])
+    store.add_rows([["01/01/2000", "12:00:00", "code.exe", "00:00:01"]])
+    store.compact(CUTOFF)
+    latest = (base / CURRENT_FILE).read_text(encoding="utf-8")
+    assert sorted(p.name for p in base.iterdir() if p.name.startswith("gen-")) == sorted([newest, latest])
+    newest = latest
+
+    # Reabrir encontra a cópia em sincronia com o banco (sem reconstruir)
+    store.close()
+    reopened = HistoryStore(store.db_path, columnar_dir=str(base))
+    try:
+        assert (base / CURRENT_FILE).read_text(encoding="utf-8") == newest
+        assert columnar_totals(reopened) == dated_totals(db_totals(reopened)[2])
+    finally:
+        reopened.close()
+
+
+def test_sessions_saved_during_compaction_are_kept(store):
+    before = db_totals(store)[2]
+    saved = []
+
+    def save(label):
+        row = [TODAY.strftime("%d/%m/%Y"), "23:00:00", f"{label}.exe", "00:00:07"]
+        store.add_rows([row])
+        saved.append(row)
+
+    # Uma gravação chega durante cada bloco de dias (espera o lock) e outra durante
+    # a leitura da geração colunar nova (fora do lock)
+    savers = []
+    compact_days = store._compact_days
+
+    def compact_days_while_saving(*args):
+        savers.append(threading.Thread(target=save, args=("between_chunks",)))
+        savers[-1].start()
+        return compact_days(*args)
+    store._compact_days = compact_days_while_saving
+    build_generation = store.columnar.build_generation
+
+    def build_while_saving(batches):
+        generation = build_generation(batches)
+        save("during_rebuild")
+        return generation
+    store.columnar.build_generation = build_while_saving
+
+    store.compact(CUTOFF, chunk_days=7)
+    for thread in savers:
+        thread.join()
+
+    assert len(savers) > 1
+    assert {row[2] for row in saved} == {"between_chunks.exe", "during_rebuild.exe"}
+    expected = before.copy()
+    for date_str, _, app, _ in saved:
+        expected[(TODAY.toordinal(), app)] += 7
+    per_group = db_totals(store)[2]
+    assert per_group == expected
+    assert columnar_totals(store) == dated_totals(expected)
+
+
+def test_compaction_runs_alongside_a_saving_thread(store):
+    before = db_totals(store)[2]
+    stop = threading.Event()
+    saved = Counter()
+
+    def saver():
+        while not stop.is_set():
+            store.add_rows([[TODAY.strftime("%d/%m/%Y"), "23:59:00", "saver.exe", "00:00:01"]])
+            saved[(TODAY.toordinal(), "saver.exe")] += 1
+
+    thread = threading.Thread(target=saver)
+    thread.start()
+    try:
+        store.compact(CUTOFF, chunk_days=3)
+    finally:
+        stop.set()
+        thread.join()
+
+    assert saved
+    expected = before + saved
+    assert db_totals(store)[2] == expected
+    assert columnar_totals(store) == dated_totals(expected)
@@ -0,0 +1,80 @@
+import pytest
+
+import idle_detector
+from idle_detector import LinuxIdleDetector
+from tracking_service import TrackingService
+from window_watcher import WindowWatcher
+
+
+class FakeInputSource:
+    """Fonte de entrada falsa: devolve os ms sem entrada que o teste definir."""
+
+    def __init__(self, idle_ms=0):
+        self.idle_ms = idle_ms
+        self.calls = 0
+
+    def __call__(self):
+        self.calls += 1
+        if isinstance(self.idle_ms, Exception):
+            raise self.idle_ms
+        return self.idle_ms
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Relógio monotônico controlado pelo teste, compartilhado pelo detector e pelo tracker."""
+    now = [1000.0]
+    monkeypatch.setattr(idle_detector.time, "monotonic", lambda: now[0])
+    return now
+
+
+def make_service(source):
+    return TrackingService(None, None, window_watcher=WindowWatcher(),
+                           idle_detector=LinuxIdleDetector(input_source=source))
+
+
+def test_idle_seconds_come_from_the_input_source():
+    source = FakeInputSource(2500)
+    detector = LinuxIdleDetector(input_source=source)
+    assert detector.idle_seconds() == 2.5
+    source.idle_ms = 0
+    assert detector.idle_seconds() == 0.0
+    assert source.calls == 2
+
+
+def test_last_input_time_is_now_minus_idle(clock):
+    detector = LinuxIdleDetector(input_source=FakeInputSource(4000))
+    assert detector.last_input_time() == 996.0
+
+
+def test_tracker_follows_the_input_source(clock):
+    source = FakeInputSource(0)
+    service = make_service(source)
+    service.idle_threshold = 10
+    service.last_activity_time = 0.0
+
+    assert service.check_input_activity() == 1000.0
+    assert service.is_user_active()
+
+    # Sem entrada desde então: passa do limite e fica inativo
+    clock[0] = 1012.0
+    source.idle_ms = 12000
+    assert service.check_input_activity() == 1000.0
+    assert not service.is_user_active()
+
+    # Entrada nova volta a contar como atividade
+    clock[0] = 1015.0
+    source.idle_ms = 500
+    assert service.check_input_activity() == 1014.5
+    assert service.is_user_active()
+
+
+def test_source_errors_keep_the_last_activity(clock):
+    source = FakeInputSource(0)
+    service = make_service(source)
+    service.check_input_activity()
+
+    source.idle_ms = OSError("XScreenSaverQueryInfo failed")
+    clock[0] = 1005.0
+    assert service.check_input_activity() == 1000.0
+    assert service.metrics.snapshot()["counters"]["idle_errors"] == 1
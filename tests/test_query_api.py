@@ -0,0 +1,114 @@
+import csv
+import io
+import json
+import threading
+import urllib.error
+import urllib.request
+
+import pytest
+
+from history_store import HistoryStore
+from query_api import QueryServer
+
+ROWS = [
+    ["01/01/2024", "09:00:00", "code.exe", "00:10:00"],
+    ["01/01/2024", "10:00:00", "chrome.exe", "00:05:00"],
+    ["02/01/2024", "09:00:00", "code.exe", "00:20:00"],
+    ["03/01/2024", "09:00:00", "slack.exe", "00:01:00"],
+    ["03/01/2024", "11:00:00", "code.exe", "00:30:00"],
+]
+
+
+@pytest.fixture
+def api(tmp_path):
+    db_path = str(tmp_path / "time_history.db")
+    store = HistoryStore(db_path)
+    store.add_rows(ROWS)
+    server = QueryServer(db_path, 0)
+    thread = threading.Thread(target=server.serve_forever, daemon=True)
+    thread.start()
+    yield f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+    server.server_close()
+
+
+def get(base, path):
+    """(status, cabeçalhos, corpo em texto), também para respostas de erro."""
+    try:
+        with urllib.request.urlopen(base + path) as response:
+            return response.status, response.headers, response.read().decode("utf-8")
+    except urllib.error.HTTPError as e:
+        return e.code, e.headers, e.read().decode("utf-8")
+
+
+def test_sessions_pagination_follows_next_after(api):
+    status, headers, body = get(api, "/sessions?limit=2")
+    assert status == 200
+    page = json.loads(body)
+    assert [row["id"] for row in page["rows"]] == [1, 2]
+    assert headers["X-Next-After"] == "2" and page["next"] == 2
+    assert "after=2" in headers["Link"]
+
+    seen = [row["id"] for row in page["rows"]]
+    after = headers["X-Next-After"]
+    while after is not None:
+        status, headers, body = get(api, f"/sessions?limit=2&after={after}")
+        seen += [row["id"] for row in json.loads(body)["rows"]]
+        after = headers["X-Next-After"]
+    assert seen == [1, 2, 3, 4, 5]
+
+
+def test_sessions_pagination_keeps_filters(api):
+    status, headers, body = get(api, "/sessions?app=CODE&limit=2")
+    assert [row["date"] for row in json.loads(body)["rows"]] == ["2024-01-01", "2024-01-02"]
+    status, headers, body = get(api, f"/sessions?app=CODE&limit=2&after={headers['X-Next-After']}")
+    page = json.loads(body)
+    assert [(row["app"], row["seconds"]) for row in page["rows"]] == [("code.exe", 1800)]
+    assert page["next"] is None and "X-Next-After" not in headers
+
+
+def test_formats(api):
+    status, headers, body = get(api, "/sessions?format=ndjson&end=2024-01-01")
+    assert headers["Content-Type"] == "application/x-ndjson"
+    assert [json.loads(line) for line in body.splitlines()] == [
+        {"id": 1, "date": "2024-01-01", "time": "09:00:00", "app": "code.exe", "seconds": 600},
+        {"id": 2, "date": "2024-01-01", "time": "10:00:00", "app": "chrome.exe", "seconds": 300},
+    ]
+
+    status, headers, body = get(api, "/totals?format=csv")
+    assert headers["Content-Type"].startswith("text/csv")
+    assert list(csv.DictReader(io.StringIO(body))) == [
+        {"app": "code.exe", "seconds": "3600"},
+        {"app": "chrome.exe", "seconds": "300"},
+        {"app": "slack.exe", "seconds": "60"},
+    ]
+
+    status, headers, body = get(api, "/daily?start=2024-01-02")
+    assert json.loads(body) == {"rows": [{"date": "2024-01-02", "seconds": 1200},
+                                         {"date": "2024-01-03", "seconds": 1860}]}
+
+
+def test_last_sessions_applies_filters(api):
+    status, headers, body = get(api, "/sessions/last?n=2&app=code")
+    assert [row["id"] for row in json.loads(body)["rows"]] == [3, 5]
+    status, headers, body = get(api, "/sessions/last?n=5&start=2024-01-02&end=2024-01-02")
+    assert [row["id"] for row in json.loads(body)["rows"]] == [3]
+
+
+@pytest.mark.parametrize("path", [
+    "/sessions?start=2024-13-01",
+    "/sessions?limit=0",
+    "/sessions?after=x",
+    "/sessions?format=xml",
+    "/sessions/last?n=-1",
+])
+def test_invalid_parameters_return_400(api, path):
+    status, headers, body = get(api, path)
+    assert status == 400
+    assert "error" in json.loads(body)
+
+
+def test_unknown_path_returns_404(api):
+    status, headers, body = get(api, "/nope")
+    assert status == 404
+    assert "/sessions" in json.loads(body)["error"]
@@ -0,0 +1,137 @@
+import random
+from collections import defaultdict
+from datetime import date, timedelta
+
+import numpy as np
+import pytest
+
+from stats_engine import StatsCache, compute_stats, merge_rows
+
+APP_NAMES = ["code.exe", "chrome.exe", "slack.exe", "spotify.exe", "unused.exe"]
+START = date(2024, 1, 1)
+
+
+def random_rows(n, seed=0, apps=APP_NAMES[:4], days=30):
+    """(data, segundos, app) espalhados por `days` dias."""
+    rng = random.Random(seed)
+    return [(START + timedelta(days=rng.randrange(days)), rng.randint(1, 3600), rng.choice(apps))
+            for _ in range(n)]
+
+
+def columns(rows, app_names=APP_NAMES):
+    days = np.array([day for day, _, _ in rows], dtype="datetime64[D]")
+    seconds = np.array([s for _, s, _ in rows], dtype=np.int64)
+    app_ids = np.array([app_names.index(app) for _, _, app in rows], dtype=np.int64)
+    return days, seconds, app_ids, app_names
+
+
+def naive_stats(rows, selected_apps=None):
+    """A mesma agregação, linha a linha com dicionários."""
+    totals = defaultdict(float)
+    per_day = defaultdict(float)
+    series = defaultdict(lambda: defaultdict(float))
+    for day, seconds, app in rows:
+        if selected_apps and app not in selected_apps:
+            continue
+        totals[app] += seconds / 60
+        per_day[day] += seconds / 60
+        series[app][day] += seconds / 60
+    average = sum(per_day.values()) / len(per_day) if per_day else None
+    apps = sorted({app for _, _, app in rows})
+    return totals, average, series, apps, per_day
+
+
+def as_dict(series):
+    dates, values = series
+    return dict(zip(dates.astype(object), values.tolist()))
+
+
+def assert_matches_naive(result, rows, selected_apps=None):
+    totals, average, series, apps, per_day = naive_stats(rows, selected_apps)
+    assert result.app_totals == pytest.approx(totals)
+    assert list(result.app_totals.values()) == sorted(result.app_totals.values())
+    assert result.apps == apps
+    if average is None:
+        assert result.daily_average is None
+    else:
+        assert result.daily_average == pytest.approx(average)
+    assert set(result.series) == set(series)
+    for app, expected in series.items():
+        dates, _ = result.series[app]
+        assert list(dates) == sorted(dates)
+        assert as_dict(result.series[app]) == pytest.approx(dict(expected))
+    assert as_dict(result.daily_totals) == pytest.approx(dict(per_day))
+
+
+@pytest.mark.parametrize("selected_apps", [None, ["chrome.exe"], ["code.exe", "slack.exe"], ["missing.exe"]])
+def test_compute_stats_matches_naive_aggregation(selected_apps):
+    rows = random_rows(2000)
+    result = compute_stats(*columns(rows), selected_apps)
+    assert_matches_naive(result, rows, selected_apps)
+
+
+def test_compute_stats_on_empty_history():
+    result = compute_stats(*columns([]))
+    assert result.app_totals == {} and result.series == {} and result.apps == []
+    assert result.daily_average is None
+    assert len(result.daily_totals[0]) == 0
+
+
+@pytest.mark.parametrize("selected_apps", [None, ["code.exe", "spotify.exe"]])
+def test_merge_rows_matches_a_full_recompute(selected_apps):
+    rows = random_rows(1000, seed=1)
+    # Linhas novas com dias já vistos, dias novos e um app que ainda não existia
+    new_rows = random_rows(50, seed=2, days=40) + [(START + timedelta(days=60), 90, "spotify.exe")]
+    cached = compute_stats(*columns(rows), selected_apps)
+    merged = merge_rows(cached, [(day.toordinal(), s, app) for day, s, app in new_rows],
+                        selected_apps and frozenset(selected_apps))
+    assert_matches_naive(merged, rows + new_rows, selected_apps)
+    # O snapshot original não é alterado
+    assert_matches_naive(cached, rows, selected_apps)
+
+
+def test_merge_rows_into_empty_history():
+    new_rows = [(START, 60, "code.exe"), (START, 120, "chrome.exe"), (START + timedelta(days=1), 30, "code.exe")]
+    merged = merge_rows(compute_stats(*columns([])), [(day.toordinal(), s, app) for day, s, app in new_rows])
+    assert_matches_naive(merged, new_rows)
+    assert merged.daily_average == pytest.approx(1.75)
+
+
+def test_cache_hit_ignores_app_order():
+    cache = StatsCache()
+    result = compute_stats(*columns(random_rows(100)), ["code.exe", "chrome.exe"])
+    cache.put(3, ["code.exe", "chrome.exe"], result)
+    assert cache.get(3, ["chrome.exe", "code.exe"]) is result
+    assert cache.get(3, None) is None
+
+
+def test_cache_misses_after_the_version_changes():
+    cache = StatsCache()
+    cache.put(1, None, compute_stats(*columns(random_rows(100))))
+    assert cache.get(2, None) is None
+    # Resultado calculado sobre uma versão já substituída não entra
+    cache.put(2, None, compute_stats(*columns(random_rows(100))))
+    cache.put(1, ["code.exe"], compute_stats(*columns(random_rows(100)), ["code.exe"]))
+    assert cache.get(1, ["code.exe"]) is None
+
+
+def test_cache_apply_rows_promotes_snapshots_to_the_new_version():
+    rows = random_rows(200)
+    new_rows = [(START + timedelta(days=45), 600, "slack.exe")]
+    cache = StatsCache()
+    cache.put(1, None, compute_stats(*columns(rows)))
+    cache.apply_rows(1, 2, [(day.toordinal(), s, app) for day, s, app in new_rows])
+    assert cache.get(1, None) is None
+    assert_matches_naive(cache.get(2, None), rows + new_rows)
+
+
+def test_cache_evicts_the_least_recently_used_entry():
+    cache = StatsCache(max_entries=2)
+    stats = {app: compute_stats(*columns(random_rows(50)), [app]) for app in APP_NAMES[:3]}
+    cache.put(1, ["code.exe"], stats["code.exe"])
+    cache.put(1, ["chrome.exe"], stats["chrome.exe"])
+    assert cache.get(1, ["code.exe"]) is stats["code.exe"]  # chrome.exe passa a ser a mais antiga
+    cache.put(1, ["slack.exe"], stats["slack.exe"])
+    assert cache.get(1, ["chrome.exe"]) is None
+    assert cache.get(1, ["code.exe"]) is stats["code.exe"]
+    assert cache.get(1, ["slack.exe"]) is stats["slack.exe"]
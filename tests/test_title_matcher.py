@@ -0,0 +1,59 @@
+import pytest
+
+from title_matcher import TitleMatcher
+
+
+def test_priority_exact_prefix_regex_substring():
+    matcher = TitleMatcher(["Code", "re:Visual.*Code", "^main.py", "=main.py - Visual Studio Code"])
+    assert matcher.match_all("main.py - Visual Studio Code") == (
+        "=main.py - Visual Studio Code", "^main.py", "re:Visual.*Code", "Code")
+    assert matcher.match("main.py - Visual Studio Code") == "=main.py - Visual Studio Code"
+    assert matcher.match("main.py - Notepad") == "^main.py"
+    assert matcher.match("app.py - Visual Studio Code") == "re:Visual.*Code"
+    assert matcher.match("VS Code") == "Code"
+    assert matcher.match("Firefox") is None
+
+
+def test_ties_prefer_longer_pattern_then_rule_order():
+    matcher = TitleMatcher(["Code", "Studio Code", "Visual"])
+    assert matcher.match_all("Visual Studio Code") == ("Studio Code", "Visual", "Code")
+    assert TitleMatcher(["abc", "xyz"]).match_all("abc xyz") == ("abc", "xyz")
+
+
+def test_overlapping_literals_all_match():
+    assert TitleMatcher(["Code", "de - V"]).match_all("Code - VS") == ("de - V", "Code")
+
+
+def test_regex_rules_keep_global_flags_and_backreferences():
+    assert TitleMatcher(["re:(?i)code"]).match("VS CODE") == "re:(?i)code"
+    assert TitleMatcher(["re:(a)\\1"]).match("xaay") == "re:(a)\\1"
+    assert TitleMatcher(["re:(?P<n>x)", "re:(?P<n>y)"]).match_all("xy") == ("re:(?P<n>x)", "re:(?P<n>y)")
+
+
+@pytest.mark.parametrize("rule", ["re:(", "re:[a-", "re:*x"])
+def test_invalid_regex_rule_raises_value_error(rule):
+    with pytest.raises(ValueError, match=r"re:"):
+        TitleMatcher(["Code", rule])
+
+
+def test_literal_rules_are_not_regexes():
+    matcher = TitleMatcher(["a.b", "^(x)", "=[y]"])
+    assert matcher.match("axb") is None
+    assert matcher.match("a.b") == "a.b"
+    assert matcher.match("(x) title") == "^(x)"
+    assert matcher.match("[y]") == "=[y]"
+
+
+def test_last_title_is_cached():
+    matcher = TitleMatcher(["Code"])
+    first = matcher.match_all("VS Code")
+    matcher._substrings = []  # Se as regras forem reavaliadas, nada casa
+    assert matcher.match_all("VS Code") is first
+    assert matcher.match_all("Firefox") == ()
+    assert matcher.match_all("VS Code") == ()
+
+
+def test_empty_title_matches_nothing():
+    matcher = TitleMatcher(["re:.*", "x"])
+    assert matcher.match_all("") == ()
+    assert matcher.match(None) is None
@@ -0,0 +1,62 @@
+import threading
+import time
+
+from idle_detector import LinuxIdleDetector
+from tracking_service import TrackingService
+from window_watcher import WindowWatcher
+
+
+class EventWatcher(WindowWatcher):
+    """Backend por eventos sem janela ativa: o tracker dorme até a próxima troca de foco."""
+
+    event_driven = True
+
+
+class NullHistory:
+    version = 0
+
+
+class NullJournal:
+    session_id = None
+
+    def append_segment(self, *args):
+        pass
+
+    def commit(self):
+        pass
+
+
+def wait_for(condition, timeout=2.0):
+    deadline = time.monotonic() + timeout
+    while not condition():
+        assert time.monotonic() < deadline, "timed out"
+        time.sleep(0.005)
+
+
+def test_quick_restart_leaves_a_single_tracker_loop():
+    service = TrackingService(NullHistory(), NullJournal(), window_watcher=EventWatcher(),
+                              idle_detector=LinuxIdleDetector(input_source=lambda: 0))
+    ticks = []
+    check_input_activity = service.check_input_activity
+
+    def record_tick():
+        ticks.append(threading.current_thread())
+        return check_input_activity()
+    service.check_input_activity = record_tick
+
+    service.start(["code"])
+    wait_for(lambda: ticks)
+    old_thread = ticks[0]
+    # stop() e start() seguidos, antes de a thread antiga acordar do wait sem prazo
+    service.stop()
+    service.start(["code"])
+    wait_for(lambda: any(thread is not old_thread for thread in ticks))
+    old_thread.join(1.0)
+    assert not old_thread.is_alive()
+
+    del ticks[:]
+    service.on_foreground_change("main.py - code")
+    wait_for(lambda: ticks)
+    time.sleep(0.05)
+    assert len(set(ticks)) == 1 and old_thread not in ticks
+    service.stop()
@@ -0,0 +1,52 @@
+import threading
+import time
+
+
+class TimeAccountant:
+    """Contabiliza o tempo de cada app a partir de timestamps de mudança de estado.
+
+    Em vez de somar um valor fixo por iteração, guarda o instante
+    (time.monotonic) em que cada estado começou — foco em um app, inatividade,
+    retomada — e credita a duração real do intervalo quando o estado muda.
+    O resultado independe de quanto o loop do tracker demora ou dorme.
+    """
+
+    def __init__(self, apps=(), clock=time.monotonic):
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.totals = {app: 0.0 for app in apps}  # Segundos por app
+        self.current_app = None  # App sendo contado agora (None = parado/inativo)
+        self.since = None  # Início do intervalo aberto
+        self.changed_at = clock()  # Instante da última mudança de estado
+
+    def switch(self, app, at=None):
+        """Fecha o intervalo aberto em `at` e, se app não for None, abre outro para app."""
+        with self._lock:
+            now = self.clock()
+            at = now if at is None else min(at, now)
+            if self.current_app is not None:
+                at = max(at, self.since)
+                self.totals[self.current_app] = self.totals.get(self.current_app, 0.0) + (at - self.since)
+            self.current_app = app
+            self.since = at if app is not None else None
+            self.changed_at = at
+
+    def close(self, at=None):
+        """Encerra a contagem e devolve os totais em segundos."""
+        self.switch(None, at)
+        return self.snapshot()
+
+    def reset(self):
+        with self._lock:
+            self.totals = {app: 0.0 for app in self.totals}
+            if self.current_app is not None:
+                self.since = self.clock()
+
+    def snapshot(self, now=None):
+        """Totais em segundos, incluindo o intervalo ainda aberto."""
+        with self._lock:
+            totals = dict(self.totals)
+            if self.current_app is not None:
+                now = self.clock() if now is None else now
+                totals[self.current_app] = totals.get(self.current_app, 0.0) + max(0.0, now - self.since)
+            return totals
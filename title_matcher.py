@@ -0,0 +1,80 @@
+import re
+
+# Prioridade entre regras que casam o mesmo título (menor vence)
+EXACT, PREFIX, REGEX, SUBSTRING = range(4)
+
+RULE_PREFIXES = (
+    ("=", EXACT),      # "=Título exato"
+    ("^", PREFIX),     # "^Início do título"
+    ("re:", REGEX),    # "re:expressão regular"
+)
+
+
+def parse_rule(text):
+    """Separa o tipo da regra do padrão. Sem prefixo a regra é de substring."""
+    for prefix, kind in RULE_PREFIXES:
+        if text.startswith(prefix) and len(text) > len(prefix):
+            return kind, text[len(prefix):]
+    return SUBSTRING, text
+
+
+class TitleMatcher:
+    """Casa títulos de janela contra todas as regras, já em ordem de prioridade.
+
+    Cada regra vira um teste direto e barato: igualdade (exata), startswith
+    (prefixo), `in` (substring) ou search() de um regex pré-compilado ("re:",
+    compilado sozinho para manter flags globais e referências a grupos).
+    O resultado do último título é guardado em cache, então o loop do tracker
+    só reavalia as regras quando o título muda.
+    Prioridade: exata > prefixo > regex > substring; em empate vence o padrão
+    mais longo e depois a ordem em que as regras foram dadas.
+    """
+
+    def __init__(self, rules):
+        self.rules = list(rules)
+        ordered = []
+        for index, rule in enumerate(self.rules):
+            kind, pattern = parse_rule(rule)
+            if kind == REGEX:
+                try:
+                    compiled = re.compile(pattern, re.DOTALL)
+                except re.error as e:
+                    raise ValueError(f"{rule}: {e}") from e
+                ordered.append(((kind, -len(pattern), index), kind, compiled, rule))
+            else:
+                ordered.append(((kind, -len(pattern), index), kind, pattern, rule))
+        ordered.sort()
+        # Uma lista por tipo, já em ordem de prioridade: concatenadas na ordem dos tipos
+        # o resultado sai ordenado, sem sort por título
+        self._exact = {}
+        self._prefixes, self._regexes, self._substrings = [], [], []
+        for _, kind, pattern, rule in ordered:
+            if kind == EXACT:
+                self._exact.setdefault(pattern, []).append(rule)
+            elif kind == PREFIX:
+                self._prefixes.append((pattern, rule))
+            elif kind == REGEX:
+                self._regexes.append((pattern, rule))
+            else:
+                self._substrings.append((pattern, rule))
+        self._last_title = None
+        self._last_result = ()
+
+    def match_all(self, title):
+        """Todas as regras que casam o título, em ordem de prioridade."""
+        if title == self._last_title:
+            return self._last_result
+        result = ()
+        if title:
+            result = (*self._exact.get(title, ()),
+                      *[rule for prefix, rule in self._prefixes if title.startswith(prefix)],
+                      *[rule for regex, rule in self._regexes if regex.search(title)],
+                      *[rule for text, rule in self._substrings if text in title])
+        self._last_title = title
+        self._last_result = result
+        return result
+
+    def match(self, title):
+        """A regra de maior prioridade que casa o título (ou None)."""
+        result = self.match_all(title)
+        return result[0] if result else None
@@ -0,0 +1,110 @@
+import bisect
+import threading
+import time
+
+# Limites superiores dos buckets, em milissegundos (o último bucket é "acima de 5s")
+BUCKET_BOUNDS_MS = (0.1, 0.25, 0.5, 1, 2.5, 5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+
+class LatencyHistogram:
+    """Histograma de latências com buckets fixos (contagem, soma e máximo)."""
+
+    def __init__(self):
+        self.buckets = [0] * (len(BUCKET_BOUNDS_MS) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+
+    def add(self, ms):
+        self.buckets[bisect.bisect_left(BUCKET_BOUNDS_MS, ms)] += 1
+        self.count += 1
+        self.total_ms += ms
+        if ms > self.max_ms:
+            self.max_ms = ms
+
+    def percentile(self, fraction):
+        """Limite superior do bucket que contém o percentil pedido."""
+        if not self.count:
+            return 0.0
+        target = fraction * self.count
+        seen = 0
+        for bound, n in zip(BUCKET_BOUNDS_MS, self.buckets):
+            seen += n
+            if seen >= target:
+                return min(bound, self.max_ms)
+        return self.max_ms
+
+    def to_dict(self):
+        buckets = {f"<={bound}": n for bound, n in zip(BUCKET_BOUNDS_MS, self.buckets)}
+        buckets[f">{BUCKET_BOUNDS_MS[-1]}"] = self.buckets[-1]
+        return {
+            "count": self.count,
+            "mean_ms": self.total_ms / self.count if self.count else 0.0,
+            "p50_ms": self.percentile(0.5),
+            "p95_ms": self.percentile(0.95),
+            "max_ms": self.max_ms,
+            "buckets": buckets,
+        }
+
+
+class TrackerMetrics:
+    """Instrumentação do loop do track_time.
+
+    Com enabled = False, start() devolve 0 e stage() retorna na primeira
+    linha, então o custo no loop é só uma chamada de método por etapa. Os
+    contadores de erro são sempre mantidos (só incrementam quando algo falha).
+    """
+
+    def __init__(self, enabled=False, clock=time.perf_counter):
+        self.enabled = enabled
+        self.clock = clock
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.histograms = {}
+            self.counters = {}
+            self.started_at = time.time()
+
+    def start(self):
+        return self.clock() if self.enabled else 0
+
+    def stage(self, name, start):
+        """Registra a etapa que começou em `start` e devolve o instante atual (início da próxima)."""
+        if not self.enabled or not start:
+            return 0  # Desligado (ou ligado no meio do tick, sem início medido)
+        now = self.clock()
+        self.record(name, (now - start) * 1000)
+        return now
+
+    def record(self, name, ms):
+        if not self.enabled:
+            return
+        with self._lock:
+            histogram = self.histograms.get(name)
+            if histogram is None:
+                histogram = self.histograms[name] = LatencyHistogram()
+            histogram.add(ms)
+
+    def count(self, name, n=1):
+        with self._lock:
+            self.counters[name] = self.counters.get(name, 0) + n
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "enabled": self.enabled,
+                "since": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started_at)),
+                "counters": dict(self.counters),
+                "stages": {name: h.to_dict() for name, h in self.histograms.items()},
+            }
+
+
+def format_summary(snapshot):
+    """Texto curto para o painel de diagnóstico a partir de um snapshot()."""
+    lines = [f"{name}: {value}" for name, value in sorted(snapshot["counters"].items())]
+    for name, h in snapshot["stages"].items():
+        lines.append(f"{name}: n={h['count']} mean={h['mean_ms']:.2f}ms "
+                     f"p95<={h['p95_ms']:.2f}ms max={h['max_ms']:.2f}ms")
+    return "\n".join(lines) or "-"
@@ -0,0 +1,544 @@
+"""Motor de rastreamento sem Tk e o serviço local que o expõe.
+
+O TrackingService concentra o que antes vivia dentro do TimeTrackerApp:
+o loop do tracker, a detecção de janela e de inatividade, o journal e a
+gravação das sessões. A interface pode usá-lo no mesmo processo ou, com o
+serviço rodando à parte (python tracking_service.py), falar com ele por um
+socket TCP em 127.0.0.1 através do TrackingClient.
+
+Protocolo: uma requisição JSON por linha ({"token", "cmd", "args"}) e uma
+resposta JSON por linha ({"ok": true, "result"} ou {"ok": false, "error"}).
+"""
+import argparse
+import csv
+import json
+import os
+import secrets
+import signal
+import socket
+import socketserver
+import sys
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from adaptive_interval import AdaptiveInterval
+from history_store import ARCHIVE_FILE, HistoryReader, HistoryStore, format_seconds
+from idle_detector import create_idle_detector
+from session_journal import SessionJournal
+from time_accounting import TimeAccountant
+from title_matcher import TitleMatcher
+from tracker_metrics import TrackerMetrics
+from window_watcher import create_window_watcher
+
+SERVICE_FILE = "tracking_service.json"  # Porta e token do serviço em execução
+
+
+class TrackingService:
+    """Rastreamento de tempo por app, sem nenhuma dependência de interface."""
+
+    def __init__(self, history_store, journal, csv_path=None, window_watcher=None, idle_detector=None):
+        self.history_store = history_store
+        self.journal = journal
+        self.csv_path = csv_path
+        self.idle_threshold = 10
+        self.check_interval = 1.0
+        self.max_check_interval = 10.0
+        self.sampling = AdaptiveInterval(self.check_interval, self.max_check_interval)
+        self.journal_checkpoint = 15.0  # Segmentos longos são gravados em pedaços de no máximo 15s
+        self.metrics = TrackerMetrics()  # Latência por etapa do track_time (desligada por padrão)
+
+        self.running = False
+        self.tracking_active = False
+        self.title_matcher = TitleMatcher([])
+        self.accountant = TimeAccountant()  # Tempo por app a partir de timestamps monotônicos
+        self.last_activity_time = time.monotonic()
+        self._last_focus_change = time.monotonic()
+        self._segment = None  # Segmento aberto do journal: (início monotônico, app, título, inativo)
+        self._tracker_wake = threading.Event()  # Acorda o track_time em trocas de foco/atividade
+        self._lock = threading.RLock()  # start/stop/reset podem vir da UI, de atalhos ou do socket
+        self._csv_lock = threading.Lock()  # Gravação no banco + CSV vs. reescrita do CSV pela compactação
+
+        # Inatividade: API do sistema (uma chamada) ou polling do mouse + hook de teclado como fallback
+        self.idle_detector = idle_detector or create_idle_detector()
+        # Janela em primeiro plano: backend por eventos quando disponível, polling como fallback
+        self.window_watcher = window_watcher or create_window_watcher()
+        self.window_watcher.add_listener(self.on_foreground_change)
+        self.idle_detector.start(on_activity=self.keyboard_activity)
+
+    # --- Comandos (também expostos pelo socket) ---
+
+    def configure(self, idle_threshold=None, check_interval=None, max_check_interval=None):
+        with self._lock:
+            if idle_threshold is not None:
+                self.idle_threshold = idle_threshold
+            if check_interval is not None:
+                self.check_interval = check_interval
+            if max_check_interval is not None:
+                self.max_check_interval = max_check_interval
+            self.sampling.configure(self.check_interval, self.max_check_interval)
+
+    def start(self, apps):
+        """Começa a rastrear os apps (regras do TitleMatcher); ValueError se alguma regra for inválida."""
+        with self._lock:
+            if self.running:
+                return self.status()
+            # Regras: "=exato", "^prefixo", "re:regex" ou substring (padrão)
+            self.title_matcher = TitleMatcher(apps)
+            self.running = True
+            self.tracking_active = False
+            self.last_activity_time = time.monotonic()
+            self.accountant = TimeAccountant(apps)
+            self._segment = None
+            # Um Event por execução: a thread de um stop() anterior que ainda não acordou
+            # continua com o dela (já sinalizado) e sai, em vez de virar um segundo loop
+            self._tracker_wake = threading.Event()
+            self.window_watcher.start()
+            threading.Thread(target=self.track_time, args=(self._tracker_wake,), daemon=True).start()
+            return self.status()
+
+    def stop(self):
+        """Para o tracking e salva a sessão; devolve o resultado de save_session (ou None)."""
+        with self._lock:
+            if not self.running:
+                return None
+            self.running = False
+            self.tracking_active = False
+            self._tracker_wake.set()
+            self.window_watcher.stop()
+            # Fecha o intervalo aberto no instante da parada
+            stopped_at = time.monotonic()
+            totals = self.accountant.close(stopped_at)
+            self.record_segment(stopped_at, None, None, False)
+            self._segment = None
+            if sum(totals.values()) > 0:
+                return self.save_session(totals)
+            self.journal.commit()
+            return None
+
+    def reset(self):
+        """Zera a sessão em andamento sem salvar"""
+        with self._lock:
+            self.accountant.reset()
+            self.journal.commit()  # Descarta os segmentos já gravados
+            if self._segment is not None:
+                self._segment = (time.monotonic(),) + self._segment[1:]
+
+    def status(self):
+        app_seconds = self.accountant.snapshot()
+        return {
+            "running": self.running,
+            "tracking_active": self.tracking_active,
+            "app_seconds": app_seconds,
+            "total_seconds": sum(app_seconds.values()),
+            # Muda quando outro cliente grava ou a compactação reescreve o histórico
+            "history_version": self.history_store.version,
+        }
+
+    def diagnostics(self):
+        return self.metrics.snapshot()
+
+    def set_diagnostics(self, enabled):
+        self.metrics.enabled = bool(enabled)
+
+    def reset_diagnostics(self):
+        self.metrics.reset()
+
+    # --- Loop do tracker ---
+
+    def keyboard_activity(self, event=None):
+        """Registra atividade do teclado"""
+        self.last_activity_time = time.monotonic()
+        # Só precisa acordar o tracker se ele estiver parado por inatividade
+        if self.running and not self.tracking_active:
+            self._tracker_wake.set()
+
+    def on_foreground_change(self, title):
+        """Chamado pelo window_watcher quando a janela ativa (ou seu título) muda"""
+        # Trocar de janela implica interação do usuário
+        self.last_activity_time = self._last_focus_change = time.monotonic()
+        self._tracker_wake.set()
+
+    def check_input_activity(self):
+        """Atualiza o instante da última entrada do usuário (teclado/mouse)"""
+        try:
+            last_input = self.idle_detector.last_input_time()
+        except Exception as e:
+            self.metrics.count("idle_errors")
+            print(f"Idle detection error: {e}")
+            return self.last_activity_time
+        # Trocas de foco também contam como atividade, por isso o max
+        self.last_activity_time = max(self.last_activity_time, last_input)
+        return self.last_activity_time
+
+    def is_user_active(self):
+        """Verifica se o usuário está ativo"""
+        return (time.monotonic() - self.last_activity_time) < self.idle_threshold
+
+    def get_active_window(self):
+        """Obtém a janela ativa atual"""
+        return self.window_watcher.current_title()
+
+    def track_time(self, wake):
+        """Thread principal que monitora o tempo (até o stop() ou um start() mais novo)"""
+        metrics = self.metrics
+        self.sampling.reset()
+        last_state = None
+        while self.running and self._tracker_wake is wake:
+            started = mark = metrics.start()
+            self.check_input_activity()
+            mark = metrics.stage("input", mark)
+            window_errors = self.window_watcher.error_count
+            current_window = self.get_active_window()
+            if self.window_watcher.error_count != window_errors:
+                metrics.count("window_errors")
+            mark = metrics.stage("window", mark)
+            user_active = self.is_user_active()
+            # Identifica qual app está ativo (matcher pré-compilado, com cache do último título)
+            app_found = self.title_matcher.match(current_window)
+            mark = metrics.stage("match", mark)
+            self.account_state_change(app_found if user_active else None, user_active, current_window, wake)
+            metrics.stage("accounting", mark)
+            # A interface lê tracking_active pelo status(); nada de UI aqui
+            self.tracking_active = bool(user_active and app_found)
+            # Mudou foco, título ou atividade: volta a amostrar rápido; senão o intervalo cresce
+            state = (current_window, user_active)
+            wait = self.next_tracker_wait(app_found, user_active, state != last_state)
+            last_state = state
+            if started:
+                tick_end = metrics.stage("tick", started)
+                if tick_end and tick_end - started > self.check_interval:
+                    metrics.count("overruns")  # O trabalho do tick passou do intervalo configurado
+            slept_from = metrics.start()
+            woke = wake.wait(wait)
+            if slept_from and not woke and wait is not None:
+                # Atraso do despertar em relação ao agendado (só quando o timeout venceu)
+                metrics.record("wake_drift", (metrics.clock() - slept_from - wait) * 1000)
+            wake.clear()
+
+    def account_state_change(self, app, user_active, title, wake):
+        """Registra no accountant a mudança de estado no instante em que ela aconteceu"""
+        with self._lock:
+            if not self.running or self._tracker_wake is not wake:
+                return  # stop já fechou a contagem (ou esta thread é de uma execução anterior)
+            idle = not user_active
+            if app != self.accountant.current_app:
+                changed_at = self.accountant.changed_at
+                if not user_active:
+                    # A inatividade começou quando o limite venceu, não quando foi detectada
+                    at = self.last_activity_time + self.idle_threshold
+                elif self._last_focus_change > changed_at:
+                    at = self._last_focus_change
+                else:
+                    at = max(self.last_activity_time, changed_at)  # Retomada após inatividade
+                if self._segment is not None:
+                    at = max(at, self._segment[0])  # Não reabre um trecho já gravado no journal
+                self.accountant.switch(app, at)
+                self.record_segment(at, app, title, idle)
+            elif (self._segment is None or self._segment[3] != idle
+                    or time.monotonic() - self._segment[0] >= self.journal_checkpoint):
+                self.record_segment(time.monotonic(), app, title, idle)
+
+    def record_segment(self, at, app, title, idle):
+        """Fecha o segmento aberto em `at` (no journal) e abre o próximo"""
+        if self._segment is not None:
+            start, seg_app, seg_title, seg_idle = self._segment
+            offset = time.time() - time.monotonic()  # Converte o relógio monotônico em horário real
+            self.journal.append_segment(start + offset, at + offset, seg_app, seg_title, seg_idle)
+        self._segment = (at, app, title, idle)
+
+    def next_tracker_wait(self, app_found, user_active, changed=True):
+        """Quanto o track_time pode dormir até precisar reavaliar o estado"""
+        interval = self.sampling.next(changed)
+        if not self.window_watcher.event_driven:
+            # Polling: uma troca de foco só é vista (e datada) na amostra seguinte, então
+            # com regras a rastrear e o usuário ativo fica no mínimo (entrar em um app
+            # rastreado não pode esperar o intervalo máximo). Só recua inativo, quando a
+            # retomada é datada pelo último input
+            if self.title_matcher.rules and user_active:
+                self.sampling.reset()
+                return self.check_interval
+            return interval
+        if not app_found:
+            return None  # Nada a contar: espera a próxima troca de foco
+        if not user_active:
+            # Inativo no app: a retomada só é vista por polling, mas é datada pelo último input
+            return interval
+        # Ativo no app: só precisa acordar quando a inatividade vencer
+        idle_deadline = self.idle_threshold - (time.monotonic() - self.last_activity_time)
+        return max(self.check_interval, idle_deadline)
+
+    # --- Persistência ---
+
+    def save_session(self, app_seconds, when=None):
+        """Grava uma linha por app no histórico e no CSV.
+
+        Devolve {"rows", "old_version", "new_version", "dated_rows"} para a
+        interface atualizar a lista e os caches sem reler o histórico.
+        """
+        now = when or datetime.now()
+        date_str = now.strftime("%d/%m/%Y")
+        time_str = now.strftime("%H:%M:%S")
+        rows = [[date_str, time_str, app, format_seconds(seconds)] for app, seconds in app_seconds.items()]
+        with self._csv_lock:
+            old_version, new_version, dated_rows = self.history_store.add_rows(rows, self.journal.session_id)
+            # O CSV continua sendo mantido como cópia legível do histórico
+            if self.csv_path:
+                with open(self.csv_path, mode="a", newline="", encoding="utf-8") as file:
+                    csv.writer(file).writerows(rows)
+        self.journal.commit()  # A sessão já está no histórico
+        return {"rows": rows, "old_version": old_version, "new_version": new_version,
+                "dated_rows": [list(row) for row in dated_rows]}
+
+    def compact_history(self, older_than_days, archive_path=None):
+        """Junta as sessões com mais de older_than_days dias em uma linha por dia e app.
+
+        Roda em segundo plano no processo dono do histórico (ver
+        HistoryStore.compact); depois regrava o CSV a partir do banco, para a
+        cópia legível também encolher. Retorna o número de linhas removidas.
+        """
+        removed = self.history_store.compact(date.today() - timedelta(days=older_than_days), archive_path)
+        if removed and self.csv_path:
+            with self._csv_lock:
+                self._rewrite_csv()
+        return removed
+
+    def _rewrite_csv(self):
+        partial_path = self.csv_path + ".part"
+        reader = HistoryReader(self.history_store.db_path)
+        try:
+            with open(partial_path, mode="w", newline="", encoding="utf-8") as file:
+                writer = csv.writer(file)
+                writer.writerow(["DATE", "TIME", "APP", "DURATION"])
+                for _, _, date_str, time_str, app, seconds in reader.sessions():
+                    writer.writerow([date_str, time_str, app, format_seconds(seconds)])
+            os.replace(partial_path, self.csv_path)
+        finally:
+            reader.close()
+
+    def recover_unsaved_session(self):
+        """Reprocessa o journal e salva a sessão que não chegou ao histórico"""
+        try:
+            segments = self.journal.recover()
+        except OSError as e:
+            print(f"Could not read session journal: {e}")
+            return None
+        if self.journal.session_id and self.journal.session_id == self.history_store.saved_session():
+            # Queda entre salvar e truncar: a sessão já está no histórico
+            self.journal.commit()
+            return None
+        app_seconds = {}
+        last_end = None
+        for segment in segments:
+            if segment.get("app") and not segment.get("idle"):
+                app_seconds[segment["app"]] = app_seconds.get(segment["app"], 0.0) + segment["end"] - segment["start"]
+            last_end = max(last_end or segment["end"], segment["end"])
+        if app_seconds:
+            print(f"Recovered unsaved session: {app_seconds}")
+            return self.save_session(app_seconds, datetime.fromtimestamp(last_end))
+        self.journal.commit()
+        return None
+
+    def close(self):
+        """Para watcher, detector e journal (a sessão aberta fica no journal para recuperação)"""
+        with self._lock:
+            self.running = False
+            self._tracker_wake.set()
+            self.window_watcher.stop()
+            self.idle_detector.stop()
+            self.journal.close()
+
+
+COMMANDS = ("status", "start", "stop", "reset", "configure", "diagnostics", "set_diagnostics", "reset_diagnostics")
+
+
+class _RequestHandler(socketserver.StreamRequestHandler):
+    def handle(self):
+        for line in self.rfile:
+            try:
+                request = json.loads(line)
+                if not secrets.compare_digest(str(request.get("token", "")), self.server.token):
+                    raise PermissionError("invalid token")
+                command = request.get("cmd")
+                if command not in COMMANDS:
+                    raise ValueError(f"unknown command: {command}")
+                result = getattr(self.server.service, command)(**request.get("args", {}))
+                response = {"ok": True, "result": result}
+            except Exception as e:
+                response = {"ok": False, "error": str(e), "type": type(e).__name__}
+            self.wfile.write(json.dumps(response, ensure_ascii=False).encode("utf-8") + b"\n")
+            self.wfile.flush()
+
+
+class TrackingServer(socketserver.ThreadingTCPServer):
+    """Expõe um TrackingService em 127.0.0.1; toda requisição precisa do token."""
+
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self, service, port=0, token=None):
+        super().__init__(("127.0.0.1", port), _RequestHandler)
+        self.service = service
+        self.token = token or secrets.token_hex(16)
+
+    def write_service_file(self, path):
+        """Grava porta e token para o cliente (o arquivo fica na pasta de dados do usuário)."""
+        info = {"host": "127.0.0.1", "port": self.server_address[1], "token": self.token, "pid": os.getpid()}
+        tmp_path = path + ".tmp"
+        try:
+            os.remove(tmp_path)  # Um .tmp antigo manteria as permissões com que foi criado
+        except FileNotFoundError:
+            pass
+        # Só o dono lê o token: com ele qualquer processo controlaria o serviço
+        fd = os.open(tmp_path, os.O_WRONLY | os.O_CREAT | os.O_TRUNC, 0o600)
+        with os.fdopen(fd, "w", encoding="utf-8") as f:
+            json.dump(info, f)
+        os.replace(tmp_path, path)
+
+
+class TrackingClient:
+    """Cliente do serviço com a mesma interface do TrackingService usada pela GUI."""
+
+    def __init__(self, host, port, token, timeout=2.0):
+        self.address = (host, port)
+        self.token = token
+        self.timeout = timeout
+        self._sock = None
+        self._reader = None
+        self._lock = threading.Lock()
+
+    @classmethod
+    def from_service_file(cls, path, timeout=2.0):
+        with open(path, "r", encoding="utf-8") as f:
+            info = json.load(f)
+        return cls(info["host"], info["port"], info["token"], timeout)
+
+    def _call(self, command, **args):
+        request = json.dumps({"token": self.token, "cmd": command, "args": args}).encode("utf-8") + b"\n"
+        with self._lock:
+            # Uma reconexão se o serviço tiver sido reiniciado
+            for attempt in (1, 2):
+                try:
+                    if self._sock is None:
+                        self._sock = socket.create_connection(self.address, timeout=self.timeout)
+                        self._reader = self._sock.makefile("rb")
+                    self._sock.sendall(request)
+                    line = self._reader.readline()
+                    if not line:
+                        raise ConnectionError("tracking service closed the connection")
+                    break
+                except OSError:
+                    self.close()
+                    if attempt == 2:
+                        raise
+        response = json.loads(line)
+        if response["ok"]:
+            return response["result"]
+        if response.get("type") == "ValueError":
+            raise ValueError(response["error"])
+        raise RuntimeError(response["error"])
+
+    def status(self):
+        return self._call("status")
+
+    def start(self, apps):
+        return self._call("start", apps=list(apps))
+
+    def stop(self):
+        return self._call("stop")
+
+    def reset(self):
+        return self._call("reset")
+
+    def configure(self, **settings):
+        return self._call("configure", **settings)
+
+    def diagnostics(self):
+        return self._call("diagnostics")
+
+    def set_diagnostics(self, enabled):
+        return self._call("set_diagnostics", enabled=enabled)
+
+    def reset_diagnostics(self):
+        return self._call("reset_diagnostics")
+
+    def recover_unsaved_session(self):
+        return None  # O serviço recupera o próprio journal ao iniciar
+
+    def close(self):
+        """Fecha só a conexão; o serviço continua rodando."""
+        if self._sock is not None:
+            try:
+                self._reader.close()
+                self._sock.close()
+            except OSError:
+                pass
+        self._sock = self._reader = None
+
+
+def read_settings(data_dir):
+    """settings.json da pasta de dados ({} se não existir ou for inválido)."""
+    try:
+        with open(os.path.join(data_dir, "settings.json"), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, json.JSONDecodeError):
+        return {}
+
+
+def open_service(data_dir):
+    """Abre histórico e journal da pasta de dados e monta o serviço com o settings.json dela."""
+    csv_path = os.path.join(data_dir, "time_history.csv")
+    if not os.path.exists(csv_path):
+        with open(csv_path, mode="w", newline="", encoding="utf-8") as file:
+            csv.writer(file).writerow(["DATE", "TIME", "APP", "DURATION"])
+    history_store = HistoryStore(
+        os.path.join(data_dir, "time_history.db"), csv_path,
+        columnar_dir=os.path.join(data_dir, "time_history.cols"))
+    journal = SessionJournal(os.path.join(data_dir, "session_journal.jsonl"))
+    service = TrackingService(history_store, journal, csv_path)
+    settings = read_settings(data_dir)
+    service.configure(settings.get("idle_threshold"), settings.get("check_interval"),
+                      settings.get("max_check_interval"))
+    service.set_diagnostics(settings.get("diagnostics_enabled", False))
+    return service
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Headless Work Time Tracker service (GUI: python app.py --connect)")
+    parser.add_argument("--data-dir", default=os.path.abspath("."), help="folder with time_history.csv and settings.json")
+    parser.add_argument("--port", type=int, default=0, help="loopback port (default: any free port)")
+    parser.add_argument("--track", nargs="+", metavar="APP", help="start tracking these app rules right away")
+    args = parser.parse_args()
+
+    service = open_service(args.data_dir)
+    service.recover_unsaved_session()
+    server = TrackingServer(service, args.port)
+    service_file = os.path.join(args.data_dir, SERVICE_FILE)
+    server.write_service_file(service_file)
+    if args.track:
+        service.start(args.track)
+    settings = read_settings(args.data_dir)
+    if settings.get("compact_after_days", 0) > 0:
+        archive_path = os.path.join(args.data_dir, ARCHIVE_FILE) if settings.get("archive_compacted", True) else None
+        threading.Thread(target=service.compact_history, args=(settings["compact_after_days"], archive_path),
+                         daemon=True).start()
+    # SIGTERM encerra como Ctrl+C: salva a sessão aberta antes de sair
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    print(f"Tracking service listening on 127.0.0.1:{server.server_address[1]}")
+    try:
+        server.serve_forever()
+    except (KeyboardInterrupt, SystemExit):
+        pass
+    finally:
+        server.server_close()
+        service.stop()
+        service.close()
+        service.history_store.close()
+        try:
+            os.remove(service_file)
+        except OSError:
+            pass
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,47 @@
+from collections import OrderedDict
+
+from PIL import Image, ImageDraw, ImageFont
+
+
+def icon_text(timer_str):
+    """Texto exibido no ícone: HH:MM com horas, senão MM:SS."""
+    hours, minutes, seconds = (int(part) for part in timer_str.split(':'))
+    if hours > 0:
+        return f"{hours:02d}:{minutes:02d}"
+    return f"{minutes:02d}:{seconds:02d}"
+
+
+class TrayIconRenderer:
+    """Gera as imagens do ícone da bandeja.
+
+    A fonte é carregada do disco uma única vez e cada par (texto, rodando)
+    é desenhado uma vez só; as chamadas seguintes devolvem a imagem do cache.
+    """
+
+    TEXT_COLORS = {True: '#1ABC9C', False: '#EA697B'}
+
+    def __init__(self, size=(64, 64), font_size=24, max_entries=128):
+        self.size = size
+        self.max_entries = max_entries
+        self._images = OrderedDict()  # (texto, rodando) -> Image
+        try:
+            self.font = ImageFont.truetype("arial.ttf", font_size)
+        except IOError:
+            self.font = ImageFont.load_default()
+
+    def render(self, text, running):
+        key = (text, running)
+        image = self._images.get(key)
+        if image is not None:
+            self._images.move_to_end(key)
+            return image
+        image = Image.new('RGBA', self.size, (0, 0, 0, 0))
+        d = ImageDraw.Draw(image)
+        left, top, right, bottom = d.textbbox((0, 0), text, font=self.font)
+        x_draw = (self.size[0] - (right - left)) / 2
+        y_draw = (self.size[1] - (bottom - top)) / 2
+        d.text((x_draw, y_draw), text, fill=self.TEXT_COLORS[running], font=self.font)
+        self._images[key] = image
+        while len(self._images) > self.max_entries:
+            self._images.popitem(last=False)
+        return image
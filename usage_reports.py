@@ -0,0 +1,41 @@
+from datetime import timedelta
+
+PERIODS = ("day", "week", "month")
+
+
+def period_start(day, period):
+    """Primeiro dia do período que contém `day` (semanas começam na segunda-feira)."""
+    if period == "week":
+        return day - timedelta(days=day.weekday())
+    if period == "month":
+        return day.replace(day=1)
+    return day
+
+
+def usage_window_start(today):
+    """Primeiro dia necessário para os totais de hoje, da semana e do mês."""
+    return min(period_start(today, "week"), period_start(today, "month"))
+
+
+def usage_totals(daily, today):
+    """Segundos de uso hoje, na semana e no mês, a partir de {date: segundos}."""
+    week_start = period_start(today, "week")
+    month_start = period_start(today, "month")
+    total_day = daily.get(today, 0)
+    total_week = sum(sec for day, sec in daily.items() if week_start <= day <= today)
+    total_month = sum(sec for day, sec in daily.items() if month_start <= day <= today)
+    return total_day, total_week, total_month
+
+
+def group_by_period(daily, period):
+    """{início do período: segundos} em ordem de data, a partir de {date: segundos}."""
+    grouped = {}
+    for day in sorted(daily):
+        key = period_start(day, period)
+        grouped[key] = grouped.get(key, 0) + daily[day]
+    return grouped
+
+
+def daily_average(daily):
+    """Média entre os dias presentes no histórico (a mesma definição do dashboard); None sem dados."""
+    return sum(daily.values()) / len(daily) if daily else None
@@ -0,0 +1,153 @@
+import sys
+import threading
+
+
+class WindowWatcher:
+    """Base dos backends que informam o título da janela em primeiro plano.
+
+    Backends orientados a eventos (event_driven = True) chamam os listeners
+    sempre que o foco ou o título da janela ativa muda; o tracker pode então
+    dormir até o próximo evento em vez de consultar a janela a cada intervalo.
+    """
+
+    event_driven = False
+
+    def __init__(self):
+        self._listeners = []
+        self._title = None
+        self._lock = threading.Lock()
+        self.error_count = 0  # Falhas ao consultar a janela ativa (lidas pelo diagnóstico)
+
+    def add_listener(self, callback):
+        """Registra callback(title) chamado a cada troca de janela/título."""
+        self._listeners.append(callback)
+
+    def start(self):
+        pass
+
+    def stop(self):
+        pass
+
+    def current_title(self):
+        with self._lock:
+            return self._title
+
+    def _publish(self, title):
+        with self._lock:
+            if title == self._title:
+                return
+            self._title = title
+        for callback in self._listeners:
+            try:
+                callback(title)
+            except Exception as e:
+                print(f"Window listener error: {e}")
+
+
+class PollingWatcher(WindowWatcher):
+    """Fallback: consulta o pygetwindow sempre que o título é pedido."""
+
+    def current_title(self):
+        import pygetwindow as gw
+        try:
+            window = gw.getActiveWindow()
+            title = window and window.title
+        except Exception as e:
+            self.error_count += 1
+            print(f"Window tracking error: {e}")
+            return None
+        self._publish(title)
+        return title
+
+
+class WinEventWatcher(WindowWatcher):
+    """Backend Windows baseado em SetWinEventHook (foco e troca de título)."""
+
+    event_driven = True
+
+    EVENT_SYSTEM_FOREGROUND = 0x0003
+    EVENT_OBJECT_NAMECHANGE = 0x800C
+    WINEVENT_OUTOFCONTEXT = 0x0000
+    OBJID_WINDOW = 0
+    WM_QUIT = 0x0012
+
+    def __init__(self):
+        super().__init__()
+        import ctypes
+        from ctypes import wintypes
+        self._ctypes = ctypes
+        self._wintypes = wintypes
+        self._user32 = ctypes.windll.user32
+        self._proc_type = ctypes.WINFUNCTYPE(
+            None, wintypes.HANDLE, wintypes.DWORD, wintypes.HWND,
+            wintypes.LONG, wintypes.LONG, wintypes.DWORD, wintypes.DWORD)
+        self._user32.SetWinEventHook.restype = wintypes.HANDLE
+        self._user32.GetForegroundWindow.restype = wintypes.HWND
+        self._thread = None
+        self._thread_id = None
+
+    def start(self):
+        if self._thread and self._thread.is_alive():
+            return
+        self._publish(self._foreground_title())
+        ready = threading.Event()
+        self._thread = threading.Thread(target=self._run, args=(ready,), daemon=True)
+        self._thread.start()
+        ready.wait(1.0)
+
+    def stop(self):
+        thread, self._thread = self._thread, None
+        if self._thread_id is not None:
+            self._user32.PostThreadMessageW(self._thread_id, self.WM_QUIT, 0, 0)
+        # Espera a thread sair para um start() logo em seguida não dividir o estado com ela
+        if thread is not None and thread is not threading.current_thread():
+            thread.join(1.0)
+
+    def _foreground_title(self):
+        hwnd = self._user32.GetForegroundWindow()
+        if not hwnd:
+            return None
+        length = self._user32.GetWindowTextLengthW(hwnd)
+        buffer = self._ctypes.create_unicode_buffer(length + 1)
+        self._user32.GetWindowTextW(hwnd, buffer, length + 1)
+        return buffer.value
+
+    def _on_event(self, hook, event, hwnd, id_object, id_child, thread, event_time):
+        if event == self.EVENT_OBJECT_NAMECHANGE:
+            # Só interessa a troca de título da própria janela em primeiro plano
+            if id_object != self.OBJID_WINDOW or hwnd != self._user32.GetForegroundWindow():
+                return
+        self._publish(self._foreground_title())
+
+    def _run(self, ready):
+        kernel32 = self._ctypes.windll.kernel32
+        thread_id = self._thread_id = kernel32.GetCurrentThreadId()
+        # Mantém referência ao callback enquanto os hooks existirem
+        proc = self._proc_type(self._on_event)
+        hooks = [
+            self._user32.SetWinEventHook(event, event, 0, proc, 0, 0, self.WINEVENT_OUTOFCONTEXT)
+            for event in (self.EVENT_SYSTEM_FOREGROUND, self.EVENT_OBJECT_NAMECHANGE)
+        ]
+        ready.set()
+        msg = self._wintypes.MSG()
+        try:
+            while self._user32.GetMessageW(self._ctypes.byref(msg), 0, 0, 0) > 0:
+                self._user32.TranslateMessage(self._ctypes.byref(msg))
+                self._user32.DispatchMessageW(self._ctypes.byref(msg))
+        finally:
+            for hook in hooks:
+                if hook:
+                    self._user32.UnhookWinEvent(hook)
+            # Se o join do stop() estourou o prazo, uma thread nova já pode ter gravado o id dela
+            if self._thread_id == thread_id:
+                self._thread_id = None
+
+
+def create_window_watcher():
+    """Escolhe o melhor backend disponível; polling fica só como fallback."""
+    if sys.platform == "win32":
+        try:
+            return WinEventWatcher()
+        except Exception as e:
+            print(f"Falling back to window polling: {e}")
+    return PollingWatcher()